@@ -1,15 +1,17 @@
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config.config import config
+from app.utils.hashing import hasher
+from app.utils.rate_limit import rate_limits
+from app.utils.json_provider import FastJSONProvider
+from app.utils.migrations import register_migration_commands
 import os
 import logging
 
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
 jwt = JWTManager()
 
 def create_app(config_name=None):
@@ -20,11 +22,47 @@ def create_app(config_name=None):
     config_name = config_name or os.environ.get('FLASK_ENV', 'default')
     app.config.from_object(config[config_name])
     
+    # orjson-backed JSON provider (stdlib fallback when orjson is missing)
+    if app.config.get('JSON_FAST_PROVIDER', True):
+        app.json = FastJSONProvider(app)
+    
+    # Instrumented connection pool; selected before db.init_app creates the engine
+    from app.middleware.pool_stats import pool_stats
+    pool_stats.init_app(app, db)
+    
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    # `flask db` loads Flask-Migrate (and alembic) only when invoked
+    register_migration_commands(app, db)
     jwt.init_app(app)
+    
+    # Request metrics at /metrics; registered first so their after_request
+    # hook runs last and sees the final (compressed) response
+    from app.middleware.metrics import request_metrics
+    request_metrics.init_app(app)
+    request_metrics.add_collector(pool_stats.render)
+    
+    # Compression runs after every other after_request hook but the metrics
+    from app.middleware.compression import compression
+    compression.init_app(app)
+    
+    # Per-request SQL counts, slow-query log and query budgets
+    from app.middleware.query_stats import query_stats
+    query_stats.init_app(app, db)
+    
+    # Signed-header or sampled request profiling (off unless PROFILING_ENABLED)
+    from app.middleware.profiling import request_profiler
+    request_profiler.init_app(app)
+    
+    # Client IP and scheme from X-Forwarded-* behind a load balancer
+    if app.config.get('PROXY_FIX_X_FOR') or app.config.get('PROXY_FIX_X_PROTO'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config.get('PROXY_FIX_X_FOR', 0),
+                                x_proto=app.config.get('PROXY_FIX_X_PROTO', 0))
+    
     CORS(app, origins=app.config['CORS_ORIGINS'])
+    hasher.init_app(app)
+    rate_limits.init_app(app)
     
     # Configure logging
     if not app.debug:
@@ -49,17 +87,46 @@ def create_app(config_name=None):
     def token_not_fresh_callback(jwt_header, jwt_payload):
         return jsonify({'error': 'Fresh token required'}), 401
     
+    # Logged-out tokens are checked against the in-memory JTI denylist
+    from app.services.token_denylist import token_denylist
+    token_denylist.init_app(app)
+    
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return token_denylist.is_revoked(jwt_payload)
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({'error': 'Token has been revoked'}), 401
+    
+    # Authorization cache used by the auth middleware
+    from app.services.auth_cache import user_auth_cache
+    user_auth_cache.init_app(app)
+    
+    # Revocation list used by stateless (claims based) authorization
+    from app.services.token_revocation import token_revocations
+    token_revocations.init_app(app)
+    
+    # In-memory login attempts / last_login, flushed to the DB in batches
+    from app.services.login_tracker import login_tracker
+    login_tracker.init_app(app)
+    
     # Register blueprints
-    from app.routes import auth_bp, user_bp
+    from app.routes import auth_bp, user_bp, admin_bp
     app.register_blueprint(auth_bp)
     app.register_blueprint(user_bp)
+    app.register_blueprint(admin_bp)
     
     # Health check endpoint
     @app.route('/health', methods=['GET'])
     def health_check():
         return jsonify({
             'status': 'healthy',
-            'message': 'Neexa Backend API is running'
+            'message': 'Neexa Backend API is running',
+            'password_hashing': hasher.stats(),
+            'compression': compression.stats(),
+            'database': query_stats.stats(),
+            'database_pool': pool_stats.stats()
         }), 200
     
     # API info endpoint
@@ -72,7 +139,9 @@ def create_app(config_name=None):
             'endpoints': {
                 'auth': '/api/auth',
                 'user': '/api/user',
-                'health': '/health'
+                'admin': '/api/admin',
+                'health': '/health',
+                'metrics': '/metrics'
             }
         }), 200
     
@@ -1,9 +1,36 @@
 from functools import wraps
-from flask import jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
-from app.models.user import User
-from app import db
-from datetime import datetime
+from flask import jsonify, request, current_app, make_response, g
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from app.services.auth_cache import user_auth_cache, ClaimsUser
+from app.services.token_revocation import token_revocations
+from app.services.login_tracker import login_tracker
+from app.utils.revocation import REVOKED, LOCKED
+from app.utils.rate_limit import rate_limits
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+import math
+
+def _current_user():
+    """Resolve the user for the verified JWT as a (user, is_locked) tuple
+    
+    With AUTH_STATELESS enabled, tokens carrying a token_version claim are
+    authorized from their signed claims plus the in-memory revocation list,
+    without touching the database. Older tokens fall back to the cached lookup.
+    """
+    user_id = get_jwt_identity()
+    
+    if current_app.config.get('AUTH_STATELESS'):
+        claims = get_jwt()
+        if 'token_version' in claims:
+            status = token_revocations.check(user_id, claims['token_version'])
+            if status == REVOKED or not claims.get('active', True):
+                return None, False
+            return ClaimsUser(user_id, claims), status == LOCKED
+    
+    # Check if user exists and is active (served from the auth cache when warm)
+    user = user_auth_cache.get_user(user_id)
+    if not user:
+        return None, False
+    return user, login_tracker.is_locked(user)
 
 def token_required(f):
     """Decorator to require valid JWT token"""
@@ -11,18 +38,21 @@ def token_required(f):
     def decorated(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
             
-            # Check if user exists and is active
-            user = User.query.filter_by(id=user_id, is_active=True).first()
+            user, locked = _current_user()
             if not user:
                 return jsonify({'message': 'User not found or inactive'}), 401
             
             # Check if account is locked
-            if user.is_locked():
+            if locked:
                 return jsonify({'message': 'Account is temporarily locked due to multiple failed login attempts'}), 423
             
+            # Read by rate_limit_by_user below, so the JWT is verified only once
+            g._rate_limit_user_id = user.id
             return f(user, *args, **kwargs)
+        except PoolTimeoutError:
+            # Answered with 503 by pool_stats, not as a bad token
+            raise
         except Exception as e:
             return jsonify({'message': 'Invalid token or token expired'}), 401
     
@@ -34,32 +64,76 @@ def admin_required(f):
     def decorated(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
             
-            user = User.query.filter_by(id=user_id, is_active=True).first()
+            user, _ = _current_user()
             if not user:
                 return jsonify({'message': 'User not found or inactive'}), 401
             
-            # Add admin check here when admin role is implemented
-            # For now, we'll just require a valid user
+            # No role column yet: admins are the verified accounts listed in
+            # ADMIN_EMAILS. Anyone can register any email, but registration
+            # never verifies it; `flask create_admin` does
+            if not user.is_verified or user.email not in current_app.config.get('ADMIN_EMAILS', ()):
+                return jsonify({'message': 'Admin access required'}), 403
+            
+            g._rate_limit_user_id = user.id
             return f(user, *args, **kwargs)
+        except PoolTimeoutError:
+            # Answered with 503 by pool_stats, not as a bad token
+            raise
         except Exception as e:
             return jsonify({'message': 'Admin access required'}), 403
     
     return decorated
 
-def rate_limit_by_user(f):
-    """Decorator to implement rate limiting per user"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # Simple rate limiting implementation
-        # In production, use Redis or similar
-        user_id = get_jwt_identity() if verify_jwt_in_request(optional=True) else None
+def rate_limit_by_user(f=None, limit=None, key='user', algorithm=None):
+    """Decorator to implement rate limiting per user (or per client IP)
+    
+    Usable bare (``@rate_limit_by_user``, applying RATELIMIT_DEFAULT) or with
+    arguments: ``limit`` is a limit string such as '5 per minute' or the name
+    of a config key holding one, ``key`` is 'user' (falling back to the client
+    IP for anonymous requests) or 'ip', and ``algorithm`` is 'token_bucket' or
+    'sliding_window'. Rejected requests get a 429 with Retry-After.
+    
+    Per-user limits go below ``@token_required`` / ``@admin_required`` and use
+    the user they resolved. Client IPs come from ``request.remote_addr``, which
+    honours X-Forwarded-For when PROXY_FIX_X_FOR is set.
+    """
+    if isinstance(f, str):
+        f, limit = None, f
+    
+    def decorator(view):
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            config = current_app.config
+            if not config.get('RATELIMIT_ENABLED', True):
+                return view(*args, **kwargs)
+            
+            # Popped so a later request in the same app context starts clean
+            identity = g.pop('_rate_limit_user_id', None)
+            if key != 'user':
+                identity = None
+            client = f'user:{identity}' if identity is not None else f'ip:{request.remote_addr}'
+            
+            route_limit = config.get(limit, limit) if limit else config.get('RATELIMIT_DEFAULT')
+            result = rate_limits.hit(f'{request.endpoint}:{client}', route_limit, algorithm)
+            
+            if not result.allowed:
+                retry_after = max(1, int(math.ceil(result.retry_after)))
+                response = jsonify({'error': 'Rate limit exceeded', 'retry_after': retry_after})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(retry_after)
+                response.headers['X-RateLimit-Limit'] = str(result.limit)
+                response.headers['X-RateLimit-Remaining'] = '0'
+                return response
+            
+            response = make_response(view(*args, **kwargs))
+            response.headers['X-RateLimit-Limit'] = str(result.limit)
+            response.headers['X-RateLimit-Remaining'] = str(result.remaining)
+            return response
         
-        # Add rate limiting logic here
-        return f(*args, **kwargs)
+        return decorated
     
-    return decorated
+    return decorator(f) if f is not None else decorator
 
 def validate_request_content_type(f):
     """Decorator to validate request content type"""
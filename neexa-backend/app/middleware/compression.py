@@ -0,0 +1,144 @@
+import threading
+import time
+import zlib
+from flask import request
+import logging
+
+logger = logging.getLogger(__name__)
+
+# zlib wbits for each content coding: gzip container vs zlib ("deflate")
+_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+
+class Compression:
+    """gzip / deflate response compression applied in after_request
+
+    The coding is negotiated from Accept-Encoding. Bodies smaller than
+    ``COMPRESS_MIN_SIZE`` bytes are sent as is since the framing overhead
+    outweighs the saving. Streamed responses are passed through untouched
+    unless ``COMPRESS_STREAMS`` is set, in which case each chunk is
+    compressed and sync-flushed so the client still receives data as it is
+    produced. Counters track bytes saved and CPU time spent compressing.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.level = 6
+        self.min_size = 500
+        self.mimetypes = set()
+        self.compress_streams = True
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.responses = 0
+        self.streams = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def init_app(self, app):
+        """Configure compression from the application config"""
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.level = app.config.get('COMPRESS_LEVEL', 6)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES', ('application/json',)))
+        self.compress_streams = app.config.get('COMPRESS_STREAMS', True)
+        with self._lock:
+            self._reset_stats()
+        app.after_request(self.after_request)
+        app.extensions['compression'] = self
+
+    def _record(self, size_in, size_out, cpu, stream=False):
+        with self._lock:
+            if stream:
+                self.streams += 1
+            else:
+                self.responses += 1
+            self.bytes_in += size_in
+            self.bytes_out += size_out
+            self.cpu_seconds += cpu
+
+    def after_request(self, response):
+        """Compress ``response`` if the client accepts it and it is worth it"""
+        if not self.enabled or response.mimetype not in self.mimetypes:
+            return response
+
+        # Caches must keep compressed and plain variants apart
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')
+                or request.method == 'HEAD'):
+            return response
+
+        coding = request.accept_encodings.best_match(('gzip', 'deflate'))
+        if coding is None:
+            return response
+
+        if response.is_streamed:
+            if not self.compress_streams or response.direct_passthrough:
+                return response
+            response.response = self._compress_stream(response.response, coding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            started = time.thread_time()
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[coding])
+            compressed = compressor.compress(data) + compressor.flush()
+            self._record(len(data), len(compressed), time.thread_time() - started)
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = coding
+        # The encoded bytes differ, so a strong validator no longer applies
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _compress_stream(self, chunks, coding):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[coding])
+        size_in = size_out = 0
+        cpu = 0.0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                started = time.thread_time()
+                out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                cpu += time.thread_time() - started
+                size_in += len(chunk)
+                size_out += len(out)
+                if out:
+                    yield out
+            started = time.thread_time()
+            out = compressor.flush()
+            cpu += time.thread_time() - started
+            size_out += len(out)
+            yield out
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+            self._record(size_in, size_out, cpu, stream=True)
+
+    def stats(self):
+        """Return compressed response counts, bytes saved and CPU spent"""
+        with self._lock:
+            return {
+                'responses': self.responses,
+                'streams': self.streams,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved': self.bytes_in - self.bytes_out,
+                'cpu_ms': round(self.cpu_seconds * 1000, 3),
+            }
+
+
+compression = Compression()
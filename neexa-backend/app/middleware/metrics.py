@@ -0,0 +1,268 @@
+import hmac
+import ipaddress
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, request
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram upper bounds in seconds (+Inf is implied)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Rebuild the buffer list (folding in threads that have exited) every N new buffers
+_COMPACT_EVERY = 64
+
+
+class _RouteStats:
+    __slots__ = ('buckets', 'duration_sum', 'count', 'statuses', 'in_flight',
+                 'request_bytes', 'response_bytes', 'response_count')
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * (bucket_count + 1)
+        self.duration_sum = 0.0
+        self.count = 0
+        self.statuses = {}
+        self.in_flight = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.response_count = 0
+
+    def merge(self, other):
+        for i, value in enumerate(other.buckets):
+            self.buckets[i] += value
+        self.duration_sum += other.duration_sum
+        self.count += other.count
+        for status, value in list(other.statuses.items()):
+            self.statuses[status] = self.statuses.get(status, 0) + value
+        self.in_flight += other.in_flight
+        self.request_bytes += other.request_bytes
+        self.response_bytes += other.response_bytes
+        self.response_count += other.response_count
+
+
+class RequestMetrics:
+    """Per-route request metrics exported in Prometheus text format
+
+    Every thread records into its own buffer, so the request path takes no
+    lock; buffers are only summed when /metrics is scraped. Buffers of
+    threads that have exited (the development server uses one thread per
+    request) are folded into a shared total and dropped.
+
+    Metrics are per worker process; scrape each worker, or aggregate them,
+    when running several.
+
+    Scrapes can be restricted with METRICS_TOKEN (sent as a bearer token)
+    and/or METRICS_ALLOWED_IPS (addresses or networks); when both are set a
+    scrape must pass both.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.buckets = DEFAULT_BUCKETS
+        self.token = None
+        self.allowed_networks = ()
+        self._local = threading.local()
+        self._buffers = []
+        self._retired = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._collectors = []
+
+    def init_app(self, app):
+        """Register the request hooks and the /metrics endpoint"""
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.buckets = tuple(app.config.get('METRICS_LATENCY_BUCKETS', DEFAULT_BUCKETS))
+        self.token = app.config.get('METRICS_TOKEN') or None
+        self.allowed_networks = tuple(
+            ipaddress.ip_network(network, strict=False) for network in app.config.get('METRICS_ALLOWED_IPS', ())
+        )
+        with self._lock:
+            self._local = threading.local()
+            self._buffers = []
+            self._retired = {}
+        self._collectors = []
+        app.extensions['request_metrics'] = self
+
+        if not self.enabled:
+            return
+        if not (self.token or self.allowed_networks or app.debug or app.testing):
+            logger.warning('Metrics are served without METRICS_TOKEN or METRICS_ALLOWED_IPS; '
+                           'anyone reaching the API can read them')
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'), 'metrics', self.metrics_view)
+
+    def add_collector(self, collector):
+        """Append the exposition lines returned by ``collector()`` to every scrape"""
+        self._collectors.append(collector)
+
+    def _buffer(self):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = {}
+            with self._lock:
+                self._buffers.append((threading.current_thread(), buffer))
+                self._created += 1
+                if self._created % _COMPACT_EVERY == 0:
+                    self._compact()
+        return buffer
+
+    def _compact(self):
+        """Fold buffers of exited threads into the retired totals (caller holds the lock)"""
+        alive = []
+        for thread, buffer in self._buffers:
+            if thread.is_alive():
+                alive.append((thread, buffer))
+                continue
+            for key, stats in buffer.items():
+                retired = self._retired.get(key)
+                if retired is None:
+                    retired = self._retired[key] = _RouteStats(len(self.buckets))
+                retired.merge(stats)
+        self._buffers = alive
+
+    def _stats(self, key):
+        buffer = self._buffer()
+        stats = buffer.get(key)
+        if stats is None:
+            stats = buffer[key] = _RouteStats(len(self.buckets))
+        return stats
+
+    def _before_request(self):
+        rule = request.url_rule
+        stats = self._stats((request.method, rule.rule if rule is not None else 'unmatched'))
+        stats.in_flight += 1
+        # One context-local write here and one read per later hook keeps the
+        # per-request cost low; the stats object is this thread's own
+        g._metrics = (stats, time.perf_counter(), request.environ)
+
+    def _after_request(self, response):
+        state = g.get('_metrics')
+        if state is None:
+            return response
+        stats, started, environ = state
+        elapsed = time.perf_counter() - started
+
+        stats.buckets[bisect_left(self.buckets, elapsed)] += 1
+        stats.duration_sum += elapsed
+        stats.count += 1
+        status = response.status_code
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        request_length = environ.get('CONTENT_LENGTH')
+        if request_length:
+            stats.request_bytes += int(request_length)
+        # Streamed bodies have no length up front and are not counted
+        response_length = response.headers.get('Content-Length')
+        if response_length is not None:
+            stats.response_bytes += int(response_length)
+            stats.response_count += 1
+        return response
+
+    def _teardown_request(self, exception=None):
+        state = g.pop('_metrics', None)
+        if state is not None:
+            state[0].in_flight -= 1
+
+    def snapshot(self):
+        """Sum the per-thread buffers into {(method, route): _RouteStats}"""
+        with self._lock:
+            self._compact()
+            sources = [self._retired] + [buffer for _, buffer in self._buffers]
+
+        totals = {}
+        for source in sources:
+            for key, stats in list(source.items()):
+                total = totals.get(key)
+                if total is None:
+                    total = totals[key] = _RouteStats(len(self.buckets))
+                total.merge(stats)
+        return totals
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        totals = self.snapshot()
+        keys = sorted(totals)
+        lines = []
+
+        def labels(key, **extra):
+            method, route = key
+            pairs = [('method', method), ('route', route)] + list(extra.items())
+            escaped = (f'{name}="{_escape(str(value))}"' for name, value in pairs)
+            return '{' + ','.join(escaped) + '}'
+
+        lines.append('# HELP neexa_http_requests_total Requests handled, by status code')
+        lines.append('# TYPE neexa_http_requests_total counter')
+        for key in keys:
+            for status, value in sorted(totals[key].statuses.items()):
+                lines.append(f'neexa_http_requests_total{labels(key, status=status)} {value}')
+
+        lines.append('# HELP neexa_http_request_duration_seconds Request latency')
+        lines.append('# TYPE neexa_http_request_duration_seconds histogram')
+        for key in keys:
+            stats = totals[key]
+            cumulative = 0
+            for bound, value in zip(self.buckets + (float('inf'),), stats.buckets):
+                cumulative += value
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'neexa_http_request_duration_seconds_bucket{labels(key, le=le)} {cumulative}')
+            lines.append(f'neexa_http_request_duration_seconds_sum{labels(key)} {stats.duration_sum}')
+            lines.append(f'neexa_http_request_duration_seconds_count{labels(key)} {stats.count}')
+
+        lines.append('# HELP neexa_http_requests_in_flight Requests currently being handled')
+        lines.append('# TYPE neexa_http_requests_in_flight gauge')
+        for key in keys:
+            lines.append(f'neexa_http_requests_in_flight{labels(key)} {totals[key].in_flight}')
+
+        lines.append('# HELP neexa_http_request_size_bytes Request body sizes')
+        lines.append('# TYPE neexa_http_request_size_bytes summary')
+        for key in keys:
+            lines.append(f'neexa_http_request_size_bytes_sum{labels(key)} {totals[key].request_bytes}')
+            lines.append(f'neexa_http_request_size_bytes_count{labels(key)} {totals[key].count}')
+
+        lines.append('# HELP neexa_http_response_size_bytes Response body sizes (streamed bodies excluded)')
+        lines.append('# TYPE neexa_http_response_size_bytes summary')
+        for key in keys:
+            lines.append(f'neexa_http_response_size_bytes_sum{labels(key)} {totals[key].response_bytes}')
+            lines.append(f'neexa_http_response_size_bytes_count{labels(key)} {totals[key].response_count}')
+
+        for collector in self._collectors:
+            lines.extend(collector())
+
+        return '\n'.join(lines) + '\n'
+
+    def _allowed_client(self):
+        if not self.allowed_networks:
+            return True
+        try:
+            address = ipaddress.ip_address(request.remote_addr)
+        except ValueError:
+            return False
+        return any(address in network for network in self.allowed_networks)
+
+    def _valid_token(self):
+        if self.token is None:
+            return True
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(token.encode(), self.token.encode())
+
+    def metrics_view(self):
+        """Prometheus scrape endpoint"""
+        if not self._allowed_client():
+            return Response('Forbidden\n', status=403, content_type='text/plain')
+        if not self._valid_token():
+            return Response('Unauthorized\n', status=401, content_type='text/plain',
+                            headers={'WWW-Authenticate': 'Bearer realm="metrics"'})
+        return Response(self.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_metrics = RequestMetrics()
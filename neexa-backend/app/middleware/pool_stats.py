@@ -0,0 +1,164 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import jsonify
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Checkout wait histogram upper bounds in seconds (+Inf is implied)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection
+
+    The wait covers queueing for a free connection and opening a new one
+    within the overflow. ``engine.dispose()`` recreates the pool with the same
+    class, so forked workers stay instrumented.
+    """
+
+    def _do_get(self):
+        pool_stats.waiting_started()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_checkout(time.perf_counter() - started, timed_out=True)
+            logger.warning(f"Connection pool exhausted: {self.status()}")
+            raise
+        except BaseException:
+            pool_stats.waiting_finished()
+            raise
+        pool_stats.record_checkout(time.perf_counter() - started)
+        return connection
+
+
+class PoolInstrumentation:
+    """Connection pool saturation metrics
+
+    Engines configured with a ``pool_size`` use :class:`InstrumentedQueuePool`,
+    which records checkout waits, timeouts and the threads currently waiting.
+    Pool occupancy (size, in use, overflow) is read from the live pool when
+    metrics are rendered. A checkout that times out is answered with
+    503 and Retry-After instead of a generic 500.
+
+    Counters are per worker process, like the request metrics.
+    """
+
+    def __init__(self):
+        self._db = None
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_sum = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+
+    def init_app(self, app, db):
+        """Select the instrumented pool; must run before ``db.init_app`` creates the engine"""
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        if 'pool_size' in options and 'poolclass' not in options:
+            options['poolclass'] = InstrumentedQueuePool
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        self._db = db
+        with self._lock:
+            self._reset_stats()
+
+        app.register_error_handler(PoolTimeoutError, self._pool_timeout)
+        app.extensions['pool_stats'] = self
+
+    def _pool_timeout(self, error):
+        response = jsonify({'error': 'Service temporarily unavailable'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+    def waiting_started(self):
+        with self._lock:
+            self.waiting += 1
+
+    def waiting_finished(self):
+        with self._lock:
+            self.waiting -= 1
+
+    def record_checkout(self, seconds, timed_out=False):
+        with self._lock:
+            self.waiting -= 1
+            self.buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+            self.wait_sum += seconds
+            self.checkouts += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def _pool(self):
+        """The current engine's pool if it is a QueuePool (None for StaticPool/NullPool)"""
+        if self._db is None:
+            return None
+        pool = self._db.engine.pool
+        return pool if isinstance(pool, QueuePool) else None
+
+    def stats(self):
+        """Return pool occupancy and checkout counters"""
+        pool = self._pool()
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'waiting': self.waiting,
+                'wait_seconds_total': round(self.wait_sum, 6),
+            }
+        if pool is not None:
+            stats.update({
+                'size': pool.size(),
+                'in_use': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+            })
+        return stats
+
+    def render(self):
+        """Prometheus exposition lines, added to /metrics by the request metrics"""
+        stats = self.stats()
+        with self._lock:
+            buckets = list(self.buckets)
+        lines = []
+
+        if 'size' in stats:
+            for name, key, help_text in (
+                ('neexa_db_pool_size', 'size', 'Connections kept open by the pool'),
+                ('neexa_db_pool_max_overflow', 'max_overflow', 'Connections allowed beyond the pool size'),
+                ('neexa_db_pool_in_use', 'in_use', 'Connections currently checked out'),
+                ('neexa_db_pool_overflow', 'overflow', 'Overflow connections currently open'),
+            ):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {stats[key]}')
+
+        lines.append('# HELP neexa_db_pool_waiting Threads waiting for a connection')
+        lines.append('# TYPE neexa_db_pool_waiting gauge')
+        lines.append(f"neexa_db_pool_waiting {stats['waiting']}")
+
+        lines.append('# HELP neexa_db_pool_checkout_wait_seconds Time to obtain a connection from the pool')
+        lines.append('# TYPE neexa_db_pool_checkout_wait_seconds histogram')
+        cumulative = 0
+        for bound, value in zip(WAIT_BUCKETS + (float('inf'),), buckets):
+            cumulative += value
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'neexa_db_pool_checkout_wait_seconds_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"neexa_db_pool_checkout_wait_seconds_sum {stats['wait_seconds_total']}")
+        lines.append(f"neexa_db_pool_checkout_wait_seconds_count {stats['checkouts']}")
+
+        lines.append('# HELP neexa_db_pool_timeouts_total Checkouts that gave up after pool_timeout')
+        lines.append('# TYPE neexa_db_pool_timeouts_total counter')
+        lines.append(f"neexa_db_pool_timeouts_total {stats['timeouts']}")
+        return lines
+
+
+pool_stats = PoolInstrumentation()
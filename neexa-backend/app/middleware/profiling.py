@@ -0,0 +1,187 @@
+import cProfile
+import hashlib
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from flask import g, request
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Request'
+# Signed trigger headers are accepted for this many seconds around their timestamp
+SIGNATURE_MAX_AGE = 300
+
+_SUFFIXES = ('.prof', '.folded')
+
+# Secrets that ship in env.example or docs and so must not key the trigger header
+_PLACEHOLDER_SECRETS = frozenset({'change-this-profiling-secret'})
+
+
+def sign_profile_request(secret, method, path, timestamp=None):
+    """Build the X-Profile-Request value that triggers profiling of one request"""
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    message = f'{timestamp}:{method}:{path}'.encode()
+    signature = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f'{timestamp}.{signature}'
+
+
+class _Sampler:
+    """Samples one thread's stack at a fixed interval into collapsed stacks"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})'.replace(';', ':'))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+class RequestProfiler:
+    """Profiles sampled or explicitly requested requests
+
+    Disabled unless ``PROFILING_ENABLED`` is set, in which case a request is
+    profiled when it carries a valid X-Profile-Request header (see
+    ``sign_profile_request``, keyed with ``PROFILING_SECRET``) or is picked by
+    ``PROFILING_SAMPLE_RATE``. ``PROFILING_MODE`` 'cprofile' writes a pstats
+    ``.prof`` file; 'sampling' samples the request thread's stack every
+    ``PROFILING_SAMPLE_INTERVAL_MS`` and writes collapsed stacks (``.folded``,
+    the flame graph input format) at a much lower overhead. Only the newest
+    ``PROFILING_MAX_FILES`` files are kept in ``PROFILING_DIR``.
+
+    Enabling profiling without a real ``PROFILING_SECRET`` is refused unless
+    ``PROFILING_SAMPLE_RATE`` is set, in which case only sampling is used.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.mode = 'cprofile'
+        self.sample_rate = 0.0
+        self.secret = None
+        self.directory = 'profiles'
+        self.max_files = 100
+        self.interval = 0.005
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Register the profiling hooks when enabled in the config"""
+        self.enabled = app.config.get('PROFILING_ENABLED', False)
+        self.mode = app.config.get('PROFILING_MODE', 'cprofile')
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.secret = app.config.get('PROFILING_SECRET')
+        self.directory = app.config.get('PROFILING_DIR', 'profiles')
+        self.max_files = app.config.get('PROFILING_MAX_FILES', 100)
+        self.interval = app.config.get('PROFILING_SAMPLE_INTERVAL_MS', 5) / 1000
+        app.extensions['request_profiler'] = self
+
+        if not self.enabled:
+            return
+        if self.mode not in ('cprofile', 'sampling'):
+            raise ValueError(f"Unknown profiling mode '{self.mode}'")
+        if not self.secret or self.secret in _PLACEHOLDER_SECRETS:
+            if not self.sample_rate:
+                raise ValueError("PROFILING_ENABLED requires a PROFILING_SECRET (or a PROFILING_SAMPLE_RATE)")
+            logger.warning('PROFILING_SECRET is not set; only sampled requests will be profiled')
+            self.secret = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _signed(self):
+        value = request.headers.get(PROFILE_HEADER)
+        if not value or not self.secret:
+            return False
+        timestamp, _, signature = value.partition('.')
+        try:
+            if abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE:
+                return False
+        except ValueError:
+            return False
+        expected = sign_profile_request(self.secret, request.method, request.path, timestamp)
+        return hmac.compare_digest(expected, value)
+
+    def _before_request(self):
+        if not (self._signed() or (self.sample_rate and random.random() < self.sample_rate)):
+            return
+
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unmatched'}-{uuid.uuid4().hex[:8]}"
+        if self.mode == 'sampling':
+            profiler = _Sampler(threading.get_ident(), self.interval)
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already active on this thread
+                return
+        g._profile = (name, profiler)
+
+    def _after_request(self, response):
+        profile = g.get('_profile')
+        if profile is not None:
+            response.headers['X-Profile-Id'] = profile[0]
+        return response
+
+    def _teardown_request(self, exception=None):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return
+        name, profiler = profile
+        try:
+            if isinstance(profiler, _Sampler):
+                profiler.stop()
+                profiler.dump(os.path.join(self.directory, name + '.folded'))
+            else:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.directory, name + '.prof'))
+            self._enforce_retention()
+        except OSError as e:
+            logger.error(f"Error writing request profile {name}: {str(e)}")
+
+    def _enforce_retention(self):
+        """Delete the oldest profiles beyond PROFILING_MAX_FILES"""
+        with self._lock:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(_SUFFIXES)]
+            if len(entries) <= self.max_files:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.max_files]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+request_profiler = RequestProfiler()
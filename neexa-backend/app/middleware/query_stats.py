@@ -0,0 +1,122 @@
+import threading
+import time
+from flask import g, has_app_context, request
+from sqlalchemy import event
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _redact(parameters):
+    """Describe bound parameters by type only, never by value"""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f'<{len(parameters)} parameter sets>'
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class QueryInstrumentation:
+    """Counts SQL statements and database time per request
+
+    Engine ``before/after_cursor_execute`` events feed a per-request tally
+    kept on ``g``. Statements slower than ``SQL_SLOW_QUERY_MS`` are logged
+    with their parameters redacted to types. A request issuing more than its
+    route's budget (``SQL_QUERY_BUDGETS`` by endpoint, else
+    ``SQL_QUERY_BUDGET``) is logged with the statements it repeated, which is
+    what an N+1 pattern looks like. In debug and testing the tally is also
+    returned as X-Query-Count / X-Query-Time-Ms headers.
+    """
+
+    def __init__(self):
+        self.slow_query_ms = 200
+        self.default_budget = 10
+        self.budgets = {}
+        self.headers = False
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.queries = 0
+        self.slow_queries = 0
+        self.requests_over_budget = 0
+
+    def init_app(self, app, db):
+        """Attach the engine listeners and request hooks"""
+        self.slow_query_ms = app.config.get('SQL_SLOW_QUERY_MS', 200)
+        self.default_budget = app.config.get('SQL_QUERY_BUDGET', 10)
+        self.budgets = dict(app.config.get('SQL_QUERY_BUDGETS', {}))
+        headers = app.config.get('SQL_QUERY_HEADERS')
+        self.headers = (app.debug or app.testing) if headers is None else headers
+        with self._lock:
+            self._reset_stats()
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.extensions['query_stats'] = self
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+
+        slow = elapsed * 1000 >= self.slow_query_ms
+        with self._lock:
+            self.queries += 1
+            if slow:
+                self.slow_queries += 1
+        if slow:
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {statement} params={_redact(parameters)}")
+
+        # Only statements issued between before_request and after_request count
+        tally = g.get('_query_tally') if has_app_context() else None
+        if tally is None:
+            return
+        tally['count'] += 1
+        tally['seconds'] += elapsed
+        tally['statements'][statement] = tally['statements'].get(statement, 0) + 1
+
+    def _before_request(self):
+        g._query_tally = {'count': 0, 'seconds': 0.0, 'statements': {}}
+
+    def _after_request(self, response):
+        tally = g.pop('_query_tally', None)
+        if tally is None:
+            return response
+        count = tally['count']
+
+        if self.headers:
+            response.headers['X-Query-Count'] = str(count)
+            response.headers['X-Query-Time-Ms'] = f"{tally['seconds'] * 1000:.2f}"
+
+        budget = self.budgets.get(request.endpoint, self.default_budget)
+        if budget is not None and count > budget:
+            with self._lock:
+                self.requests_over_budget += 1
+            repeated = sorted(((n, s) for s, n in tally['statements'].items() if n > 1), reverse=True)
+            detail = '; '.join(f"{n}x {' '.join(s.split())[:120]}" for n, s in repeated[:3])
+            logger.warning(
+                f"Query budget exceeded on {request.method} {request.path} ({request.endpoint}): "
+                f"{count} queries > {budget}" + (f", repeated: {detail}" if detail else '')
+            )
+        return response
+
+    def stats(self):
+        """Return process-wide query counters"""
+        with self._lock:
+            return {
+                'queries': self.queries,
+                'slow_queries': self.slow_queries,
+                'requests_over_budget': self.requests_over_budget,
+            }
+
+
+query_stats = QueryInstrumentation()
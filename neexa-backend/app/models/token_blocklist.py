@@ -0,0 +1,18 @@
+from datetime import datetime
+
+# db will be imported from app.__init__
+from app import db
+
+class TokenBlocklist(db.Model):
+    """Revoked JWTs (by JTI), kept until the token would have expired anyway"""
+    __tablename__ = 'token_blocklist'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False, index=True)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(db.Integer, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<TokenBlocklist {self.jti}>'
@@ -1,14 +1,22 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, create_refresh_token
-import re
 
 # db will be imported from app.__init__
 from app import db
+from app.utils.hashing import hasher
+from app.utils import validation
 
 class User(db.Model):
     """User model for authentication and user management"""
     __tablename__ = 'users'
+    __table_args__ = (
+        # Keyset pagination for the admin listing: each filter has an index
+        # ending in the sort key so pages are served by a single range scan
+        db.Index('idx_is_active', 'is_active', 'id'),
+        db.Index('idx_created_at', 'created_at', 'id'),
+        db.Index('idx_users_verified', 'is_verified', 'id'),
+        db.Index('idx_users_active_verified', 'is_active', 'is_verified', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -22,6 +30,7 @@ class User(db.Model):
     last_login = db.Column(db.DateTime)
     login_attempts = db.Column(db.Integer, default=0)
     locked_until = db.Column(db.DateTime)
+    token_version = db.Column(db.Integer, default=0, nullable=False)
     
     # Profile information
     phone = db.Column(db.String(20))
@@ -41,55 +50,57 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set the user's password"""
-        if not self.validate_password(password):
-            raise ValueError("Password does not meet security requirements")
-        self.password_hash = generate_password_hash(password)
+        is_valid, message = self.validate_password(password)
+        if not is_valid:
+            raise ValueError(message)
+        self.password_hash = hasher.generate(password)
     
     def check_password(self, password):
         """Check if the provided password matches the user's password"""
-        return check_password_hash(self.password_hash, password)
+        return hasher.verify(self.password_hash, password)
     
     @staticmethod
     def validate_password(password):
         """Validate password strength"""
-        if len(password) < 8:
-            return False, "Password must be at least 8 characters long"
-        
-        if not re.search(r'[A-Z]', password):
-            return False, "Password must contain at least one uppercase letter"
-        
-        if not re.search(r'[a-z]', password):
-            return False, "Password must contain at least one lowercase letter"
-        
-        if not re.search(r'\d', password):
-            return False, "Password must contain at least one digit"
-        
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            return False, "Password must contain at least one special character"
-        
-        return True, "Password is valid"
+        return validation.validate_password(password)
     
     @staticmethod
     def validate_email(email):
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        return validation.validate_email(email)
+    
+    def token_claims(self):
+        """Claims embedded in access tokens, enough to authorize without a DB lookup"""
+        return {
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'active': self.is_active,
+            'token_version': self.token_version or 0,
+            'is_verified': self.is_verified,
+            'preferred_currency': self.preferred_currency,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'last_login': self.last_login.isoformat() if self.last_login else None
+        }
     
     def generate_tokens(self):
         """Generate access and refresh tokens for the user"""
         access_token = create_access_token(
             identity=self.id,
-            additional_claims={
-                'email': self.email,
-                'first_name': self.first_name,
-                'last_name': self.last_name
-            }
+            additional_claims=self.token_claims()
+        )
+        refresh_token = create_refresh_token(
+            identity=self.id,
+            additional_claims={'token_version': self.token_version or 0}
         )
-        refresh_token = create_refresh_token(identity=self.id)
         return access_token, refresh_token
     
     def update_login_info(self):
-        """Update last login timestamp and reset login attempts"""
+        """Update last login timestamp and reset login attempts
+        
+        Logins go through LoginActivityTracker, which batches these writes.
+        """
         self.last_login = datetime.utcnow()
         self.login_attempts = 0
         self.locked_until = None
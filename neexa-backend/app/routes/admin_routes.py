@@ -0,0 +1,37 @@
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from app.services.admin_service import AdminService
+from app.middleware.auth import admin_required, rate_limit_by_user
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+import logging
+
+logger = logging.getLogger(__name__)
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+@admin_bp.route('/users/export', methods=['GET'])
+@admin_required
+@rate_limit_by_user
+def export_users(user):
+    """Stream all users as NDJSON"""
+    logger.info(f"User export requested by: {user.email}")
+    batch_size = current_app.config.get('ADMIN_EXPORT_BATCH_SIZE', 1000)
+    return Response(
+        stream_with_context(AdminService.export_users(batch_size)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=users.ndjson'}
+    )
+
+@admin_bp.route('/users', methods=['GET'])
+@admin_required
+@rate_limit_by_user
+def list_users(user):
+    """List users with filters and cursor pagination"""
+    try:
+        response, status_code = AdminService.list_users(request.args.to_dict())
+        return jsonify(response), status_code
+        
+    except PoolTimeoutError:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error listing users: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
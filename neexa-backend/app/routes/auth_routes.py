@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt, get_jwt_identity
+from app.models.user import User
 from app.services.user_service import UserService
-from app.middleware.auth import token_required, validate_request_content_type
+from app.services.token_denylist import token_denylist
+from app.middleware.auth import token_required, rate_limit_by_user, validate_request_content_type
+from app.utils.http_cache import user_etag, not_modified, private_cache
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,6 +13,7 @@ logger = logging.getLogger(__name__)
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit_by_user('RATELIMIT_AUTH', key='ip')
 @validate_request_content_type
 def register():
     """Register a new user"""
@@ -20,11 +25,14 @@ def register():
         response, status_code = UserService.register_user(data)
         return jsonify(response), status_code
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in register endpoint: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit_by_user('RATELIMIT_AUTH', key='ip')
 @validate_request_content_type
 def login():
     """Authenticate user login"""
@@ -36,23 +44,37 @@ def login():
         response, status_code = UserService.login_user(data)
         return jsonify(response), status_code
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in login endpoint: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @auth_bp.route('/refresh', methods=['POST'])
+@rate_limit_by_user('RATELIMIT_AUTH', key='ip')
 @jwt_required(refresh=True)
 def refresh():
     """Refresh access token"""
     try:
         current_user_id = get_jwt_identity()
-        new_access_token = create_access_token(identity=current_user_id)
+        
+        # Refresh is infrequent, so reload the user to embed current claims
+        user = User.query.filter_by(id=current_user_id, is_active=True).first()
+        if not user or get_jwt().get('token_version', 0) < (user.token_version or 0):
+            return jsonify({'error': 'User not found or token revoked'}), 401
+        
+        new_access_token = create_access_token(
+            identity=current_user_id,
+            additional_claims=user.token_claims()
+        )
         
         return jsonify({
             'access_token': new_access_token,
             'message': 'Token refreshed successfully'
         }), 200
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Error refreshing token: {str(e)}")
         return jsonify({'error': 'Failed to refresh token'}), 500
@@ -60,16 +82,34 @@ def refresh():
 @auth_bp.route('/logout', methods=['POST'])
 @token_required
 def logout(user):
-    """Logout user (client-side token removal)"""
+    """Logout user by revoking the access token (and refresh token if sent)"""
     try:
-        # In a stateless JWT system, logout is handled client-side
-        # You could implement token blacklisting here if needed
+        data = request.get_json(silent=True) or {}
+        refresh_token = data.get('refresh_token')
+        decoded_refresh = None
+        if refresh_token:
+            try:
+                decoded_refresh = decode_token(refresh_token)
+            except Exception as e:
+                logger.warning(f"Ignoring invalid refresh token on logout: {str(e)}")
+        
+        # Only the caller's own refresh token may be revoked
+        if decoded_refresh is not None and str(decoded_refresh.get('sub')) != str(user.id):
+            logger.warning(f"Refresh token of another user sent on logout by {user.email}")
+            return jsonify({'error': 'Refresh token does not belong to the current user'}), 400
+        
+        token_denylist.revoke(get_jwt())
+        if decoded_refresh is not None:
+            token_denylist.revoke(decoded_refresh)
+        
         logger.info(f"User logged out: {user.email}")
         
         return jsonify({
             'message': 'Logout successful'
         }), 200
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Error during logout: {str(e)}")
         return jsonify({'error': 'Logout failed'}), 500
@@ -79,10 +119,18 @@ def logout(user):
 def get_current_user(user):
     """Get current user information"""
     try:
-        return jsonify({
+        # Repeat polls with a matching ETag skip serialization entirely
+        etag = user_etag(user)
+        response = not_modified(etag)
+        if response:
+            return response
+        
+        return private_cache(jsonify({
             'user': user.to_dict()
-        }), 200
+        }), etag), 200
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Error getting current user: {str(e)}")
         return jsonify({'error': 'Failed to get user information'}), 500
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from app.services.user_service import UserService
-from app.middleware.auth import token_required, validate_request_content_type
+from app.middleware.auth import token_required, rate_limit_by_user, validate_request_content_type
+from app.services.auth_cache import ClaimsUser
+from app.utils.http_cache import user_etag, not_modified, private_cache
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,18 +12,32 @@ user_bp = Blueprint('user', __name__, url_prefix='/api/user')
 
 @user_bp.route('/profile', methods=['GET'])
 @token_required
+@rate_limit_by_user
 def get_profile(user):
     """Get user profile"""
     try:
+        # Claims-based users carry token-time timestamps, which may not match
+        # the profile row, so only DB-backed users get conditional responses
+        etag = None if isinstance(user, ClaimsUser) else user_etag(user)
+        if etag:
+            response = not_modified(etag)
+            if response:
+                return response
+        
         response, status_code = UserService.get_user_profile(user.id)
+        if etag and status_code == 200:
+            return private_cache(jsonify(response), etag), status_code
         return jsonify(response), status_code
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error getting profile: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @user_bp.route('/profile', methods=['PUT'])
 @token_required
+@rate_limit_by_user
 @validate_request_content_type
 def update_profile(user):
     """Update user profile"""
@@ -32,12 +49,15 @@ def update_profile(user):
         response, status_code = UserService.update_user_profile(user.id, data)
         return jsonify(response), status_code
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error updating profile: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @user_bp.route('/change-password', methods=['POST'])
 @token_required
+@rate_limit_by_user
 @validate_request_content_type
 def change_password(user):
     """Change user password"""
@@ -49,18 +69,23 @@ def change_password(user):
         response, status_code = UserService.change_password(user.id, data)
         return jsonify(response), status_code
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error changing password: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
 @user_bp.route('/deactivate', methods=['POST'])
 @token_required
+@rate_limit_by_user
 def deactivate_account(user):
     """Deactivate user account"""
     try:
         response, status_code = UserService.deactivate_user(user.id)
         return jsonify(response), status_code
         
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error deactivating account: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
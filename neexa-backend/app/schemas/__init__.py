@@ -3,14 +3,27 @@ from .user_schema import (
     UserLoginSchema,
     UserUpdateSchema,
     PasswordChangeSchema,
-    UserResponseSchema
+    UserResponseSchema,
+    user_registration_schema,
+    user_login_schema,
+    user_update_schema,
+    password_change_schema,
+    user_response_schema
 )
+from .admin_schema import AdminUserQuerySchema, admin_user_query_schema
 
 __all__ = [
     'UserRegistrationSchema',
     'UserLoginSchema', 
     'UserUpdateSchema',
     'PasswordChangeSchema',
-    'UserResponseSchema'
+    'UserResponseSchema',
+    'user_registration_schema',
+    'user_login_schema',
+    'user_update_schema',
+    'password_change_schema',
+    'user_response_schema',
+    'AdminUserQuerySchema',
+    'admin_user_query_schema'
 ]
 
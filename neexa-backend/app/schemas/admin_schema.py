@@ -0,0 +1,27 @@
+from marshmallow import Schema, fields, validate, validates, validates_schema, ValidationError
+
+class AdminUserQuerySchema(Schema):
+    """Schema for admin user listing query parameters"""
+    is_active = fields.Bool()
+    is_verified = fields.Bool()
+    created_after = fields.DateTime()
+    created_before = fields.DateTime()
+    email_prefix = fields.Str(validate=validate.Length(min=1, max=120))
+    limit = fields.Int(validate=validate.Range(min=1, max=200), load_default=50)
+    cursor = fields.Str()
+    
+    @validates('email_prefix')
+    def validate_email_prefix(self, value):
+        """Validate email prefix"""
+        if not value.strip():
+            raise ValidationError('Email prefix cannot be empty')
+    
+    @validates_schema
+    def validate_created_range(self, data, **kwargs):
+        """Validate that the created_at range is not inverted"""
+        after = data.get('created_after')
+        before = data.get('created_before')
+        if after and before and after >= before:
+            raise ValidationError('created_after must be earlier than created_before', 'created_after')
+
+admin_user_query_schema = AdminUserQuerySchema()
@@ -1,5 +1,5 @@
 from marshmallow import Schema, fields, validate, validates, ValidationError
-import re
+from app.utils.validation import password_error, validate_name, phone_digits
 
 class UserRegistrationSchema(Schema):
     """Schema for user registration validation"""
@@ -15,27 +15,16 @@ class UserRegistrationSchema(Schema):
     @validates('password')
     def validate_password(self, value):
         """Validate password strength"""
-        if len(value) < 8:
-            raise ValidationError('Password must be at least 8 characters long')
-        
-        if not re.search(r'[A-Z]', value):
-            raise ValidationError('Password must contain at least one uppercase letter')
-        
-        if not re.search(r'[a-z]', value):
-            raise ValidationError('Password must contain at least one lowercase letter')
-        
-        if not re.search(r'\d', value):
-            raise ValidationError('Password must contain at least one digit')
-        
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', value):
-            raise ValidationError('Password must contain at least one special character')
+        error = password_error(value)
+        if error:
+            raise ValidationError(error)
     
     @validates('first_name')
     def validate_first_name(self, value):
         """Validate first name"""
         if not value.strip():
             raise ValidationError('First name cannot be empty')
-        if not re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ\s]+$', value):
+        if not validate_name(value):
             raise ValidationError('First name can only contain letters and spaces')
     
     @validates('last_name')
@@ -43,7 +32,7 @@ class UserRegistrationSchema(Schema):
         """Validate last name"""
         if not value.strip():
             raise ValidationError('Last name cannot be empty')
-        if not re.match(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ\s]+$', value):
+        if not validate_name(value):
             raise ValidationError('Last name can only contain letters and spaces')
     
     @validates('phone')
@@ -51,7 +40,7 @@ class UserRegistrationSchema(Schema):
         """Validate phone number"""
         if value:
             # Remove all non-digit characters
-            digits_only = re.sub(r'\D', '', value)
+            digits_only = phone_digits(value)
             if len(digits_only) < 10 or len(digits_only) > 15:
                 raise ValidationError('Phone number must be between 10 and 15 digits')
 
@@ -77,20 +66,9 @@ class PasswordChangeSchema(Schema):
     @validates('new_password')
     def validate_new_password(self, value):
         """Validate new password strength"""
-        if len(value) < 8:
-            raise ValidationError('Password must be at least 8 characters long')
-        
-        if not re.search(r'[A-Z]', value):
-            raise ValidationError('Password must contain at least one uppercase letter')
-        
-        if not re.search(r'[a-z]', value):
-            raise ValidationError('Password must contain at least one lowercase letter')
-        
-        if not re.search(r'\d', value):
-            raise ValidationError('Password must contain at least one digit')
-        
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', value):
-            raise ValidationError('Password must contain at least one special character')
+        error = password_error(value)
+        if error:
+            raise ValidationError(error)
 
 class UserResponseSchema(Schema):
     """Schema for user response data"""
@@ -104,3 +82,10 @@ class UserResponseSchema(Schema):
     last_login = fields.DateTime()
     preferred_currency = fields.Str()
 
+# Schemas hold no per-request state, so one shared instance each is enough
+# and saves rebuilding the field and validator tables on every call
+user_registration_schema = UserRegistrationSchema()
+user_login_schema = UserLoginSchema()
+user_update_schema = UserUpdateSchema()
+password_change_schema = PasswordChangeSchema()
+user_response_schema = UserResponseSchema()
@@ -1,6 +1,7 @@
 from .user_service import UserService
+from .admin_service import AdminService
 
-__all__ = ['UserService']
+__all__ = ['UserService', 'AdminService']
 
 
 
@@ -0,0 +1,167 @@
+from flask import current_app
+from sqlalchemy import select, and_, or_
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from marshmallow import ValidationError
+from app import db
+from app.models.user import User
+from app.schemas.admin_schema import admin_user_query_schema
+from datetime import datetime, timezone
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def _encode_cursor(order, values):
+    payload = json.dumps([order, values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, order):
+    """Return the typed sort key values stored in ``cursor``"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_order, values = json.loads(payload)
+        if cursor_order == order == 'email':
+            return str(values[0]),
+        if cursor_order == order == 'created_at':
+            return datetime.fromisoformat(values[0]), int(values[1])
+        if cursor_order == order == 'id':
+            return int(values[0]),
+    except (ValueError, TypeError, IndexError):
+        raise InvalidCursor('Malformed cursor')
+    raise InvalidCursor('Cursor does not match the requested filters')
+
+
+def _escape_like(value, escape='/'):
+    """Escape LIKE wildcards so ``value`` matches literally"""
+    return value.replace(escape, escape * 2).replace('%', escape + '%').replace('_', escape + '_')
+
+
+def _naive_utc(value):
+    """created_at is stored as naive UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class AdminService:
+    """Service class for admin operations"""
+    
+    @staticmethod
+    def list_users(query_args):
+        """List users a page at a time with keyset (cursor) pagination
+        
+        The sort key follows the filters so each query is one index range
+        scan that seeks straight to the cursor instead of skipping rows:
+        
+        - ``email_prefix``: ordered by email, a ``LIKE 'prefix%'`` range on
+          the unique email index
+        - ``created_after`` / ``created_before``: ordered by (created_at, id)
+          (``idx_created_at``)
+        - otherwise: ordered by id, through ``idx_is_active``,
+          ``idx_users_verified`` or ``idx_users_active_verified`` when
+          filtering on the flags, or the primary key
+        """
+        try:
+            args = admin_user_query_schema.load(query_args)
+            
+            query = select(User)
+            if 'is_active' in args:
+                query = query.where(User.is_active == args['is_active'])
+            if 'is_verified' in args:
+                query = query.where(User.is_verified == args['is_verified'])
+            if 'created_after' in args:
+                query = query.where(User.created_at >= _naive_utc(args['created_after']))
+            if 'created_before' in args:
+                query = query.where(User.created_at < _naive_utc(args['created_before']))
+            
+            if 'email_prefix' in args:
+                order = 'email'
+                prefix = args['email_prefix'].lower().strip()
+                # A constant-prefix LIKE is an index range scan on MySQL and
+                # follows the column collation; a hand-built upper bound would
+                # assume code point order, which utf8mb4_unicode_ci is not
+                query = query.where(User.email.like(_escape_like(prefix) + '%', escape='/'))
+                query = query.order_by(User.email)
+                if 'cursor' in args:
+                    email, = _decode_cursor(args['cursor'], order)
+                    query = query.where(User.email > email)
+            elif 'created_after' in args or 'created_before' in args:
+                order = 'created_at'
+                query = query.order_by(User.created_at, User.id)
+                if 'cursor' in args:
+                    created_at, user_id = _decode_cursor(args['cursor'], order)
+                    # The redundant >= keeps the seek on the index
+                    query = query.where(and_(
+                        User.created_at >= created_at,
+                        or_(User.created_at > created_at, User.id > user_id)
+                    ))
+            else:
+                order = 'id'
+                query = query.order_by(User.id)
+                if 'cursor' in args:
+                    user_id, = _decode_cursor(args['cursor'], order)
+                    query = query.where(User.id > user_id)
+            
+            # One extra row tells whether there is a next page
+            limit = args['limit']
+            users = db.session.execute(query.limit(limit + 1)).scalars().all()
+            has_more = len(users) > limit
+            users = users[:limit]
+            
+            next_cursor = None
+            if has_more:
+                last = users[-1]
+                if order == 'email':
+                    next_cursor = _encode_cursor(order, [last.email])
+                elif order == 'created_at':
+                    next_cursor = _encode_cursor(order, [last.created_at.isoformat(), last.id])
+                else:
+                    next_cursor = _encode_cursor(order, [last.id])
+            
+            return {
+                'users': [user.to_dict() for user in users],
+                'next_cursor': next_cursor
+            }, 200
+            
+        except ValidationError as e:
+            return {'error': 'Validation failed', 'details': e.messages}, 400
+        except InvalidCursor as e:
+            return {'error': 'Invalid cursor', 'details': str(e)}, 400
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing users: {str(e)}")
+            return {'error': 'Internal server error'}, 500
+    
+    @staticmethod
+    def export_users(batch_size=1000):
+        """Yield every user as one NDJSON line, paging by id
+        
+        Each page is ``WHERE id > last_id ORDER BY id LIMIT batch_size``, so
+        every query is a primary key range scan and only one page of users is
+        held in memory at a time, however large the table is.
+        """
+        last_id = 0
+        exported = 0
+        while True:
+            users = db.session.execute(
+                select(User).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            ).scalars().all()
+            if not users:
+                break
+            
+            yield ''.join(current_app.json.dumps(user.to_dict()) + '\n' for user in users)
+            
+            last_id = users[-1].id
+            exported += len(users)
+            # Drop the page from the identity map so memory stays flat
+            db.session.expunge_all()
+        
+        logger.info(f"Exported {exported} users")
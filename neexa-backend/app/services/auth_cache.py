@@ -0,0 +1,138 @@
+from datetime import datetime
+from app.models.user import User
+from app.utils.cache import TTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AuthenticatedUser:
+    """Read-only snapshot of a user, safe to share between requests
+
+    ORM instances are bound to the session of the request that loaded them,
+    so the cache stores this detached copy instead. It exposes the attributes
+    and methods the protected views use on ``User``.
+    """
+
+    __slots__ = (
+        'id', 'email', 'first_name', 'last_name', 'is_active', 'is_verified',
+        'created_at', 'updated_at', 'last_login', 'locked_until',
+        'preferred_currency', 'token_version', '_data'
+    )
+
+    def __init__(self, user):
+        for name in self.__slots__[:-1]:
+            setattr(self, name, getattr(user, name))
+        self._data = user.to_dict()
+
+    def is_locked(self):
+        """Check if the account is currently locked"""
+        if self.locked_until:
+            return datetime.utcnow() < self.locked_until
+        return False
+
+    def to_dict(self):
+        """Convert user to dictionary for API responses"""
+        return dict(self._data)
+
+    def __repr__(self):
+        return f'<AuthenticatedUser {self.email}>'
+
+
+class ClaimsUser:
+    """User built from signed access token claims (stateless authorization)"""
+
+    def __init__(self, user_id, claims):
+        self.id = user_id
+        self.email = claims.get('email')
+        self.first_name = claims.get('first_name')
+        self.last_name = claims.get('last_name')
+        self.is_active = claims.get('active', True)
+        self.is_verified = claims.get('is_verified', False)
+        self.preferred_currency = claims.get('preferred_currency')
+        self.token_version = claims.get('token_version', 0)
+        self.created_at = _parse_datetime(claims.get('created_at'))
+        self.updated_at = _parse_datetime(claims.get('updated_at'))
+        self.last_login = _parse_datetime(claims.get('last_login'))
+        self.locked_until = None
+
+    def is_locked(self):
+        """Locks are enforced through the revocation list in stateless mode"""
+        return False
+
+    def to_dict(self):
+        """Convert user to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'is_active': self.is_active,
+            'is_verified': self.is_verified,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'preferred_currency': self.preferred_currency
+        }
+
+    def __repr__(self):
+        return f'<ClaimsUser {self.email}>'
+
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+class UserAuthCache:
+    """In-process cache of active users keyed by id for token authorization
+
+    Entries are invalidated explicitly whenever UserService changes a user and
+    otherwise expire after ``AUTH_CACHE_TTL`` seconds, which bounds how stale
+    another worker process can be.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._cache = TTLCache()
+
+    def init_app(self, app):
+        """Configure the cache from the application config"""
+        self.enabled = app.config.get('AUTH_CACHE_ENABLED', True)
+        self._cache = TTLCache(
+            maxsize=app.config.get('AUTH_CACHE_MAXSIZE', 10000),
+            ttl=app.config.get('AUTH_CACHE_TTL', 30)
+        )
+        app.extensions['user_auth_cache'] = self
+
+    def get_user(self, user_id):
+        """Return the active user for ``user_id`` or None"""
+        if not self.enabled:
+            return User.query.filter_by(id=user_id, is_active=True).first()
+
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        user = User.query.filter_by(id=user_id, is_active=True).first()
+        if not user:
+            return None
+
+        snapshot = AuthenticatedUser(user)
+        self._cache.set(user_id, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id):
+        """Drop the cached entry for ``user_id``"""
+        self._cache.delete(user_id)
+
+    def clear(self):
+        """Drop every cached entry"""
+        self._cache.clear()
+
+    def stats(self):
+        """Return cache size and hit/miss counters"""
+        stats = self._cache.stats()
+        stats['enabled'] = self.enabled
+        return stats
+
+
+user_auth_cache = UserAuthCache()
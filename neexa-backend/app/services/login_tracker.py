@@ -0,0 +1,181 @@
+import atexit
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, func, or_, select
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from app.models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lock account after 5 failed attempts for 30 minutes
+MAX_LOGIN_ATTEMPTS = 5
+LOCKOUT_DURATION = timedelta(minutes=30)
+
+
+class LoginActivityTracker:
+    """Counts login failures in the database and batches last_login writes
+
+    Failures are counted with an atomic ``login_attempts + 1`` UPDATE and the
+    result read back in the same transaction, so every worker process shares
+    one counter and the 5-attempt lockout holds across the pre-fork runner.
+    A successful login only writes when there is something to reset.
+
+    ``last_login`` is the only field kept in memory: it is written for all
+    pending users in one batched UPDATE every ``LOGIN_ACTIVITY_FLUSH_INTERVAL``
+    seconds from a background thread (0 = immediately), and never moves a
+    newer value written by another worker backwards.
+    """
+
+    def __init__(self):
+        self.flush_interval = 5
+        self._app = None
+        self._state = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._flusher_pid = None
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        """Configure the tracker from the application config"""
+        self.flush_interval = app.config.get('LOGIN_ACTIVITY_FLUSH_INTERVAL', 5)
+        self._app = app
+        with self._lock:
+            self._state = {}
+        app.extensions['login_tracker'] = self
+
+    def is_locked(self, user):
+        """Check if the account is currently locked (from the row's locked_until)"""
+        return user.is_locked()
+
+    def record_failure(self, user):
+        """Count a failed login; returns the lock expiry if the account got locked"""
+        user_id = user.id
+        users = User.__table__
+        locked_until = None
+        try:
+            db.session.execute(
+                users.update()
+                .where(users.c.id == user_id)
+                .values(login_attempts=func.coalesce(users.c.login_attempts, 0) + 1)
+            )
+            # The UPDATE holds the row lock, so this reads our own increment
+            attempts = db.session.execute(
+                select(users.c.login_attempts).where(users.c.id == user_id)
+            ).scalar_one()
+            if attempts >= MAX_LOGIN_ATTEMPTS:
+                locked_until = datetime.utcnow() + LOCKOUT_DURATION
+                db.session.execute(
+                    users.update().where(users.c.id == user_id).values(locked_until=locked_until)
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return locked_until
+
+    def record_success(self, user):
+        """Reset failures and stamp last_login after a successful login"""
+        now = datetime.utcnow()
+        if user.login_attempts or user.locked_until:
+            users = User.__table__
+            try:
+                db.session.execute(
+                    users.update().where(users.c.id == user.id).values(login_attempts=0, locked_until=None)
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        with self._lock:
+            self._state[user.id] = now
+
+        # Reflect the change on the loaded instance without marking it dirty,
+        # so the response and token claims see it before the flush
+        set_committed_value(user, 'last_login', now)
+        set_committed_value(user, 'login_attempts', 0)
+        set_committed_value(user, 'locked_until', None)
+
+        self._after_change()
+
+    def _after_change(self):
+        if not self.flush_interval:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def flush(self):
+        """Write pending last_login values to the users table in one batched UPDATE"""
+        with self._lock:
+            pending, self._state = self._state, {}
+
+        if not pending:
+            return 0
+
+        users = User.__table__
+        statement = (
+            users.update()
+            .where(users.c.id == bindparam('user_id'))
+            .where(or_(users.c.last_login.is_(None), users.c.last_login < bindparam('login_at')))
+            .values(last_login=bindparam('login_at'))
+        )
+        try:
+            db.session.execute(statement, [
+                {'user_id': user_id, 'login_at': login_at} for user_id, login_at in pending.items()
+            ])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error flushing login activity: {str(e)}")
+            with self._lock:
+                for user_id, login_at in pending.items():
+                    self._state.setdefault(user_id, login_at)
+            return 0
+
+        return len(pending)
+
+    def _ensure_flusher(self):
+        pid = os.getpid()
+        if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher_pid == pid and self._flusher.is_alive():
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._run, name='login-activity-flusher', daemon=True)
+            self._flusher_pid = pid
+            self._flusher.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush_in_context()
+
+    def _flush_in_context(self):
+        if self._app is None:
+            return
+        with self._app.app_context():
+            self.flush()
+            db.session.remove()
+
+    def shutdown(self):
+        """Stop the background flusher and write anything still pending"""
+        self._stop.set()
+        if self._flusher_pid == os.getpid():
+            try:
+                self._flush_in_context()
+            except Exception as e:
+                logger.error(f"Error flushing login activity on shutdown: {str(e)}")
+
+    def stats(self):
+        """Return the number of pending last_login writes"""
+        with self._lock:
+            return {
+                'pending_writes': len(self._state),
+            }
+
+
+login_tracker = LoginActivityTracker()
+atexit.register(login_tracker.shutdown)
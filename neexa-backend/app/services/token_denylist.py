@@ -0,0 +1,118 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from app import db
+from app.models.token_blocklist import TokenBlocklist
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows committed late by another worker can carry a created_at slightly
+# older than our last sync, so each incremental pull looks back a little
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class TokenDenylist:
+    """JTI denylist with an in-memory set in front of the token_blocklist table
+
+    Checks are a dictionary lookup. The database is only touched when a token
+    is revoked and once per ``TOKEN_DENYLIST_SYNC_INTERVAL`` seconds, when
+    entries revoked by other workers are pulled in and entries past their
+    ``exp`` are swept from memory and from the table.
+    """
+
+    def __init__(self):
+        self.sync_interval = 30
+        self.sweep_batch_size = 1000
+        self._jtis = {}
+        self._loaded = False
+        self._last_sync = None
+        self._next_sync = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the denylist from the application config"""
+        self.sync_interval = app.config.get('TOKEN_DENYLIST_SYNC_INTERVAL', 30)
+        self.sweep_batch_size = app.config.get('TOKEN_DENYLIST_SWEEP_BATCH_SIZE', 1000)
+        self._jtis = {}
+        self._loaded = False
+        self._last_sync = None
+        self._next_sync = 0
+        app.extensions['token_denylist'] = self
+
+    def is_revoked(self, jwt_payload):
+        """Check whether a decoded token has been revoked"""
+        self._maybe_sync()
+        return jwt_payload.get('jti') in self._jtis
+
+    def revoke(self, jwt_payload):
+        """Revoke a decoded token until its expiry"""
+        jti = jwt_payload['jti']
+        expires = jwt_payload.get('exp') or time.time()
+
+        with self._lock:
+            self._jtis[jti] = expires
+
+        if not TokenBlocklist.query.filter_by(jti=jti).first():
+            db.session.add(TokenBlocklist(
+                jti=jti,
+                token_type=jwt_payload.get('type', 'access'),
+                user_id=jwt_payload.get('sub'),
+                expires_at=datetime.utcfromtimestamp(expires)
+            ))
+            db.session.commit()
+
+    def _maybe_sync(self):
+        if time.monotonic() < self._next_sync:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._sync()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error syncing token denylist: {str(e)}")
+        finally:
+            self._next_sync = time.monotonic() + self.sync_interval
+            self._lock.release()
+
+    def _sync(self):
+        """Pull new revocations and sweep expired entries (caller holds the lock)"""
+        now = datetime.utcnow()
+        now_ts = time.time()
+
+        # Load unexpired entries on first use, afterwards only the new ones
+        query = TokenBlocklist.query.with_entities(TokenBlocklist.jti, TokenBlocklist.expires_at)
+        if self._loaded:
+            query = query.filter(TokenBlocklist.created_at >= self._last_sync - SYNC_OVERLAP)
+        else:
+            query = query.filter(TokenBlocklist.expires_at > now)
+
+        jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now_ts}
+        for jti, expires_at in query.all():
+            jtis[jti] = (expires_at - datetime(1970, 1, 1)).total_seconds()
+        self._jtis = jtis
+        self._loaded = True
+        self._last_sync = now
+
+        self._sweep_table(now)
+
+    def _sweep_table(self, now):
+        """Delete expired rows in bounded batches to keep transactions short"""
+        while True:
+            ids = [row.id for row in TokenBlocklist.query.with_entities(TokenBlocklist.id)
+                   .filter(TokenBlocklist.expires_at <= now)
+                   .limit(self.sweep_batch_size).all()]
+            if not ids:
+                break
+            TokenBlocklist.query.filter(TokenBlocklist.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+            if len(ids) < self.sweep_batch_size:
+                break
+
+    def stats(self):
+        """Return the number of revoked tokens held in memory"""
+        return {'revoked_tokens': len(self._jtis)}
+
+
+token_denylist = TokenDenylist()
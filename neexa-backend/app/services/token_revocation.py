@@ -0,0 +1,89 @@
+import time
+import threading
+from datetime import datetime
+from sqlalchemy import or_
+from app.models.user import User
+from app.utils.revocation import RevocationList, ALL_VERSIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocations:
+    """Revocation state consulted by stateless (claims based) authorization
+
+    Each worker keeps a RevocationList in memory. Changes made by this
+    process are applied immediately; the list is reloaded from the users
+    table every ``AUTH_REVOCATION_REFRESH_INTERVAL`` seconds so revocations
+    made by other workers are picked up with one query per interval.
+    """
+
+    def __init__(self):
+        self.refresh_interval = 30
+        self._list = RevocationList()
+        self._next_refresh = 0
+        self._refresh_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the revocation list from the application config"""
+        self.refresh_interval = app.config.get('AUTH_REVOCATION_REFRESH_INTERVAL', 30)
+        self._list = RevocationList(
+            capacity=app.config.get('AUTH_REVOCATION_CAPACITY', 100000),
+            error_rate=app.config.get('AUTH_REVOCATION_ERROR_RATE', 0.001)
+        )
+        self._next_refresh = 0
+        app.extensions['token_revocations'] = self
+
+    def refresh(self):
+        """Reload revoked, versioned and locked users from the database"""
+        now = datetime.utcnow()
+        rows = User.query.with_entities(
+            User.id, User.is_active, User.token_version, User.locked_until
+        ).filter(or_(
+            User.is_active.is_(False),
+            User.token_version > 0,
+            User.locked_until > now
+        )).all()
+
+        entries = {}
+        for user_id, is_active, token_version, locked_until in rows:
+            min_version = ALL_VERSIONS if not is_active else (token_version or 0)
+            entries[user_id] = (min_version, locked_until)
+        self._list.replace(entries)
+
+    def _maybe_refresh(self):
+        if time.monotonic() < self._next_refresh:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing token revocations: {str(e)}")
+        finally:
+            self._next_refresh = time.monotonic() + self.refresh_interval
+            self._refresh_lock.release()
+
+    def check(self, user_id, token_version):
+        """Return REVOKED, LOCKED or None for a token of ``user_id``"""
+        self._maybe_refresh()
+        return self._list.check(user_id, token_version)
+
+    def revoke_user(self, user_id):
+        """Reject every token issued to a deactivated user"""
+        self._list.revoke_user(user_id)
+
+    def revoke_versions_below(self, user_id, version):
+        """Reject tokens issued before the user's token version was bumped"""
+        self._list.revoke_versions_below(user_id, version)
+
+    def lock(self, user_id, until):
+        """Reject tokens of a locked user until ``until``"""
+        self._list.lock(user_id, until)
+
+    def stats(self):
+        """Return the number of tracked users"""
+        return {'tracked_users': len(self._list)}
+
+
+token_revocations = TokenRevocations()
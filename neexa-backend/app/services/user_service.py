@@ -1,12 +1,17 @@
 from app.models.user import User
+from app.services.auth_cache import user_auth_cache
+from app.services.token_revocation import token_revocations
+from app.services.login_tracker import login_tracker
 from app import db
+from app.utils.hashing import hasher, HashingUnavailable
 from app.schemas.user_schema import (
-    UserRegistrationSchema, 
-    UserLoginSchema, 
-    UserUpdateSchema,
-    PasswordChangeSchema
+    user_registration_schema,
+    user_login_schema,
+    user_update_schema,
+    password_change_schema
 )
 from marshmallow import ValidationError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from datetime import datetime
 import logging
 
@@ -20,8 +25,7 @@ class UserService:
         """Register a new user"""
         try:
             # Validate input data
-            schema = UserRegistrationSchema()
-            validated_data = schema.load(user_data)
+            validated_data = user_registration_schema.load(user_data)
             
             # Check if passwords match
             if validated_data['password'] != validated_data['confirm_password']:
@@ -61,6 +65,12 @@ class UserService:
         except ValidationError as e:
             logger.warning(f"Validation error during registration: {e.messages}")
             return {'error': 'Validation failed', 'details': e.messages}, 400
+        except HashingUnavailable as e:
+            logger.warning(f"Password hashing unavailable during registration: {str(e)}")
+            db.session.rollback()
+            return {'error': 'Service temporarily unavailable, please try again'}, 503
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error during user registration: {str(e)}")
             db.session.rollback()
@@ -71,8 +81,7 @@ class UserService:
         """Authenticate user login"""
         try:
             # Validate input data
-            schema = UserLoginSchema()
-            validated_data = schema.load(login_data)
+            validated_data = user_login_schema.load(login_data)
             
             # Find user by email
             user = User.query.filter_by(email=validated_data['email']).first()
@@ -81,20 +90,33 @@ class UserService:
                 return {'error': 'Invalid email or password'}, 401
             
             # Check if account is locked
-            if user.is_locked():
+            if login_tracker.is_locked(user):
                 return {'error': 'Account is temporarily locked due to multiple failed login attempts'}, 423
             
             # Check if user is active
             if not user.is_active:
                 return {'error': 'Account is deactivated'}, 401
             
-            # Verify password
+            # Verify password (failures are counted atomically in the users row)
             if not user.check_password(validated_data['password']):
-                user.increment_login_attempts()
+                locked_until = login_tracker.record_failure(user)
+                if locked_until:
+                    user_auth_cache.invalidate(user.id)
+                    token_revocations.lock(user.id, locked_until)
                 return {'error': 'Invalid email or password'}, 401
             
+            # Upgrade the stored hash if it predates the current hashing policy
+            if hasher.needs_rehash(user.password_hash):
+                try:
+                    user.password_hash = hasher.generate(validated_data['password'])
+                    db.session.commit()
+                    logger.info(f"Password hash upgraded for user: {user.email}")
+                except HashingUnavailable as e:
+                    logger.warning(f"Skipping password hash upgrade: {str(e)}")
+            
             # Successful login
-            user.update_login_info()
+            login_tracker.record_success(user)
+            user_auth_cache.invalidate(user.id)
             
             # Generate tokens
             access_token, refresh_token = user.generate_tokens()
@@ -111,6 +133,11 @@ class UserService:
         except ValidationError as e:
             logger.warning(f"Validation error during login: {e.messages}")
             return {'error': 'Validation failed', 'details': e.messages}, 400
+        except HashingUnavailable as e:
+            logger.warning(f"Password hashing unavailable during login: {str(e)}")
+            return {'error': 'Service temporarily unavailable, please try again'}, 503
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error during user login: {str(e)}")
             return {'error': 'Internal server error'}, 500
@@ -126,6 +153,8 @@ class UserService:
             
             return {'user': user.to_dict()}, 200
             
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error getting user profile: {str(e)}")
             return {'error': 'Internal server error'}, 500
@@ -140,8 +169,7 @@ class UserService:
                 return {'error': 'User not found'}, 404
             
             # Validate input data
-            schema = UserUpdateSchema()
-            validated_data = schema.load(update_data)
+            validated_data = user_update_schema.load(update_data)
             
             # Update user fields
             for field, value in validated_data.items():
@@ -150,6 +178,7 @@ class UserService:
             
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            user_auth_cache.invalidate(user.id)
             
             logger.info(f"User profile updated: {user.email}")
             
@@ -161,6 +190,8 @@ class UserService:
         except ValidationError as e:
             logger.warning(f"Validation error during profile update: {e.messages}")
             return {'error': 'Validation failed', 'details': e.messages}, 400
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error updating user profile: {str(e)}")
             db.session.rollback()
@@ -176,8 +207,7 @@ class UserService:
                 return {'error': 'User not found'}, 404
             
             # Validate input data
-            schema = PasswordChangeSchema()
-            validated_data = schema.load(password_data)
+            validated_data = password_change_schema.load(password_data)
             
             # Check if passwords match
             if validated_data['new_password'] != validated_data['confirm_new_password']:
@@ -191,20 +221,36 @@ class UserService:
             if user.check_password(validated_data['new_password']):
                 return {'error': 'New password must be different from current password'}, 400
             
-            # Update password
+            # Update password and retire tokens issued before the change
             user.set_password(validated_data['new_password'])
+            user.token_version = (user.token_version or 0) + 1
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            user_auth_cache.invalidate(user.id)
+            token_revocations.revoke_versions_below(user.id, user.token_version)
             
             logger.info(f"Password changed for user: {user.email}")
             
-            return {'message': 'Password changed successfully'}, 200
+            # Issue fresh tokens so the current session keeps working
+            access_token, refresh_token = user.generate_tokens()
+            
+            return {
+                'message': 'Password changed successfully',
+                'access_token': access_token,
+                'refresh_token': refresh_token
+            }, 200
             
         except ValidationError as e:
             logger.warning(f"Validation error during password change: {e.messages}")
             return {'error': 'Validation failed', 'details': e.messages}, 400
         except ValueError as e:
             return {'error': str(e)}, 400
+        except HashingUnavailable as e:
+            logger.warning(f"Password hashing unavailable during password change: {str(e)}")
+            db.session.rollback()
+            return {'error': 'Service temporarily unavailable, please try again'}, 503
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error changing password: {str(e)}")
             db.session.rollback()
@@ -222,11 +268,15 @@ class UserService:
             user.is_active = False
             user.updated_at = datetime.utcnow()
             db.session.commit()
+            user_auth_cache.invalidate(user.id)
+            token_revocations.revoke_user(user.id)
             
             logger.info(f"User account deactivated: {user.email}")
             
             return {'message': 'Account deactivated successfully'}, 200
             
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error deactivating user: {str(e)}")
             db.session.rollback()
@@ -0,0 +1,3 @@
+from .hashing import hasher, PasswordHasher, HashingUnavailable
+
+__all__ = ['hasher', 'PasswordHasher', 'HashingUnavailable']
@@ -0,0 +1,178 @@
+import asyncio
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WsgiToAsgi:
+    """Serve a WSGI application (the Flask app) over ASGI
+
+    The event loop owns the connections: reading the request body, waiting
+    on slow clients and keep-alive connections costs no thread. Only the
+    WSGI call itself, which blocks on hashing and the database, runs in a
+    bounded thread pool of ``max_workers`` threads. Buffered responses are
+    produced in a single executor call; streamed responses are pulled from
+    the executor one chunk at a time.
+
+    Every executor call of a request runs in the same ``contextvars``
+    context, so a streamed body (``stream_with_context``) keeps the Flask
+    request context whichever pool thread pulls the next chunk.
+    """
+
+    def __init__(self, wsgi_app, max_workers=32):
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type '{scope['type']}'")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                break
+
+        loop = asyncio.get_running_loop()
+        environ = self._environ(scope, bytes(body))
+        # run_in_executor does not carry contextvars between calls
+        context = contextvars.copy_context()
+        try:
+            status, headers, chunks, iterator = await loop.run_in_executor(
+                self.executor, context.run, self._call, environ)
+        except Exception:
+            logger.exception(f"Unhandled error serving {scope['method']} {scope['path']}")
+            await send({'type': 'http.response.start', 'status': 500,
+                        'headers': [(b'content-type', b'text/plain'), (b'content-length', b'21')]})
+            await send({'type': 'http.response.body', 'body': b'Internal Server Error'})
+            return
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        if iterator is None:
+            await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+            return
+
+        try:
+            for chunk in chunks:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            while True:
+                chunk = await loop.run_in_executor(self.executor, context.run, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, context.run, close)
+
+    def _call(self, environ):
+        """Run the WSGI app; buffers the body unless the response is streamed"""
+        started = []
+
+        def start_response(status, response_headers, exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started[:] = [status, response_headers]
+
+        result = self.wsgi_app(environ, start_response)
+        chunks = []
+        iterator = iter(result)
+        # WSGI allows start_response to be deferred until the first chunk
+        for chunk in iterator:
+            if chunk:
+                chunks.append(chunk)
+                break
+
+        status, response_headers = started
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response_headers]
+        streamed = not any(name == b'content-length' for name, _ in headers)
+        if not streamed:
+            chunks.extend(chunk for chunk in iterator if chunk)
+            close = getattr(result, 'close', None)
+            if close is not None:
+                close()
+            iterator = None
+        else:
+            iterator = _Closing(iterator, result)
+        return int(status.split(' ', 1)[0]), headers, chunks, iterator
+
+    def _environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        # PEP 3333: the decoded path as bytes carried in a latin-1 str
+        path = scope['path'].encode('utf-8', 'surrogateescape').decode('latin-1')
+        root_path = scope.get('root_path', '')
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': root_path,
+            'PATH_INFO': path,
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(server[0]),
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'CONTENT_LENGTH': str(len(body)),
+        }
+        for name, value in scope.get('headers', ()):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            if name == 'CONTENT_LENGTH':
+                continue
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+class _Closing:
+    """Iterator over a streamed WSGI body that closes the original iterable"""
+
+    def __init__(self, iterator, result):
+        self._iterator = iterator
+        self._result = result
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def close(self):
+        close = getattr(self._result, 'close', None)
+        if close is not None:
+            close()
@@ -0,0 +1,270 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from werkzeug.security import (
+    generate_password_hash,
+    check_password_hash,
+    DEFAULT_PBKDF2_ITERATIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HashingUnavailable(Exception):
+    """Raised when a password hashing job cannot be accepted or completed"""
+
+
+class HashingQueueFull(HashingUnavailable):
+    """Raised when the hashing queue is at capacity"""
+
+
+class HashingTimeout(HashingUnavailable):
+    """Raised when a hashing job does not finish within the configured timeout"""
+
+
+DEFAULT_HASH_METHOD = 'scrypt:32768:8:1'
+DEFAULT_BCRYPT_ROUNDS = 12
+
+
+def normalize_method(method):
+    """Expand a hashing method to its fully parameterized form
+
+    ``scrypt`` -> ``scrypt:32768:8:1``, ``pbkdf2`` -> ``pbkdf2:sha256:<iterations>``,
+    ``bcrypt`` -> ``bcrypt:12``. An empty method is an error, not the default.
+    """
+    if not method:
+        raise ValueError("Password hash method must not be empty")
+    algorithm, *args = method.split(':')
+
+    if algorithm == 'scrypt':
+        n, r, p = args if args else (2**15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if algorithm == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{int(iterations)}"
+    if algorithm == 'bcrypt':
+        rounds = args[0] if args else DEFAULT_BCRYPT_ROUNDS
+        return f"bcrypt:{int(rounds)}"
+
+    raise ValueError(f"Unsupported password hash method '{method}'")
+
+
+def hash_parameters(password_hash):
+    """Return the normalized method a stored hash was created with"""
+    if password_hash.startswith('$2'):
+        # Modular crypt format: $2b$<rounds>$<salt+hash>
+        return f"bcrypt:{int(password_hash.split('$')[2])}"
+    return normalize_method(password_hash.split('$', 1)[0])
+
+
+def _cost(method):
+    """Split a normalized method into its algorithm and comparable cost"""
+    algorithm, *args = method.split(':')
+    if algorithm == 'pbkdf2':
+        return (algorithm, args[0]), (int(args[1]),)
+    return (algorithm,), tuple(int(arg) for arg in args)
+
+
+def _generate(password, method=DEFAULT_HASH_METHOD):
+    """Worker entry point for hashing a password"""
+    if method.startswith('bcrypt'):
+        rounds = int(method.split(':')[1])
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+    return generate_password_hash(password, method=method)
+
+
+def _verify(password_hash, password):
+    """Worker entry point for verifying a password"""
+    if password_hash.startswith('$2'):
+        try:
+            return bcrypt.checkpw(password.encode(), password_hash.encode())
+        except ValueError:
+            return False
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded process pool
+
+    KDF work is CPU bound and holds the GIL, so running it inside the request
+    thread stalls every other request served by the same worker. Jobs are
+    submitted to a process pool sized to the available cores; once
+    ``max_workers + max_queue`` jobs are in flight new jobs are rejected with
+    ``HashingQueueFull`` instead of piling up behind a login burst.
+
+    In ``inline`` mode (the default until ``init_app`` is called) hashing runs
+    in the calling thread, which keeps standalone scripts and tests simple.
+
+    New hashes follow the ``PASSWORD_HASH_METHOD`` policy; ``needs_rehash``
+    reports stored hashes that use another algorithm or a lower cost.
+    """
+
+    def __init__(self, app=None):
+        self.mode = 'inline'
+        self.method = DEFAULT_HASH_METHOD
+        self.max_workers = 1
+        self.max_queue = 0
+        self.timeout = None
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._slots = None
+
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._latencies = deque(maxlen=1024)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the executor from the application config"""
+        self.shutdown()
+
+        self.mode = app.config.get('PASSWORD_HASH_EXECUTOR', 'process')
+        self.method = normalize_method(app.config.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD))
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE')
+        self.max_queue = self.max_workers * 4 if max_queue is None else max_queue
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT')
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+
+        app.extensions['password_hasher'] = self
+
+    def generate(self, password):
+        """Hash a password using the configured policy"""
+        return self._run(_generate, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run(_verify, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Check whether a stored hash falls below the configured policy"""
+        try:
+            stored_algorithm, stored_cost = _cost(hash_parameters(password_hash))
+        except (ValueError, IndexError):
+            return True
+
+        algorithm, cost = _cost(self.method)
+        if stored_algorithm != algorithm:
+            return True
+        return any(stored < wanted for stored, wanted in zip(stored_cost, cost))
+
+    def _get_executor(self):
+        """Return the process pool, (re)creating it after a fork"""
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    self._executor_pid = pid
+        return self._executor
+
+    def _run(self, func, *args):
+        started = time.perf_counter()
+
+        if self.mode != 'process':
+            with self._stats_lock:
+                self._submitted += 1
+            try:
+                return func(*args)
+            finally:
+                self._record(started)
+
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            logger.warning("Password hashing queue is full, rejecting job")
+            raise HashingQueueFull("Password hashing queue is full")
+
+        with self._stats_lock:
+            self._submitted += 1
+            self._in_flight += 1
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._release()
+            raise
+
+        # The slot is only freed once the worker is done with the job, so a
+        # timed out job still counts against the queue until it finishes
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._stats_lock:
+                self._timeouts += 1
+            logger.warning(f"Password hashing job timed out after {self.timeout}s")
+            raise HashingTimeout("Password hashing timed out")
+
+        self._record(started)
+        return result
+
+    def _release(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, started):
+        with self._stats_lock:
+            self._completed += 1
+            self._latencies.append(time.perf_counter() - started)
+
+    def stats(self):
+        """Return queue depth and latency statistics"""
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            in_flight = self._in_flight
+            stats = {
+                'mode': self.mode,
+                'method': self.method,
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': in_flight,
+                'queue_depth': max(0, in_flight - self.max_workers),
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+            }
+
+        def percentile(p):
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(round(p / 100.0 * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 3)
+
+        stats['latency_ms'] = {
+            'p50': percentile(50),
+            'p95': percentile(95),
+            'p99': percentile(99),
+            'max': percentile(100),
+        }
+        return stats
+
+    def shutdown(self, wait=True):
+        """Shut down the process pool if it was started by this process"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            owned = self._executor_pid == os.getpid()
+            self._executor_pid = None
+        if executor is not None and owned:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+hasher = PasswordHasher()
+atexit.register(hasher.shutdown)
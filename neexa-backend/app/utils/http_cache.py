@@ -0,0 +1,44 @@
+import hashlib
+from flask import request, make_response
+
+# Bump when the user representation changes shape so old ETags stop matching
+USER_REPRESENTATION_VERSION = 1
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def user_etag(user):
+    """Strong ETag for a user's API representation
+
+    Built from the id and the timestamps that change with the body
+    (updated_at for profile edits, last_login for logins), so it can be
+    computed from a cached user without serializing anything.
+    """
+    updated_at = user.updated_at.isoformat() if user.updated_at else ''
+    last_login = user.last_login.isoformat() if user.last_login else ''
+    key = f'{USER_REPRESENTATION_VERSION}:{user.id}:{updated_at}:{last_login}'
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def not_modified(etag):
+    """Return a 304 response if the request's If-None-Match matches ``etag``
+
+    The 304 repeats the validator in the form the client holds it: a 200
+    that went through compression carried ``W/"..."``, and answering that
+    with the strong tag would look like a different representation.
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match.contains_weak(etag):
+        return None
+    response = make_response('', 304)
+    response = private_cache(response, etag)
+    if if_none_match.is_weak(etag) and not if_none_match.is_strong(etag):
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def private_cache(response, etag):
+    """Attach the ETag and a private, revalidate-every-time Cache-Control"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
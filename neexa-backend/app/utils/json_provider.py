@@ -0,0 +1,93 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used without it
+    orjson = None
+
+
+def _default(o):
+    """Encode the types json/orjson do not handle, the same way for both"""
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        # str keeps the exact amount, a float would not
+        return str(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when it is installed
+
+    Falls back to the stdlib encoder when orjson is missing, for arguments
+    orjson does not support, and for values it rejects (e.g. integers over
+    64 bits). Dates and datetimes are ISO 8601 and Decimals strings on both
+    paths, so output does not depend on which encoder ran. Keys are sorted
+    like Flask's default provider; unlike it, non-ASCII text is written as
+    UTF-8 instead of \\u escapes.
+    """
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def _orjson_options(self, kwargs):
+        """Map json.dumps arguments to orjson options, None if unsupported"""
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.pop('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        indent = kwargs.pop('indent', None)
+        if indent:
+            if indent != 2:
+                return None
+            option |= orjson.OPT_INDENT_2
+        kwargs.pop('separators', None)
+        kwargs.pop('ensure_ascii', None)
+        kwargs.pop('default', None)
+        if kwargs:
+            return None
+        return option
+
+    def _dumps_bytes(self, obj, **kwargs):
+        if orjson is not None:
+            option = self._orjson_options(dict(kwargs))
+            if option is not None:
+                try:
+                    return orjson.dumps(obj, default=_default, option=option)
+                except (orjson.JSONEncodeError, TypeError):
+                    pass
+        return super().dumps(obj, **kwargs).encode()
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as JSON"""
+        return self._dumps_bytes(obj, **kwargs).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize data as JSON"""
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # Let the stdlib raise its usual error (or accept NaN etc.)
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Serialize the given arguments as JSON and return a Response with the application/json mimetype"""
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args = {}
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args.setdefault('indent', 2)
+        else:
+            dump_args.setdefault('separators', (',', ':'))
+        # Hand the encoded bytes straight to the response, no str round trip
+        return self._app.response_class(self._dumps_bytes(obj, **dump_args) + b'\n', mimetype=self.mimetype)
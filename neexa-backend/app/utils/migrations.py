@@ -0,0 +1,38 @@
+import click
+
+
+def init_migrations(app, db):
+    """Set up Flask-Migrate on ``app`` (imports alembic)"""
+    from flask_migrate import Migrate
+    return Migrate(app, db)
+
+
+class LazyMigrateGroup(click.Group):
+    """``flask db`` command group that loads Flask-Migrate on first use
+
+    Flask-Migrate pulls in alembic, which is a large share of the import
+    time and is never used by serving workers. The real ``db`` group
+    replaces this one the first time a migration command is resolved.
+    """
+
+    def __init__(self, app, db):
+        super().__init__('db', help='Perform database migrations.')
+        self._app = app
+        self._db = db
+
+    def _group(self):
+        if 'migrate' not in self._app.extensions:
+            init_migrations(self._app, self._db)
+        from flask_migrate.cli import db as migrate_group
+        return migrate_group
+
+    def list_commands(self, ctx):
+        return self._group().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._group().get_command(ctx, name)
+
+
+def register_migration_commands(app, db):
+    """Expose ``flask db ...`` without importing Flask-Migrate at startup"""
+    app.cli.add_command(LazyMigrateGroup(app, db))
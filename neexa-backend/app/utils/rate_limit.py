@@ -0,0 +1,202 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from functools import lru_cache
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'limit', 'remaining', 'retry_after'])
+
+_PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+}
+
+_LIMIT_PATTERN = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$', re.IGNORECASE)
+
+
+@lru_cache(maxsize=128)
+def parse_limit(limit):
+    """Parse '100 per hour', '5/minute' or '10 per 30 seconds' into (count, seconds)"""
+    match = _LIMIT_PATTERN.match(limit)
+    if not match:
+        raise ValueError(f"Invalid rate limit '{limit}'")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * _PERIODS[unit.lower()]
+
+
+class TokenBucket:
+    """Bucket of ``limit`` tokens refilled continuously over ``period`` seconds"""
+
+    name = 'token_bucket'
+
+    @staticmethod
+    def new_state(limit, period, now):
+        return [float(limit), now]
+
+    @staticmethod
+    def hit(state, limit, period, now):
+        rate = limit / period
+        tokens = min(limit, state[0] + (now - state[1]) * rate)
+        state[1] = now
+        if tokens >= 1:
+            state[0] = tokens - 1
+            return True, int(tokens - 1), 0.0
+        state[0] = tokens
+        return False, 0, (1 - tokens) / rate
+
+
+class SlidingWindowLog:
+    """Exact count of hits in the trailing ``period`` seconds"""
+
+    name = 'sliding_window'
+
+    @staticmethod
+    def new_state(limit, period, now):
+        return deque(maxlen=limit)
+
+    @staticmethod
+    def hit(state, limit, period, now):
+        cutoff = now - period
+        while state and state[0] <= cutoff:
+            state.popleft()
+        if len(state) < limit:
+            state.append(now)
+            return True, limit - len(state), 0.0
+        return False, 0, state[0] + period - now
+
+
+ALGORITHMS = {
+    TokenBucket.name: TokenBucket,
+    SlidingWindowLog.name: SlidingWindowLog,
+}
+
+
+class _Shard:
+    __slots__ = ('lock', 'entries')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [last_seen, period, algorithm state], in LRU order
+        self.entries = OrderedDict()
+
+
+class RateLimiter:
+    """In-memory rate limiter with lock-striped shards
+
+    Keys are spread over ``shards`` independently locked dictionaries so
+    concurrent requests rarely contend. Each shard keeps its keys in LRU
+    order; a key idle for longer than its period is in the same state as a
+    fresh one, so idle keys are evicted from the cold end on every hit, and
+    the least recently used key is dropped once a shard is full.
+    """
+
+    def __init__(self, algorithm=TokenBucket.name, shards=16, max_keys=100000, timer=time.monotonic):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm '{algorithm}'")
+        self.algorithm = ALGORITHMS[algorithm]
+        # Round up to a power of two so the shard index is a mask
+        shard_count = 1
+        while shard_count < shards:
+            shard_count <<= 1
+        self._mask = shard_count - 1
+        self._shards = [_Shard() for _ in range(shard_count)]
+        self._max_keys_per_shard = max(1, max_keys // shard_count)
+        self._timer = timer
+        self.evictions = 0
+
+    def hit(self, key, limit, period):
+        """Record a hit for ``key`` against ``limit`` hits per ``period`` seconds"""
+        shard = self._shards[hash(key) & self._mask]
+        now = self._timer()
+        algorithm = self.algorithm
+
+        with shard.lock:
+            entries = shard.entries
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = [now, period, algorithm.new_state(limit, period, now)]
+                if len(entries) > self._max_keys_per_shard:
+                    entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                entries.move_to_end(key)
+
+            allowed, remaining, retry_after = algorithm.hit(entry[2], limit, period, now)
+            entry[0] = now
+
+            # Drop keys that have been idle for a full period
+            while entries:
+                oldest = next(iter(entries.values()))
+                if now - oldest[0] < oldest[1]:
+                    break
+                entries.popitem(last=False)
+                self.evictions += 1
+
+        return RateLimitResult(allowed, limit, remaining, retry_after)
+
+    def reset(self):
+        """Forget every key"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def stats(self):
+        """Return key counts and evictions"""
+        return {
+            'algorithm': self.algorithm.name,
+            'shards': len(self._shards),
+            'keys': len(self),
+            'evictions': self.evictions,
+        }
+
+
+class RateLimits:
+    """Application-wide rate limiting state, one RateLimiter per algorithm"""
+
+    def __init__(self):
+        self.enabled = True
+        self.default_limit = '100 per hour'
+        self.default_algorithm = TokenBucket.name
+        self.shards = 16
+        self.max_keys = 100000
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure rate limiting from the application config"""
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.default_limit = app.config.get('RATELIMIT_DEFAULT', '100 per hour')
+        self.default_algorithm = app.config.get('RATELIMIT_ALGORITHM', TokenBucket.name)
+        self.shards = app.config.get('RATELIMIT_SHARDS', 16)
+        self.max_keys = app.config.get('RATELIMIT_MAX_KEYS', 100000)
+        with self._lock:
+            self._limiters = {}
+        app.extensions['rate_limits'] = self
+
+    def limiter(self, algorithm=None):
+        """Return the limiter for ``algorithm``, creating it on first use"""
+        algorithm = algorithm or self.default_algorithm
+        limiter = self._limiters.get(algorithm)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(algorithm)
+                if limiter is None:
+                    limiter = self._limiters[algorithm] = RateLimiter(algorithm, self.shards, self.max_keys)
+        return limiter
+
+    def hit(self, key, limit=None, algorithm=None):
+        """Record a hit for ``key`` against a limit such as '100 per hour'"""
+        count, period = parse_limit(limit or self.default_limit)
+        return self.limiter(algorithm).hit(key, count, period)
+
+    def stats(self):
+        """Return per-algorithm limiter statistics"""
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+
+rate_limits = RateLimits()
@@ -0,0 +1,109 @@
+import hashlib
+import math
+import threading
+from datetime import datetime
+
+REVOKED = 'revoked'
+LOCKED = 'locked'
+
+# Minimum token version for users whose every token is revoked (deactivated)
+ALL_VERSIONS = float('inf')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """Revoked and locked users, checked without touching the database
+
+    A Bloom filter answers "definitely not revoked" for the common case and
+    the exact dictionary behind it resolves the rare positives. Bloom filters
+    cannot forget keys, so the filter is rebuilt from the exact entries when
+    they outgrow its capacity or are replaced wholesale.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._entries = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+
+    def _entry(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            entry = self._entries[user_id] = [0, None]
+            if len(self._entries) > self._bloom.capacity:
+                self._rebuild(self._entries, self._bloom.capacity * 2)
+            else:
+                self._bloom.add(user_id)
+        return entry
+
+    def _rebuild(self, entries, capacity):
+        bloom = BloomFilter(max(capacity, len(entries)), self.error_rate)
+        for user_id in entries:
+            bloom.add(user_id)
+        self._entries, self._bloom = entries, bloom
+
+    def revoke_user(self, user_id):
+        """Reject every token issued to ``user_id``"""
+        with self._lock:
+            self._entry(user_id)[0] = ALL_VERSIONS
+
+    def revoke_versions_below(self, user_id, version):
+        """Reject tokens of ``user_id`` carrying a version lower than ``version``"""
+        with self._lock:
+            entry = self._entry(user_id)
+            entry[0] = max(entry[0], version)
+
+    def lock(self, user_id, until):
+        """Mark ``user_id`` as locked until the given UTC datetime"""
+        with self._lock:
+            self._entry(user_id)[1] = until
+
+    def replace(self, entries):
+        """Swap in a complete set of ``{user_id: (min_version, locked_until)}``"""
+        entries = {user_id: list(entry) for user_id, entry in entries.items()}
+        with self._lock:
+            self._rebuild(entries, self.capacity)
+
+    def check(self, user_id, token_version, now=None):
+        """Return REVOKED, LOCKED or None for a token of ``user_id``"""
+        if user_id not in self._bloom:
+            return None
+
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        min_version, locked_until = entry
+        if token_version < min_version:
+            return REVOKED
+        if locked_until and (now or datetime.utcnow()) < locked_until:
+            return LOCKED
+        return None
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,57 @@
+import re
+
+# Shared by the model, the marshmallow schemas and simple_server so the
+# rules (and their messages) live in one place and are compiled once
+
+PASSWORD_MIN_LENGTH = 8
+PASSWORD_SPECIAL_CHARACTERS = frozenset('!@#$%^&*(),.?":{}|<>')
+
+_UPPERCASE = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+_LOWERCASE = frozenset('abcdefghijklmnopqrstuvwxyz')
+_DIGITS = frozenset('0123456789')
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+NAME_PATTERN = re.compile(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑ\s]+$')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+
+def password_error(password):
+    """Return the first unmet password rule as a message, or None if the password is strong"""
+    if len(password) < PASSWORD_MIN_LENGTH:
+        return 'Password must be at least 8 characters long'
+
+    # One pass to collect the distinct characters, then set lookups per class
+    chars = set(password)
+    if _UPPERCASE.isdisjoint(chars):
+        return 'Password must contain at least one uppercase letter'
+    if _LOWERCASE.isdisjoint(chars):
+        return 'Password must contain at least one lowercase letter'
+    # \d also matched non-ASCII decimal digits; only check those when needed
+    if _DIGITS.isdisjoint(chars) and not any(char.isdecimal() for char in chars):
+        return 'Password must contain at least one digit'
+    if PASSWORD_SPECIAL_CHARACTERS.isdisjoint(chars):
+        return 'Password must contain at least one special character'
+    return None
+
+
+def validate_password(password):
+    """Validate password strength, returns (is_valid, message)"""
+    error = password_error(password)
+    if error:
+        return False, error
+    return True, 'Password is valid'
+
+
+def validate_email(email):
+    """Validate email format"""
+    return EMAIL_PATTERN.match(email) is not None
+
+
+def validate_name(value):
+    """Check that a name only contains letters and spaces"""
+    return NAME_PATTERN.match(value) is not None
+
+
+def phone_digits(value):
+    """Strip everything but digits from a phone number"""
+    return NON_DIGIT_PATTERN.sub('', value)
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for Neexa Backend
+For ASGI servers such as uvicorn or hypercorn: uvicorn asgi:app
+The built-in runner serves the same adapter: python serve.py --worker-class asgi
+"""
+
+import os
+from app import create_app
+from app.utils.asgi import WsgiToAsgi
+
+app = WsgiToAsgi(create_app(), max_workers=int(os.environ.get('SERVER_THREADS', 32)))
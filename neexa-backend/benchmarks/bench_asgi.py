@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: sync workers vs the asgi worker class
+Opens --idle connections that send an incomplete request and hold it (slow
+clients, mobile networks, long keep-alives), then measures how fast regular
+requests are served alongside them. A sync worker is tied up by each such
+connection, so the sync runner's concurrency limit is its worker count;
+the asgi worker holds them in its event loop.
+
+    python benchmarks/bench_asgi.py --idle 1000 --workers 4
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(worker_class, workers, port, env):
+    command = [sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port),
+               '--workers', str(workers), '--worker-class', worker_class, '--max-requests', '0']
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', path)
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on port {port} did not become ready')
+
+
+def open_idle(port, count):
+    """Connections that have sent half a request and then stall"""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'GET /api HTTP/1.1\r\nHost: localhost\r\n')
+        sockets.append(sock)
+    return sockets
+
+
+def drive(port, path, clients, duration, timeout):
+    """Regular requests from ``clients`` threads while the idle connections are held"""
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                if response.status == 200:
+                    latencies[index].append(time.perf_counter() - started)
+                    continue
+            except OSError:
+                pass
+            errors[index] += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(value for values in latencies for value in values)
+    quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else [float('nan')] * 99
+    return {
+        'requests': len(samples),
+        'errors': sum(errors),
+        'rps': len(samples) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare concurrency limits of sync and asgi workers')
+    parser.add_argument('--idle', type=int, default=1000, help='Stalled connections held open')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes per mode')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent regular clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Client timeout per request')
+    parser.add_argument('--path', default='/api', help='Endpoint to request')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            'FLASK_ENV': 'production',
+            'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'RATELIMIT_ENABLED': 'false',
+        })
+
+        print(f"{args.clients} clients for {args.duration:.0f}s, GET {args.path}, client timeout {args.timeout:.0f}s")
+        print(f"{'mode':<22}{'idle conns':>11}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for worker_class in ('sync', 'asgi'):
+            for idle in (0, args.idle):
+                port = free_port()
+                server = start_server(worker_class, args.workers, port, env)
+                held = []
+                try:
+                    wait_ready(port, args.path)
+                    held = open_idle(port, idle)
+                    result = drive(port, args.path, args.clients, args.duration, args.timeout)
+                finally:
+                    for sock in held:
+                        sock.close()
+                    # TERM lets the master stop its workers; KILL would orphan them
+                    server.terminate()
+                    server.wait()
+                label = f'{worker_class} x{args.workers}'
+                print(f"{label:<22}{idle:>11}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                      f"{result['p99_ms']:>10.2f}{result['errors']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
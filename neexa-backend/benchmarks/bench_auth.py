@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Auth hot-path microbenchmarks for Neexa Backend
+Times the building blocks of register/login/me one at a time: password
+hash verification, password and email validation, registration schema
+load, User.to_dict + jsonify and JWT create/decode.
+
+Each benchmark is calibrated to a minimum sample duration, warmed up and
+then sampled ``--repetitions`` times with the garbage collector off.
+Results can be written as JSON and compared with an earlier run:
+
+    python benchmarks/bench_auth.py --output before.json
+    python benchmarks/bench_auth.py --compare before.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token, decode_token
+from app import create_app
+from app.models.user import User
+from app.schemas.user_schema import user_registration_schema
+from app.utils.hashing import _generate, _verify
+from config.config import Config
+
+PASSWORD = 'BenchPass123!'
+REGISTRATION = {
+    'email': 'bench@example.com',
+    'password': PASSWORD,
+    'confirm_password': PASSWORD,
+    'first_name': 'Bench',
+    'last_name': 'User',
+    'phone': '+54 11 5555-5555',
+}
+
+
+def build_benchmarks(hash_method):
+    """Return {name: zero-argument callable}; call inside an app context"""
+    password_hash = _generate(PASSWORD, hash_method)
+
+    user = User('bench@example.com', PASSWORD, 'Bench', 'User')
+    user.id = 42
+    user.is_active = True
+    user.is_verified = False
+    user.token_version = 0
+    user.preferred_currency = 'ARS'
+    user.created_at = user.updated_at = user.last_login = datetime(2024, 1, 1, 12, 0, 0)
+
+    claims = user.token_claims()
+    token = create_access_token(identity=user.id, additional_claims=claims)
+
+    def to_dict_jsonify():
+        return jsonify({'user': user.to_dict()}).get_data()
+
+    return {
+        'check_password_hash': lambda: _verify(password_hash, PASSWORD),
+        'validate_password': lambda: User.validate_password(PASSWORD),
+        'validate_email': lambda: User.validate_email('bench.user@example.com'),
+        'registration_schema_load': lambda: user_registration_schema.load(REGISTRATION),
+        'to_dict_jsonify': to_dict_jsonify,
+        'create_access_token': lambda: create_access_token(identity=user.id, additional_claims=claims),
+        'decode_token': lambda: decode_token(token),
+    }
+
+
+def time_loops(func, loops):
+    """Seconds taken by ``loops`` calls of ``func`` with the GC disabled"""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - started
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def calibrate(func, min_time):
+    """Smallest power-of-two loop count whose sample lasts at least ``min_time``"""
+    loops = 1
+    while time_loops(func, loops) < min_time and loops < 2 ** 24:
+        loops *= 2
+    return loops
+
+
+def run_benchmark(func, repetitions, warmups, min_time):
+    """Per-call timings in seconds, one value per repetition"""
+    loops = calibrate(func, min_time)
+    for _ in range(warmups):
+        time_loops(func, loops)
+    values = [time_loops(func, loops) / loops for _ in range(repetitions)]
+    return {
+        'loops': loops,
+        'values': values,
+        'mean': statistics.fmean(values),
+        'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+        'median': statistics.median(values),
+        'min': min(values),
+    }
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f'{seconds * 1e3:.3f} ms'
+    return f'{seconds * 1e6:.2f} us'
+
+
+def compare(results, previous, threshold):
+    """Print per-benchmark changes; returns the names that got significantly slower"""
+    slower = []
+    print(f"\n{'benchmark':<26}{'before':>14}{'after':>14}{'change':>10}")
+    for name, current in results['benchmarks'].items():
+        before = previous.get('benchmarks', {}).get(name)
+        if before is None:
+            print(f"{name:<26}{'-':>14}{format_time(current['median']):>14}{'new':>10}")
+            continue
+        change = current['median'] / before['median'] - 1
+        # A change smaller than either run's own noise is not a change
+        noise = max(threshold,
+                    2 * before['stdev'] / before['mean'],
+                    2 * current['stdev'] / current['mean'])
+        verdict = ''
+        if abs(change) > noise:
+            verdict = 'slower' if change > 0 else 'faster'
+            if change > 0:
+                slower.append(name)
+        print(f"{name:<26}{format_time(before['median']):>14}{format_time(current['median']):>14}"
+              f"{change:>+9.1%} {verdict}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark auth hot-path primitives')
+    parser.add_argument('-b', '--bench', action='append', help='Run only these benchmarks (repeatable)')
+    parser.add_argument('--repetitions', type=int, default=20, help='Timed samples per benchmark')
+    parser.add_argument('--warmups', type=int, default=3, help='Untimed samples before timing')
+    parser.add_argument('--min-time', type=float, default=0.05, help='Minimum seconds per sample')
+    parser.add_argument('--hash-method', default=Config.PASSWORD_HASH_METHOD,
+                        help='Password hash policy for check_password_hash (default: production policy)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Compare against a previous --output file')
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='Minimum relative change reported as faster/slower')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'hash_method': args.hash_method,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'benchmarks': {},
+    }
+
+    with app.app_context():
+        benchmarks = build_benchmarks(args.hash_method)
+        unknown = set(args.bench or ()) - set(benchmarks)
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+        print(f"{'benchmark':<26}{'median':>14}{'stdev':>10}{'loops':>10}")
+        for name, func in benchmarks.items():
+            if args.bench and name not in args.bench:
+                continue
+            result = run_benchmark(func, args.repetitions, args.warmups, args.min_time)
+            results['benchmarks'][name] = result
+            print(f"{name:<26}{format_time(result['median']):>14}"
+                  f"{result['stdev'] / result['mean']:>9.1%} {result['loops']:>9}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nResults written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if compare(results, previous, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
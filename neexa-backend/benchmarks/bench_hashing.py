@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Password hashing benchmark for Neexa Backend
+Measures verify latency per algorithm/cost to pick a PASSWORD_HASH_METHOD
+that fits the login latency budget
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.hashing import _generate, _verify, normalize_method
+
+DEFAULT_METHODS = [
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:1000000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+    'scrypt:65536:8:1',
+    'bcrypt:10',
+    'bcrypt:12',
+    'bcrypt:13',
+]
+
+PASSWORD = 'BenchPass123!'
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def bench_method(method, iterations, warmup):
+    """Time verify calls for a single hashing method"""
+    password_hash = _generate(PASSWORD, method)
+
+    for _ in range(warmup):
+        _verify(password_hash, PASSWORD)
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        _verify(password_hash, PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'method': method,
+        'iterations': iterations,
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(timings[-1], 3),
+    }
+
+
+def recommend(results, budget_ms):
+    """Pick the most expensive method per algorithm whose p99 fits the budget"""
+    best = {}
+    for result in results:
+        if result['p99_ms'] > budget_ms:
+            continue
+        algorithm = result['method'].split(':')[0]
+        if algorithm not in best or result['p99_ms'] > best[algorithm]['p99_ms']:
+            best[algorithm] = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark password verify latency')
+    parser.add_argument('--methods', nargs='+', default=DEFAULT_METHODS,
+                        help='hashing methods to measure (e.g. scrypt:32768:8:1 bcrypt:12)')
+    parser.add_argument('--iterations', type=int, default=20, help='timed verifications per method')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed verifications per method')
+    parser.add_argument('--budget-ms', type=float, default=250.0,
+                        help='p99 verify budget used for the recommendation')
+    parser.add_argument('--json', dest='json_path', help='write results to this JSON file')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'method':<26}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for method in args.methods:
+        result = bench_method(normalize_method(method), args.iterations, args.warmup)
+        results.append(result)
+        print(f"{result['method']:<26}{result['mean_ms']:>10.2f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+    best = recommend(results, args.budget_ms)
+    print(f"\nHighest cost within a {args.budget_ms:.0f} ms p99 budget:")
+    if not best:
+        print("  none of the measured methods fit the budget")
+    for algorithm, result in sorted(best.items()):
+        print(f"  {algorithm:<8} {result['method']} (p99 {result['p99_ms']:.2f} ms)")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'budget_ms': args.budget_ms, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
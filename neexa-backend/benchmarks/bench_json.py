@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+JSON serialization benchmark for Neexa Backend
+Compares Flask's stdlib JSON provider with FastJSONProvider on the user
+and error payloads the API returns
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.utils import json_provider
+from app.utils.json_provider import FastJSONProvider
+
+NOW = datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+USER = {
+    'id': 1234,
+    'email': 'usuario@ejemplo.com',
+    'first_name': 'Juan',
+    'last_name': 'Pérez',
+    'is_active': True,
+    'is_verified': True,
+    'created_at': NOW.isoformat(),
+    'last_login': NOW.isoformat(),
+    'preferred_currency': 'ARS'
+}
+
+PAYLOADS = {
+    'login response': {
+        'message': 'Login successful',
+        'user': USER,
+        'access_token': 'x' * 600,
+        'refresh_token': 'y' * 300
+    },
+    'validation error': {
+        'error': 'Validation failed',
+        'details': {
+            'password': ['Password must contain at least one uppercase letter'],
+            'email': ['Not a valid email address.']
+        }
+    },
+    'raw datetimes': dict(USER, created_at=NOW, last_login=NOW),
+    'user page (50)': {'users': [dict(USER, id=i) for i in range(50)], 'next_cursor': 'WyJpZCIsWzUwXV0'},
+}
+
+
+def measure(func, number):
+    """Best of five runs, in microseconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON serialization')
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    if json_provider.orjson is None:
+        print('orjson is not installed; FastJSONProvider uses the stdlib encoder')
+
+    app = Flask(__name__)
+    stdlib = DefaultJSONProvider(app)
+    # Flask's default encodes datetimes as HTTP dates; give it the same ISO default
+    stdlib.default = staticmethod(json_provider._default)
+    fast = FastJSONProvider(app)
+
+    print(f"{'payload':<20}{'stdlib us':>11}{'fast us':>10}{'speedup':>9}")
+    with app.app_context():
+        for name, payload in PAYLOADS.items():
+            number = args.number // 10 if 'page' in name else args.number
+            before = measure(lambda: stdlib.response(payload), number)
+            after = measure(lambda: fast.response(payload), number)
+            print(f"{name:<20}{before:>11.2f}{after:>10.2f}{before / after:>8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
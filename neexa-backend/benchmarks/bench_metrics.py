@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Request metrics benchmark for Neexa Backend
+Measures the per-request overhead of RequestMetrics and the cost of a
+/metrics scrape
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from app.middleware.metrics import RequestMetrics
+
+BUDGET_US = 20.0
+
+
+def make_app(instrumented, routes):
+    """Build an app with ``routes`` trivial JSON routes"""
+    app = Flask(__name__)
+    metrics = None
+    if instrumented:
+        metrics = RequestMetrics()
+        metrics.init_app(app)
+
+    for n in range(routes):
+        app.add_url_rule(f'/route{n}/<int:item_id>', f'route{n}', lambda item_id: jsonify({'id': item_id}))
+    return app, metrics
+
+
+def bench_requests(instrumented, iterations, routes):
+    """Average microseconds per request through the full WSGI stack"""
+    app, _ = make_app(instrumented, routes)
+    client = app.test_client()
+    for n in range(500):
+        client.get(f'/route{n % routes}/1')
+    started = time.perf_counter()
+    for n in range(iterations):
+        client.get(f'/route{n % routes}/1')
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def bench_scrape(iterations, routes):
+    """Milliseconds to render /metrics after ``iterations`` requests"""
+    app, metrics = make_app(True, routes)
+    client = app.test_client()
+    for n in range(iterations):
+        client.get(f'/route{n % routes}/1')
+    started = time.perf_counter()
+    body = metrics.render()
+    return (time.perf_counter() - started) * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark request metrics overhead')
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--routes', type=int, default=20)
+    args = parser.parse_args()
+
+    # Alternate runs so drift affects both sides alike, keep the best of each
+    plain = instrumented = float('inf')
+    for _ in range(5):
+        plain = min(plain, bench_requests(False, args.iterations, args.routes))
+        instrumented = min(instrumented, bench_requests(True, args.iterations, args.routes))
+    overhead = instrumented - plain
+    scrape_ms, size = bench_scrape(args.iterations, args.routes)
+
+    print(f"plain request:        {plain:8.2f} us")
+    print(f"instrumented request: {instrumented:8.2f} us")
+    status = 'OK' if overhead < BUDGET_US else 'OVER BUDGET'
+    print(f"metrics overhead:     {overhead:8.2f} us/request ({status}, budget {BUDGET_US:.0f} us)")
+    print(f"/metrics render:      {scrape_ms:8.2f} ms for {args.routes} routes ({size} bytes)")
+    return 0 if overhead < BUDGET_US else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Rate limiter benchmark for Neexa Backend
+Measures the cost of a limiter hit and the per-request overhead of
+rate_limit_by_user, which should stay well under 50us
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from functools import wraps
+from flask import Flask, g, jsonify
+from app.utils.rate_limit import RateLimiter, rate_limits
+from app.middleware.auth import rate_limit_by_user
+
+BUDGET_US = 50.0
+
+
+def bench_hits(algorithm, keys, iterations, threads):
+    """Time RateLimiter.hit spread over ``keys`` keys from ``threads`` threads"""
+    limiter = RateLimiter(algorithm, shards=16, max_keys=keys * 2)
+    per_thread = iterations // threads
+
+    def worker(offset):
+        hit = limiter.hit
+        for i in range(per_thread):
+            hit(f'user:{(i + offset) % keys}', 1000000, 3600)
+
+    workers = [threading.Thread(target=worker, args=(n * 7919,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return elapsed / (per_thread * threads) * 1e6
+
+
+def bench_decorator(iterations):
+    """Overhead of rate_limit_by_user on a trivial view, keyed by IP and by user"""
+    app = Flask(__name__)
+    app.config.update(RATELIMIT_ENABLED=True, RATELIMIT_DEFAULT='1000000 per hour',
+                      JWT_SECRET_KEY='bench')
+    from flask_jwt_extended import JWTManager
+    JWTManager(app)
+    rate_limits.init_app(app)
+
+    def plain():
+        return jsonify({'ok': True})
+
+    def authenticated(view):
+        """Stands in for token_required, which hands the resolved user id on through g"""
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            g._rate_limit_user_id = 42
+            return view(*args, **kwargs)
+        return decorated
+
+    @rate_limit_by_user(key='ip')
+    def limited_ip():
+        return jsonify({'ok': True})
+
+    @authenticated
+    @rate_limit_by_user
+    def limited_user():
+        return jsonify({'ok': True})
+
+    timings = {}
+    for name, view in (('plain', plain), ('ip', limited_ip),
+                       ('authenticated', authenticated(plain)), ('user', limited_user)):
+        with app.test_request_context('/bench', environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+            for _ in range(1000):
+                view()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                view()
+            timings[name] = (time.perf_counter() - started) / iterations * 1e6
+    return {
+        'ip': timings['ip'] - timings['plain'],
+        'user': timings['user'] - timings['authenticated'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the rate limiter')
+    parser.add_argument('--iterations', type=int, default=200000)
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<16}{'threads':>8}{'us/hit':>10}")
+    for algorithm in ('token_bucket', 'sliding_window'):
+        for threads in (1, args.threads):
+            cost = bench_hits(algorithm, args.keys, args.iterations, threads)
+            print(f"{algorithm:<16}{threads:>8}{cost:>10.2f}")
+
+    overheads = bench_decorator(args.iterations // 10)
+    print()
+    for key, overhead in overheads.items():
+        status = 'OK' if overhead < BUDGET_US else 'OVER BUDGET'
+        print(f"rate_limit_by_user(key='{key}') overhead: {overhead:.2f} us/request "
+              f"({status}, budget {BUDGET_US:.0f} us)")
+    return 0 if all(overhead < BUDGET_US for overhead in overheads.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
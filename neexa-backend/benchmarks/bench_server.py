@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Serving throughput benchmark for Neexa Backend
+Starts the app under the Werkzeug development server (as start.py and
+app.py run it, with and without debug) and under the pre-forking runner in
+serve.py, then drives each with concurrent HTTP clients and reports
+requests per second and latency percentiles.
+
+    python benchmarks/bench_server.py --clients 16 --duration 10 --workers 4
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEV_SERVER = """
+import logging
+from app import create_app
+logging.getLogger('werkzeug').setLevel(logging.WARNING)
+create_app().run(host='127.0.0.1', port={port}, debug={debug}, use_reloader=False)
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, workers, env):
+    if mode == 'prefork':
+        command = [sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port),
+                   '--workers', str(workers)]
+    else:
+        command = [sys.executable, '-c', DEV_SERVER.format(port=port, debug=mode == 'dev-debug')]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', path)
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on port {port} did not become ready')
+
+
+def drive(port, path, clients, duration):
+    """Hit ``path`` from ``clients`` threads for ``duration`` seconds"""
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                # A new connection per request, as the sync workers close after each
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                connection.close()
+                if response.status != 200:
+                    errors[index] += 1
+                    continue
+            except OSError:
+                errors[index] += 1
+                continue
+            latencies[index].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(value for values in latencies for value in values)
+    quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else [0.0] * 99
+    return {
+        'requests': len(samples),
+        'errors': sum(errors),
+        'rps': len(samples) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p95_ms': quantiles[94] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the dev server with the pre-forking runner')
+    parser.add_argument('--modes', default='dev-debug,dev,prefork',
+                        help='Comma separated: dev-debug, dev, prefork')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Prefork workers')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per mode')
+    parser.add_argument('--path', default='/api', help='Endpoint to request')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            'FLASK_ENV': 'production',
+            'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'RATELIMIT_ENABLED': 'false',
+        })
+
+        print(f"{args.clients} clients, {args.duration:.0f}s per mode, GET {args.path}, "
+              f"{args.workers} prefork workers")
+        print(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for mode in args.modes.split(','):
+            port = free_port()
+            server = start_server(mode, port, args.workers, env)
+            try:
+                wait_ready(port, args.path)
+                result = drive(port, args.path, args.clients, args.duration)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            print(f"{mode:<12}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                  f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
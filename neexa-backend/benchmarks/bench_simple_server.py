@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+simple_server login benchmark for Neexa Backend
+Compares one sqlite connection per request against the pooled WAL
+connections under parallel logins
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite3
+from werkzeug.security import generate_password_hash
+import simple_server
+
+PASSWORD = 'BenchPass123!'
+# Cheap hash so the benchmark measures the database path, not the KDF
+BENCH_HASH_METHOD = 'pbkdf2:sha256:1000'
+
+
+def prepare_database(path, users):
+    """Create the schema and ``users`` accounts in a fresh database file"""
+    simple_server.DATABASE = path
+    simple_server.init_db()
+    password_hash = generate_password_hash(PASSWORD, method=BENCH_HASH_METHOD)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        'INSERT INTO users (email, password_hash, first_name, last_name) VALUES (?, ?, ?, ?)',
+        [(f'bench{i}@example.com', password_hash, 'Bench', 'User') for i in range(users)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench_logins(pool_size, users, requests, threads):
+    """Run ``requests`` logins from ``threads`` threads; returns logins per second"""
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare_database(os.path.join(tmp, 'bench.db'), users)
+        simple_server.DB_POOL_SIZE = pool_size
+        app = simple_server.app
+        per_thread = requests // threads
+        errors = []
+
+        def worker(offset):
+            client = app.test_client()
+            for i in range(per_thread):
+                response = client.post('/api/auth/login', json={
+                    'email': f'bench{(i + offset) % users}@example.com',
+                    'password': PASSWORD
+                })
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+
+        workers = [threading.Thread(target=worker, args=(n * 31,)) for n in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        simple_server.get_pool().close()
+        if errors:
+            raise RuntimeError(f'{len(errors)} logins failed, first status {errors[0]}')
+        return per_thread * threads / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark simple_server logins')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--pool-size', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'mode':<24}{'threads':>8}{'logins/s':>12}")
+    results = {}
+    for mode, pool_size in (('connect per request', 0), ('pooled (WAL)', args.pool_size)):
+        for threads in (1, args.threads):
+            rate = bench_logins(pool_size, args.users, args.requests, threads)
+            results[(mode, threads)] = rate
+            print(f"{mode:<24}{threads:>8}{rate:>12.0f}")
+
+    speedup = results[('pooled (WAL)', args.threads)] / results[('connect per request', args.threads)]
+    print(f"\npooled speedup with {args.threads} threads: {speedup:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
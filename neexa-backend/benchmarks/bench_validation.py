@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Validation benchmark for Neexa Backend
+Compares the per-request cost of the previous validation code (a new
+schema per call and one regex search per password rule) against the
+shared schemas and the one-pass password checker
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.user_schema import (
+    UserRegistrationSchema,
+    UserLoginSchema,
+    user_registration_schema,
+    user_login_schema
+)
+from app.utils.validation import validate_password, validate_email
+
+REGISTRATION = {
+    'email': 'bench@example.com',
+    'password': 'BenchPass123!',
+    'confirm_password': 'BenchPass123!',
+    'first_name': 'Bench',
+    'last_name': 'User',
+    'phone': '+54 11 5555-5555',
+}
+LOGIN = {'email': 'bench@example.com', 'password': 'BenchPass123!'}
+
+
+def legacy_validate_password(password):
+    """Password check as it was written in the model and simple_server"""
+    if len(password) < 8:
+        return False, "Password must be at least 8 characters long"
+    if not re.search(r'[A-Z]', password):
+        return False, "Password must contain at least one uppercase letter"
+    if not re.search(r'[a-z]', password):
+        return False, "Password must contain at least one lowercase letter"
+    if not re.search(r'\d', password):
+        return False, "Password must contain at least one digit"
+    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        return False, "Password must contain at least one special character"
+    return True, "Password is valid"
+
+
+def legacy_validate_email(email):
+    """Email check as it was written in the model and simple_server"""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+
+def measure(func, number):
+    """Best of five runs, in microseconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark request validation')
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+    number = args.number
+
+    cases = [
+        ('password rules',
+         lambda: legacy_validate_password('BenchPass123!'),
+         lambda: validate_password('BenchPass123!'),
+         number * 10),
+        ('email format',
+         lambda: legacy_validate_email('bench@example.com'),
+         lambda: validate_email('bench@example.com'),
+         number * 10),
+        ('login schema',
+         lambda: UserLoginSchema().load(LOGIN),
+         lambda: user_login_schema.load(LOGIN),
+         number),
+        ('registration schema',
+         lambda: UserRegistrationSchema().load(REGISTRATION),
+         lambda: user_registration_schema.load(REGISTRATION),
+         number // 2),
+    ]
+
+    print(f"{'case':<22}{'before us':>11}{'after us':>11}{'speedup':>9}")
+    for name, before, after, iterations in cases:
+        before_us = measure(before, iterations)
+        after_us = measure(after, iterations)
+        print(f"{name:<22}{before_us:>11.2f}{after_us:>11.2f}{before_us / after_us:>8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
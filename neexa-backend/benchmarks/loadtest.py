@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the Neexa auth and user API
+Concurrent virtual users each run register -> login -> me -> profile
+update -> refresh, either in process against create_app('loadtest') or
+against a running server (--url). Reports throughput and p50/p95/p99 per
+endpoint, optionally saves the results as JSON and compares them with a
+saved baseline, exiting 1 on a regression.
+
+    python benchmarks/loadtest.py --users 8 --iterations 25 --save-baseline loadtest-baseline.json
+    python benchmarks/loadtest.py --users 8 --iterations 25 --baseline loadtest-baseline.json
+
+Run the server for --url mode with rate limiting off, e.g.
+FLASK_ENV=loadtest python app.py
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'LoadTest123!'
+
+# Endpoint labels in scenario order
+STEPS = ('register', 'login', 'me', 'update_profile', 'refresh')
+
+
+class InProcessTransport:
+    """Sends requests through a Flask test client (one per virtual user)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """Sends requests over one keep-alive HTTP connection (one per virtual user)"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=30)
+        self.prefix = parts.path.rstrip('/')
+
+    def request(self, method, path, body=None, token=None):
+        headers = {}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        self.connection.request(method, self.prefix + path, body=data, headers=headers)
+        response = self.connection.getresponse()
+        payload = response.read()
+        try:
+            return response.status, json.loads(payload) if payload else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        self.connection.close()
+
+
+def run_scenario(transport, record, run_id, user_index, iteration):
+    """One register -> login -> me -> update -> refresh pass for a new account"""
+    email = f'load-{run_id}-{user_index}-{iteration}@example.com'
+
+    def step(name, expected, method, path, body=None, token=None):
+        started = time.perf_counter()
+        status, payload = transport.request(method, path, body, token)
+        record(name, time.perf_counter() - started, status == expected)
+        return payload if status == expected else None
+
+    registered = step('register', 201, 'POST', '/api/auth/register', {
+        'email': email,
+        'password': PASSWORD,
+        'confirm_password': PASSWORD,
+        'first_name': 'Load',
+        'last_name': 'Test'
+    })
+    if registered is None:
+        return
+    tokens = step('login', 200, 'POST', '/api/auth/login', {'email': email, 'password': PASSWORD})
+    if tokens is None:
+        return
+    step('me', 200, 'GET', '/api/auth/me', token=tokens['access_token'])
+    step('update_profile', 200, 'PUT', '/api/user/profile', {'first_name': f'Load{iteration}'},
+         token=tokens['access_token'])
+    step('refresh', 200, 'POST', '/api/auth/refresh', token=tokens['refresh_token'])
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_load(make_transport, users, iterations, warmup):
+    """Run ``users`` concurrent virtual users; returns (per-endpoint samples, wall seconds)"""
+    run_id = uuid.uuid4().hex[:8]
+
+    if warmup:
+        transport = make_transport()
+        for n in range(warmup):
+            run_scenario(transport, lambda *args: None, run_id, 'warmup', n)
+        transport.close()
+
+    # Each virtual user records into its own dict; merged after the run
+    results = [{} for _ in range(users)]
+    start_barrier = threading.Barrier(users + 1)
+
+    def virtual_user(index):
+        samples = results[index]
+
+        def record(name, seconds, ok):
+            latencies, errors = samples.setdefault(name, ([], [0]))
+            latencies.append(seconds)
+            if not ok:
+                errors[0] += 1
+
+        transport = make_transport()
+        start_barrier.wait()
+        try:
+            for iteration in range(iterations):
+                run_scenario(transport, record, run_id, index, iteration)
+        finally:
+            transport.close()
+
+    threads = [threading.Thread(target=virtual_user, args=(n,)) for n in range(users)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    merged = {}
+    for samples in results:
+        for name, (latencies, errors) in samples.items():
+            total = merged.setdefault(name, ([], [0]))
+            total[0].extend(latencies)
+            total[1][0] += errors[0]
+    return merged, elapsed
+
+
+def summarize(samples, elapsed):
+    """Per-endpoint throughput and latency percentiles in milliseconds"""
+    endpoints = {}
+    for name in STEPS:
+        if name not in samples:
+            continue
+        latencies, errors = samples[name]
+        latencies = sorted(latencies)
+        endpoints[name] = {
+            'requests': len(latencies),
+            'errors': errors[0],
+            'throughput_rps': round(len(latencies) / elapsed, 2),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        }
+    total = sum(endpoint['requests'] for endpoint in endpoints.values())
+    return {
+        'elapsed_seconds': round(elapsed, 3),
+        'requests': total,
+        'errors': sum(endpoint['errors'] for endpoint in endpoints.values()),
+        'throughput_rps': round(total / elapsed, 2),
+        'endpoints': endpoints,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """List regressions of ``results`` against ``baseline`` beyond ``tolerance``"""
+    regressions = []
+    if results['errors'] > baseline.get('errors', 0):
+        regressions.append(f"errors: {results['errors']} > baseline {baseline.get('errors', 0)}")
+    for name, base in baseline.get('endpoints', {}).items():
+        current = results['endpoints'].get(name)
+        if current is None:
+            regressions.append(f'{name}: missing from this run')
+            continue
+        if current['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']} req/s < baseline {base['throughput_rps']} req/s"
+            )
+        for key in ('p95_ms', 'p99_ms'):
+            if current[key] > base[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {current[key]} > baseline {base[key]}')
+    return regressions
+
+
+def print_report(results):
+    print(f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, endpoint in results['endpoints'].items():
+        print(f"{name:<16}{endpoint['requests']:>10}{endpoint['errors']:>8}{endpoint['throughput_rps']:>10.1f}"
+              f"{endpoint['p50_ms']:>10.2f}{endpoint['p95_ms']:>10.2f}{endpoint['p99_ms']:>10.2f}")
+    print(f"total: {results['requests']} requests in {results['elapsed_seconds']} s "
+          f"({results['throughput_rps']} req/s), {results['errors']} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the auth and user API')
+    parser.add_argument('--url', help='Base URL of a running server (default: in process)')
+    parser.add_argument('--users', type=int, default=8, help='Concurrent virtual users')
+    parser.add_argument('--iterations', type=int, default=25, help='Scenarios per virtual user')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed scenarios before the run')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--save-baseline', help='Write the results as the new baseline')
+    parser.add_argument('--baseline', help='Compare against this baseline and fail on regression')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative throughput drop / p95 and p99 increase')
+    args = parser.parse_args()
+
+    if args.url:
+        def make_transport():
+            return HTTPTransport(args.url)
+        target = args.url
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        os.environ.setdefault('LOADTEST_DATABASE_URL', f"sqlite:///{os.path.join(tmp.name, 'loadtest.db')}")
+        from app import create_app, db
+        app = create_app('loadtest')
+        with app.app_context():
+            db.create_all()
+        # Per-request INFO logging would dominate the measurement
+        logging.disable(logging.INFO)
+
+        def make_transport():
+            return InProcessTransport(app)
+        target = 'in-process'
+
+    print(f'Load test: {args.users} virtual users x {args.iterations} scenarios against {target}')
+    samples, elapsed = run_load(make_transport, args.users, args.iterations, args.warmup)
+    results = summarize(samples, elapsed)
+    results['meta'] = {
+        'target': target,
+        'users': args.users,
+        'iterations': args.iterations,
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    print_report(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f'Results written to {path}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f'Regressions against {args.baseline} (tolerance {args.tolerance:.0%}):')
+            for regression in regressions:
+                print(f'  {regression}')
+            return 1
+        print(f'No regressions against {args.baseline}')
+    return 1 if results['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,16 +32,34 @@ CREATE TABLE IF NOT EXISTS users (
     last_login DATETIME NULL,
     login_attempts INT DEFAULT 0,
     locked_until DATETIME NULL,
+    token_version INT DEFAULT 0 NOT NULL,
     phone VARCHAR(20) NULL,
     date_of_birth DATE NULL,
     preferred_currency VARCHAR(3) DEFAULT 'ARS',
     
     INDEX idx_email (email),
-    INDEX idx_is_active (is_active),
-    INDEX idx_created_at (created_at)
+    INDEX idx_is_active (is_active, id),
+    INDEX idx_created_at (created_at, id),
+    INDEX idx_users_verified (is_verified, id),
+    INDEX idx_users_active_verified (is_active, is_verified, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Create token denylist table (tokens revoked on logout, swept after expiry)
+CREATE TABLE IF NOT EXISTS token_blocklist (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    jti VARCHAR(36) NOT NULL UNIQUE,
+    token_type VARCHAR(10) NOT NULL,
+    user_id INT NULL,
+    expires_at DATETIME NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    
+    INDEX idx_token_blocklist_user_id (user_id),
+    INDEX idx_token_blocklist_expires_at (expires_at),
+    INDEX idx_token_blocklist_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Insert a sample admin user (password: Admin123!)
+-- The bcrypt hash is upgraded to PASSWORD_HASH_METHOD on the first successful login
 INSERT IGNORE INTO users (email, password_hash, first_name, last_name, is_active, is_verified) 
 VALUES (
     'admin@neexa.com', 
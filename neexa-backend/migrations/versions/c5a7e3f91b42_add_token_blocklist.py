@@ -0,0 +1,41 @@
+"""add token_blocklist
+
+Revision ID: c5a7e3f91b42
+Revises: 8b4e6d0a2c31
+Create Date: 2026-10-17 10:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7e3f91b42'
+down_revision = '8b4e6d0a2c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'token_blocklist',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('token_type', sa.String(length=10), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_token_blocklist_jti', 'token_blocklist', ['jti'], unique=True)
+    op.create_index('ix_token_blocklist_user_id', 'token_blocklist', ['user_id'], unique=False)
+    op.create_index('ix_token_blocklist_expires_at', 'token_blocklist', ['expires_at'], unique=False)
+    op.create_index('ix_token_blocklist_created_at', 'token_blocklist', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_token_blocklist_created_at', table_name='token_blocklist')
+    op.drop_index('ix_token_blocklist_expires_at', table_name='token_blocklist')
+    op.drop_index('ix_token_blocklist_user_id', table_name='token_blocklist')
+    op.drop_index('ix_token_blocklist_jti', table_name='token_blocklist')
+    op.drop_table('token_blocklist')
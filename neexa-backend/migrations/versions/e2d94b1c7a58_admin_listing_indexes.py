@@ -0,0 +1,54 @@
+"""keyset pagination indexes for the admin user listing
+
+Revision ID: e2d94b1c7a58
+Revises: c5a7e3f91b42
+Create Date: 2026-10-17 10:20:00.000000
+
+Databases created from database/init.sql already have ``idx_is_active`` and
+``idx_created_at`` on the single column; those are rebuilt with ``id`` as the
+trailing sort key.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2d94b1c7a58'
+down_revision = 'c5a7e3f91b42'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    'idx_is_active': ['is_active', 'id'],
+    'idx_created_at': ['created_at', 'id'],
+    'idx_users_verified': ['is_verified', 'id'],
+    'idx_users_active_verified': ['is_active', 'is_verified', 'id'],
+}
+
+# The single-column indexes database/init.sql used to create
+PREVIOUS_INDEXES = {
+    'idx_is_active': ['is_active'],
+    'idx_created_at': ['created_at'],
+}
+
+
+def upgrade():
+    existing = {
+        index['name']: index['column_names']
+        for index in sa.inspect(op.get_bind()).get_indexes('users')
+    }
+    for name, columns in INDEXES.items():
+        if existing.get(name) == columns:
+            continue
+        if name in existing:
+            op.drop_index(name, table_name='users')
+        op.create_index(name, 'users', columns, unique=False)
+
+
+def downgrade():
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name='users')
+    for name, columns in PREVIOUS_INDEXES.items():
+        op.create_index(name, 'users', columns, unique=False)
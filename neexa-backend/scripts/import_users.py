@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Bulk user import for Neexa Backend
+Streams users from a CSV or NDJSON file, validates them with the registration
+schema rules, hashes passwords in a process pool and inserts them in batches
+
+Each row needs email, first_name, last_name and either password or, with
+--pre-hashed, password_hash. phone, date_of_birth and preferred_currency are
+optional; any other column is ignored. Rejected rows, including rows the
+database refuses on insert, are counted as invalid and written to --errors.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+# Add the parent directory to the path so we can import the app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from marshmallow import ValidationError, EXCLUDE
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from app import create_app, db
+from app.models.user import User
+from app.schemas.user_schema import user_registration_schema
+from app.utils.hashing import _generate, hash_parameters, normalize_method
+
+# bcrypt modular crypt format, or werkzeug's method$salt$hash
+BCRYPT_HASH = re.compile(r'^\$2[abxy]?\$\d{2}\$[./A-Za-z0-9]{53}$')
+WERKZEUG_HASH = re.compile(r'^[a-z0-9]+(:[a-z0-9]+)*\$[^$]+\$[0-9a-f]+$')
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict) from a CSV or NDJSON stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_num, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError as e:
+            yield line_num, e
+
+
+def valid_password_hash(password_hash):
+    """Whether ``password_hash`` is a complete hash in a method the app can verify"""
+    if not password_hash or not isinstance(password_hash, str):
+        return False
+    if not (BCRYPT_HASH.match(password_hash) or WERKZEUG_HASH.match(password_hash)):
+        return False
+    try:
+        hash_parameters(password_hash)
+    except (ValueError, IndexError):
+        return False
+    return True
+
+
+def validate_row(row, pre_hashed):
+    """Validate one input row, returns (values, None) or (None, errors)"""
+    if isinstance(row, Exception):
+        return None, {'_row': [f'Invalid JSON: {row}']}
+    if not isinstance(row, dict):
+        return None, {'_row': ['Expected an object']}
+
+    # Empty CSV cells mean "not provided"
+    row = {key: value for key, value in row.items() if key and value not in ('', None)}
+    password_hash = row.pop('password_hash', None)
+
+    partial = ('confirm_password', 'password') if pre_hashed else ('confirm_password',)
+    try:
+        data = user_registration_schema.load(row, partial=partial, unknown=EXCLUDE)
+    except ValidationError as e:
+        return None, e.messages
+
+    if pre_hashed and not valid_password_hash(password_hash):
+        return None, {'password_hash': ['Unsupported or missing password hash']}
+
+    return {
+        'email': data['email'].lower().strip(),
+        'password': data.get('password'),
+        'password_hash': password_hash,
+        'first_name': data['first_name'].strip(),
+        'last_name': data['last_name'].strip(),
+        'phone': data.get('phone'),
+        'date_of_birth': data.get('date_of_birth'),
+        'preferred_currency': data.get('preferred_currency', 'ARS'),
+        'is_verified': False,
+    }, None
+
+
+def existing_emails(emails):
+    """Return the subset of ``emails`` already registered"""
+    if not emails:
+        return set()
+    return set(db.session.execute(select(User.email).where(User.email.in_(emails))).scalars())
+
+
+class Importer:
+    """Validates, hashes and inserts users batch by batch"""
+
+    def __init__(self, batch_size, pre_hashed, executor, method, workers=1, dry_run=False, errors=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.pre_hashed = pre_hashed
+        self.executor = executor
+        self.method = method
+        self.dry_run = dry_run
+        self.errors = errors
+        self.seen = set()
+        self.imported = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.started = time.perf_counter()
+
+    def run(self, rows):
+        """Import every row from the ``rows`` iterator"""
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+            self.report(final=False)
+        self.report(final=True)
+
+    def import_batch(self, batch):
+        values = []
+        lines = []
+        for line_num, row in batch:
+            user, errors = validate_row(row, self.pre_hashed)
+            if errors:
+                self.invalid += 1
+                self.record_error(line_num, errors)
+                continue
+            if user['email'] in self.seen:
+                self.skipped += 1
+                continue
+            self.seen.add(user['email'])
+            values.append(user)
+            lines.append(line_num)
+
+        # Rows already in the database are skipped, not updated
+        taken = existing_emails([user['email'] for user in values])
+        if taken:
+            self.skipped += len(taken)
+            kept = [(line_num, user) for line_num, user in zip(lines, values) if user['email'] not in taken]
+            lines = [line_num for line_num, _ in kept]
+            values = [user for _, user in kept]
+
+        if not self.pre_hashed and values:
+            chunksize = max(1, len(values) // (self.workers * 4))
+            passwords = [user['password'] for user in values]
+            for user, password_hash in zip(values, self.executor.map(_generate, passwords, repeat(self.method), chunksize=chunksize)):
+                user['password_hash'] = password_hash
+
+        for user in values:
+            del user['password']
+
+        if values and not self.dry_run:
+            try:
+                # One executemany INSERT per batch
+                db.session.execute(insert(User), values)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                self.insert_rows(lines, values)
+                return
+        self.imported += len(values)
+
+    def insert_rows(self, lines, values):
+        """Insert a batch the database rejected row by row, reporting the rows that fail"""
+        for line_num, user in zip(lines, values):
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(User), [user])
+            except IntegrityError as e:
+                self.invalid += 1
+                self.record_error(line_num, {'_row': [f'Rejected by the database: {e.orig}']})
+                continue
+            self.imported += 1
+        db.session.commit()
+
+    def record_error(self, line_num, errors):
+        if self.errors is not None:
+            self.errors.write(json.dumps({'line': line_num, 'errors': errors}, default=str) + '\n')
+
+    def report(self, final):
+        elapsed = time.perf_counter() - self.started
+        processed = self.imported + self.skipped + self.invalid
+        rate = processed / elapsed if elapsed else 0
+        prefix = 'Done:' if final else 'Progress:'
+        print(f"{prefix} {self.imported} imported, {self.skipped} skipped, {self.invalid} invalid "
+              f"({processed} rows in {elapsed:.1f}s, {rate:.0f} rows/s)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import users from CSV or NDJSON')
+    parser.add_argument('input', help="Input file, or '-' for stdin")
+    parser.add_argument('--format', choices=('csv', 'ndjson'),
+                        help='Input format (default: from the file extension)')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Password hashing processes')
+    parser.add_argument('--pre-hashed', action='store_true',
+                        help='Rows carry a password_hash column instead of password')
+    parser.add_argument('--method', help='Hash method (default: PASSWORD_HASH_METHOD)')
+    parser.add_argument('--errors', help='Write rejected rows as NDJSON to this file')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and hash without inserting')
+    parser.add_argument('--config', default=os.environ.get('FLASK_ENV', 'default'))
+    args = parser.parse_args()
+
+    fmt = args.format or ('csv' if args.input.endswith('.csv') else 'ndjson')
+    app = create_app(args.config)
+    method = normalize_method(args.method or app.config.get('PASSWORD_HASH_METHOD'))
+
+    stream = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    errors = open(args.errors, 'w', encoding='utf-8') if args.errors else None
+    executor = None if args.pre_hashed else ProcessPoolExecutor(max_workers=args.workers)
+
+    try:
+        with app.app_context():
+            importer = Importer(args.batch_size, args.pre_hashed, executor, method,
+                                workers=args.workers, dry_run=args.dry_run, errors=errors)
+            importer.run(read_rows(stream, fmt))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if errors is not None:
+            errors.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    return 1 if importer.invalid else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
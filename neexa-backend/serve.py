@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Production server for Neexa Backend
+Pre-forking WSGI runner: the master process binds the socket, loads the
+application once (copy-on-write shared with the workers) and keeps
+--workers processes serving requests one at a time. Workers are recycled
+after --max-requests requests to bound memory growth.
+
+    python serve.py                                   # app:create_app(), FLASK_ENV selects the config
+    python serve.py --workers 4 --port 8000
+    python serve.py simple_server:app --no-preload
+    python serve.py --worker-class asgi --workers 1 --threads 32
+
+With --worker-class asgi each worker runs an asyncio HTTP/1.1 server and
+serves the app through app.utils.asgi.WsgiToAsgi: connections (slow
+clients, keep-alive) are held by the event loop and only the WSGI call
+runs in a pool of --threads threads, so one process can hold thousands
+of open connections. It is an opt-in for connection-heavy traffic, not a
+general replacement: each request also pays for the event loop and the
+thread handoff, so a process serves fewer requests per second than a sync
+worker when clients are fast. Request bodies are capped at --max-body-size
+(default: the app's MAX_CONTENT_LENGTH, else 1 MiB).
+
+Signals to the master:
+    TERM / INT  graceful shutdown (workers finish the request in progress)
+    HUP         graceful reload: new workers are started, then the old ones
+                are stopped. Code changes are picked up only with --no-preload,
+                since preloaded code lives in the master.
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import unquote_to_bytes
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+logger = logging.getLogger('neexa.serve')
+
+# A worker that dies this soon after starting is crashing on boot; back off
+# before replacing it instead of forking in a tight loop
+MIN_WORKER_LIFETIME = 1.0
+
+WORKER_CLASSES = ('sync', 'asgi')
+
+# Request body cap for the asgi worker when neither --max-body-size nor the
+# app's MAX_CONTENT_LENGTH sets one
+DEFAULT_MAX_BODY_SIZE = 1024 * 1024
+
+
+def load_app(target):
+    """Import ``module:attribute`` or call ``module:factory()``"""
+    module_name, _, attribute = target.partition(':')
+    module = importlib.import_module(module_name)
+    call = attribute.endswith('()')
+    app = getattr(module, attribute[:-2] if call else (attribute or 'app'))
+    return app() if call else app
+
+
+def _after_fork(app):
+    """Drop database connections inherited from the master"""
+    sqlalchemy = getattr(app, 'extensions', {}).get('sqlalchemy')
+    if sqlalchemy is None:
+        return
+    with app.app_context():
+        for engine in sqlalchemy.engines.values():
+            engine.dispose(close=False)
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, code='-', size='-'):
+        pass
+
+
+class _WorkerServer(BaseWSGIServer):
+    """Werkzeug server on the shared listening socket, counting requests
+
+    The listening socket gets a timeout rather than being made fully
+    non-blocking: when several workers wake up for one connection, the ones
+    that lose the accept() race give up after ``timeout`` instead of
+    blocking, and socketserver's select() still waits ``timeout`` seconds
+    (it takes the socket's timeout, which would be 0 for a non-blocking
+    socket and turn the wait into a busy loop).
+    """
+
+    def __init__(self, host, port, app, fd, access_log):
+        handler = WSGIRequestHandler if access_log else _QuietRequestHandler
+        super().__init__(host, port, app, handler=handler, fd=fd)
+        self.timeout = 1.0
+        self.socket.settimeout(self.timeout)
+        self.handled = 0
+
+    def get_request(self):
+        conn, address = self.socket.accept()
+        conn.setblocking(True)
+        return conn, address
+
+    def process_request(self, request, client_address):
+        self.handled += 1
+        super().process_request(request, client_address)
+
+
+class _AsgiServer:
+    """Minimal HTTP/1.1 server running an ASGI app on the shared socket
+
+    Handles Content-Length request bodies, keep-alive and chunked (HTTP/1.1)
+    or close-delimited (HTTP/1.0) streamed responses; enough for the API,
+    not a general purpose server.
+    """
+
+    def __init__(self, asgi_app, sock, limit, graceful_timeout, access_log,
+                 header_timeout=60, keepalive_timeout=5, orphaned=None,
+                 max_body_size=DEFAULT_MAX_BODY_SIZE):
+        self.app = asgi_app
+        self.socket = sock
+        self.limit = limit
+        self.graceful_timeout = graceful_timeout
+        self.access_log = access_log
+        self.header_timeout = header_timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.orphaned = orphaned
+        self.max_body_size = max_body_size
+        self.handled = 0
+        self.active = 0
+        self.terminated = False
+        self._connections = set()
+        self._stop = None
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        loop.add_signal_handler(signal.SIGTERM, self._terminate)
+        server = await asyncio.start_server(self._handle, sock=self.socket, limit=2 ** 16)
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), 1.0)
+            except asyncio.TimeoutError:
+                if self.orphaned is not None and self.orphaned():
+                    self._terminate()
+
+        server.close()
+        deadline = loop.time() + self.graceful_timeout
+        while self.active and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        for writer in list(self._connections):
+            writer.close()
+
+    def _terminate(self):
+        self.terminated = True
+        self._stop.set()
+
+    async def _handle(self, reader, writer):
+        self._connections.add(writer)
+        client = writer.get_extra_info('peername')
+        server = writer.get_extra_info('sockname')
+        served = False
+        try:
+            while not self._stop.is_set():
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b'\r\n\r\n'),
+                        self.keepalive_timeout if served else self.header_timeout
+                    )
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError, ConnectionError):
+                    return
+                served = True
+                if not await self._request(head, reader, writer, client, server):
+                    return
+                if self.limit and self.handled >= self.limit:
+                    self._stop.set()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _request(self, head, reader, writer, client, server):
+        """Serve one request; returns whether the connection stays open"""
+        try:
+            request_line, *header_lines = head[:-4].split(b'\r\n')
+            method, target, version = request_line.split(b' ')
+            headers = []
+            for line in header_lines:
+                name, _, value = line.partition(b':')
+                headers.append((name.strip().lower(), value.strip()))
+            values = dict(headers)
+            lengths = [value for name, value in headers if name == b'content-length']
+            # Several (or signed) lengths can be read differently by a proxy
+            # in front of us, which is how requests get smuggled
+            if len(lengths) > 1 or (lengths and not lengths[0].isdigit()):
+                raise ValueError('Invalid Content-Length')
+            length = int(lengths[0]) if lengths else 0
+        except ValueError:
+            await self._simple_response(writer, 400)
+            return False
+        if b'transfer-encoding' in values:
+            await self._simple_response(writer, 501)
+            return False
+        if length > self.max_body_size:
+            await self._simple_response(writer, 413)
+            return False
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), self.header_timeout) if length else b''
+        except asyncio.TimeoutError:
+            await self._simple_response(writer, 408)
+            return False
+        except asyncio.IncompleteReadError:
+            return False
+
+        http_version = version[5:].decode('latin-1')
+        connection = values.get(b'connection', b'').lower()
+        keep_alive = connection == b'keep-alive' if http_version == '1.0' else connection != b'close'
+        path, _, query = target.partition(b'?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0', 'spec_version': '2.3'},
+            'http_version': http_version,
+            'method': method.decode('latin-1'),
+            'scheme': 'http',
+            'path': unquote_to_bytes(path).decode('utf-8', 'surrogateescape'),
+            'raw_path': path,
+            'query_string': query,
+            'root_path': '',
+            'headers': headers,
+            'client': client[:2] if client else None,
+            'server': server[:2] if server else None,
+        }
+
+        received = False
+        response = {'status': None, 'headers': None, 'sent': False, 'chunked': False}
+
+        async def receive():
+            nonlocal received
+            if received:
+                return {'type': 'http.disconnect'}
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            nonlocal keep_alive
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = list(message.get('headers', ()))
+                return
+            more_body = message.get('more_body', False)
+            data = message.get('body', b'')
+            if not response['sent']:
+                response_headers = response['headers']
+                if not any(name.lower() == b'content-length' for name, _ in response_headers):
+                    if http_version == '1.1':
+                        response['chunked'] = True
+                        response_headers.append((b'transfer-encoding', b'chunked'))
+                    else:
+                        keep_alive = False
+                if self._stop.is_set():
+                    keep_alive = False
+                if not keep_alive:
+                    response_headers.append((b'connection', b'close'))
+                writer.write(self._head(response['status'], response_headers))
+                response['sent'] = True
+            if response['chunked']:
+                if data:
+                    writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                if not more_body:
+                    writer.write(b'0\r\n\r\n')
+            elif data:
+                writer.write(data)
+            await writer.drain()
+
+        self.active += 1
+        self.handled += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.active -= 1
+        if not response['sent']:
+            await self._simple_response(writer, 500)
+            return False
+        if self.access_log:
+            logger.info(f"{scope['client'][0] if scope['client'] else '-'} "
+                        f"\"{scope['method']} {target.decode('latin-1')}\" {response['status']}")
+        return keep_alive
+
+    def _head(self, status, headers):
+        try:
+            phrase = HTTPStatus(status).phrase
+        except ValueError:
+            phrase = ''
+        lines = [f'HTTP/1.1 {status} {phrase}'.encode('latin-1'),
+                 b'date: ' + formatdate(usegmt=True).encode('latin-1')]
+        lines.extend(name + b': ' + value for name, value in headers)
+        return b'\r\n'.join(lines) + b'\r\n\r\n'
+
+    async def _simple_response(self, writer, status):
+        writer.write(self._head(status, [(b'content-length', b'0'), (b'connection', b'close')]))
+        await writer.drain()
+
+
+class PreforkServer:
+    """Master process that supervises a fixed number of worker processes"""
+
+    def __init__(self, target, host='0.0.0.0', port=5000, workers=None, max_requests=1000,
+                 max_requests_jitter=100, graceful_timeout=30, preload=True, backlog=2048,
+                 access_log=False, worker_class='sync', threads=32, header_timeout=60,
+                 max_body_size=None):
+        if worker_class not in WORKER_CLASSES:
+            raise ValueError(f"Unknown worker class '{worker_class}'")
+        self.target = target
+        self.host = host
+        self.port = port
+        self.worker_count = workers or os.cpu_count() or 1
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.preload = preload
+        self.backlog = backlog
+        self.access_log = access_log
+        self.worker_class = worker_class
+        self.threads = threads
+        self.header_timeout = header_timeout
+        self.max_body_size = max_body_size
+
+        self.app = None
+        self.socket = None
+        self.workers = {}  # pid -> started (monotonic)
+        self.master_pid = None
+        self._stopping = False
+        self._reload = False
+
+    # Master
+
+    def run(self):
+        self.master_pid = os.getpid()
+        self.socket = socket.create_server((self.host, self.port), backlog=self.backlog)
+        if self.preload:
+            self.app = load_app(self.target)
+            # Keep the garbage collector from touching (and so copying) the
+            # preloaded objects in every worker
+            gc.collect()
+            gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+        logger.info(f"Listening on http://{self.host}:{self.socket.getsockname()[1]} "
+                    f"with {self.worker_count} {self.worker_class} workers (pid {self.master_pid})")
+
+        try:
+            for _ in range(self.worker_count):
+                self._spawn_worker()
+            while not self._stopping:
+                self._reap_workers()
+                if self._reload:
+                    self._reload = False
+                    self._reload_workers()
+                while len(self.workers) < self.worker_count and not self._stopping:
+                    self._spawn_worker()
+                time.sleep(0.2)
+        finally:
+            if os.getpid() == self.master_pid:
+                self._stop_workers(list(self.workers))
+                self.socket.close()
+                logger.info('Server stopped')
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload = True
+
+    def _spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+
+        # Worker process: never returns into the master loop
+        code = 1
+        try:
+            code = self._worker()
+        except Exception:
+            logger.exception(f'Worker {os.getpid()} crashed')
+        finally:
+            sys.exit(code)
+
+    def _reap_workers(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if not pid:
+                return
+            started = self.workers.pop(pid, None)
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and not self._stopping:
+                logger.warning(f'Worker {pid} exited with status {code}')
+                if started is not None and time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+
+    def _reload_workers(self):
+        """Start a fresh set of workers, then gracefully stop the old ones"""
+        old = list(self.workers)
+        logger.info(f'Reloading {len(old)} workers')
+        for _ in range(self.worker_count):
+            self._spawn_worker()
+        self._stop_workers(old)
+
+    def _stop_workers(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+                    self.workers.pop(pid, None)
+            time.sleep(0.05)
+
+        for pid in remaining:
+            logger.warning(f'Worker {pid} did not stop in {self.graceful_timeout}s, killing it')
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.workers.pop(pid, None)
+
+    # Worker
+
+    def _worker(self):
+        self.workers = {}
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        random.seed()
+
+        app = self.app if self.preload else load_app(self.target)
+        _after_fork(app)
+
+        limit = self.max_requests + random.randint(0, self.max_requests_jitter) if self.max_requests else None
+        if self.worker_class == 'asgi':
+            handled, stopped = self._asgi_worker(app, limit)
+        else:
+            handled, stopped = self._sync_worker(app, limit, stopping)
+
+        if not stopped:
+            logger.info(f'Worker {os.getpid()} recycled after {handled} requests')
+        return 0
+
+    def _sync_worker(self, app, limit, stopping):
+        server = _WorkerServer(self.host, self.port, app, self.socket.fileno(), self.access_log)
+        try:
+            while not stopping and (limit is None or server.handled < limit):
+                if self._orphaned():
+                    stopping.append(None)
+                    break
+                server.handle_request()
+        finally:
+            server.server_close()
+        return server.handled, bool(stopping)
+
+    def _orphaned(self):
+        """The master is gone (killed without stopping its workers)"""
+        if os.getppid() != self.master_pid:
+            logger.warning(f'Master {self.master_pid} is gone, worker {os.getpid()} exiting')
+            return True
+        return False
+
+    def _asgi_worker(self, app, limit):
+        from app.utils.asgi import WsgiToAsgi
+        asgi_app = WsgiToAsgi(app, max_workers=self.threads)
+        max_body_size = (self.max_body_size or getattr(app, 'config', {}).get('MAX_CONTENT_LENGTH')
+                         or DEFAULT_MAX_BODY_SIZE)
+        server = _AsgiServer(asgi_app, self.socket, limit, self.graceful_timeout, self.access_log,
+                             header_timeout=self.header_timeout, orphaned=self._orphaned,
+                             max_body_size=max_body_size)
+        try:
+            asyncio.run(server.serve())
+        finally:
+            asgi_app.executor.shutdown(wait=True)
+        return server.handled, server.terminated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Neexa Backend with pre-forked workers')
+    parser.add_argument('target', nargs='?', default=os.environ.get('SERVER_APP', 'app:create_app()'),
+                        help="WSGI app as module:attribute or module:factory() (default: app:create_app())")
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('SERVER_WORKERS') or 0) or None,
+                        help='Worker processes (default: one per core)')
+    parser.add_argument('--max-requests', type=int, default=int(os.environ.get('SERVER_MAX_REQUESTS', 1000)),
+                        help='Recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--max-requests-jitter', type=int,
+                        default=int(os.environ.get('SERVER_MAX_REQUESTS_JITTER', 100)),
+                        help='Random extra requests per worker so they do not all recycle at once')
+    parser.add_argument('--graceful-timeout', type=float,
+                        default=float(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30)),
+                        help='Seconds workers get to finish in-flight requests on stop/reload')
+    parser.add_argument('--no-preload', dest='preload', action='store_false',
+                        help='Load the app in each worker instead of once in the master')
+    parser.add_argument('--worker-class', choices=WORKER_CLASSES,
+                        default=os.environ.get('SERVER_WORKER_CLASS', 'sync'),
+                        help='sync: one request at a time per worker; asgi: asyncio connections + thread pool')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('SERVER_THREADS', 32)),
+                        help='Threads running the app per asgi worker')
+    parser.add_argument('--header-timeout', type=float,
+                        default=float(os.environ.get('SERVER_HEADER_TIMEOUT', 60)),
+                        help='Seconds an asgi worker waits for request headers and body')
+    parser.add_argument('--max-body-size', type=int, default=int(os.environ.get('SERVER_MAX_BODY_SIZE') or 0) or None,
+                        help="Largest request body an asgi worker accepts (default: the app's "
+                             "MAX_CONTENT_LENGTH, else 1 MiB)")
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--access-log', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(levelname)s %(message)s')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    PreforkServer(
+        args.target,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        preload=args.preload,
+        backlog=args.backlog,
+        access_log=args.access_log,
+        worker_class=args.worker_class,
+        threads=args.threads,
+        header_timeout=args.header_timeout,
+        max_body_size=args.max_body_size,
+    ).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,17 +4,20 @@ Servidor backend simple para Neexa
 Lo hice así para que sea fácil de probar y entender
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 import sqlite3
 import os
-import re
+import queue
+import threading
+import time
 from datetime import datetime, timedelta
 import uuid
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from app.utils.validation import validate_password, validate_email
 
 app = Flask(__name__)
 CORS(app, origins=['http://localhost:3001', 'http://localhost:3000'])
@@ -22,9 +25,103 @@ CORS(app, origins=['http://localhost:3001', 'http://localhost:3000'])
 # Configuración de la base de datos
 DATABASE = 'neexa_simple.db'
 
+# Pool de conexiones: en vez de abrir y cerrar una conexión por request,
+# reutilizo conexiones ya configuradas (WAL, mmap, cache de statements).
+# Con NEEXA_DB_POOL_SIZE=0 vuelve al comportamiento de una conexión por request.
+DB_POOL_SIZE = int(os.environ.get('NEEXA_DB_POOL_SIZE', 8))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get('NEEXA_DB_BUSY_TIMEOUT_MS', 5000))
+DB_MMAP_SIZE = int(os.environ.get('NEEXA_DB_MMAP_SIZE', 64 * 1024 * 1024))
+DB_STATEMENT_CACHE = 128
+
+# Limpieza de tokens de reset: cuánto tiempo guardo los vencidos, cada cuánto
+# corre la limpieza (segundos) y cuántas filas borro por tanda
+RESET_TOKEN_RETENTION_HOURS = int(os.environ.get('NEEXA_RESET_TOKEN_RETENTION_HOURS', 24))
+RESET_TOKEN_PURGE_INTERVAL = int(os.environ.get('NEEXA_RESET_TOKEN_PURGE_INTERVAL', 3600))
+RESET_TOKEN_PURGE_BATCH_SIZE = int(os.environ.get('NEEXA_RESET_TOKEN_PURGE_BATCH_SIZE', 500))
+
+class ConnectionPool:
+    """Pool acotado de conexiones SQLite reutilizables entre hilos"""
+    
+    def __init__(self, database, size):
+        self.database = database
+        self.size = size
+        # LIFO para reutilizar primero las conexiones más recientes (caches calientes)
+        self._idle = queue.LifoQueue(maxsize=size)
+    
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE
+        )
+        # WAL deja leer mientras otro escribe; NORMAL es seguro con WAL
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={DB_MMAP_SIZE}')
+        conn.execute(f'PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}')
+        return conn
+    
+    def acquire(self):
+        """Tomo una conexión libre o abro una nueva si no hay"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+    
+    def release(self, conn):
+        """Devuelvo la conexión al pool (o la cierro si ya está lleno)"""
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def close(self):
+        """Cierro todas las conexiones libres"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Devuelvo el pool de la base actual (lo creo la primera vez)"""
+    global _pool
+    if _pool is None or _pool.database != DATABASE:
+        with _pool_lock:
+            if _pool is None or _pool.database != DATABASE:
+                if _pool is not None:
+                    _pool.close()
+                _pool = ConnectionPool(DATABASE, DB_POOL_SIZE)
+    return _pool
+
+def get_db():
+    """Conexión de la request actual, tomada del pool"""
+    if 'db' not in g:
+        g.db = get_pool().acquire() if DB_POOL_SIZE > 0 else sqlite3.connect(DATABASE)
+    return g.db
+
+@app.teardown_appcontext
+def release_db(exception):
+    """Al terminar la request devuelvo la conexión al pool"""
+    conn = g.pop('db', None)
+    if conn is None:
+        return
+    if DB_POOL_SIZE > 0:
+        get_pool().release(conn)
+    else:
+        conn.close()
+
 def init_db():
     """Creo la base de datos y las tablas necesarias"""
     conn = sqlite3.connect(DATABASE)
+    # El modo WAL queda guardado en el archivo de la base
+    conn.execute('PRAGMA journal_mode=WAL')
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -53,32 +150,58 @@ def init_db():
         )
     ''')
     
+    # Índices para buscar los tokens de un usuario y para la limpieza por vencimiento
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reset_tokens_user_expires
+        ON password_reset_tokens (user_id, expires_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reset_tokens_expires
+        ON password_reset_tokens (expires_at)
+    ''')
+    
     conn.commit()
     conn.close()
 
-def validate_password(password):
-    """Valido que la contraseña sea segura - tiene que tener mayúscula, número y símbolo"""
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters long"
-    
-    if not re.search(r'[A-Z]', password):
-        return False, "Password must contain at least one uppercase letter"
-    
-    if not re.search(r'[a-z]', password):
-        return False, "Password must contain at least one lowercase letter"
-    
-    if not re.search(r'\d', password):
-        return False, "Password must contain at least one digit"
-    
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-        return False, "Password must contain at least one special character"
-    
-    return True, "Password is valid"
+def purge_reset_tokens():
+    """Borro en tandas los tokens de reset vencidos hace más de RESET_TOKEN_RETENTION_HOURS"""
+    cutoff = datetime.utcnow() - timedelta(hours=RESET_TOKEN_RETENTION_HOURS)
+    conn = get_pool().acquire() if DB_POOL_SIZE > 0 else sqlite3.connect(DATABASE)
+    deleted = 0
+    try:
+        while True:
+            # Tandas chicas para no bloquear a los que escriben mientras tanto
+            cursor = conn.execute('''
+                DELETE FROM password_reset_tokens WHERE id IN (
+                    SELECT id FROM password_reset_tokens WHERE expires_at < ? LIMIT ?
+                )
+            ''', (cutoff, RESET_TOKEN_PURGE_BATCH_SIZE))
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < RESET_TOKEN_PURGE_BATCH_SIZE:
+                break
+    finally:
+        if DB_POOL_SIZE > 0:
+            get_pool().release(conn)
+        else:
+            conn.close()
+    return deleted
 
-def validate_email(email):
-    """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+def start_reset_token_purger():
+    """Arranco un hilo en segundo plano que limpia los tokens viejos cada tanto"""
+    def run():
+        while True:
+            try:
+                deleted = purge_reset_tokens()
+                if deleted:
+                    print(f"Purged {deleted} expired reset tokens")
+            except Exception as e:
+                print(f"Error purging reset tokens: {str(e)}")
+            time.sleep(RESET_TOKEN_PURGE_INTERVAL)
+    
+    thread = threading.Thread(target=run, name='reset-token-purger', daemon=True)
+    thread.start()
+    return thread
 
 def send_reset_email(email, reset_token, first_name):
     """Send password reset email"""
@@ -145,12 +268,11 @@ def register():
             return jsonify({'error': message}), 400
         
         # Check if user already exists
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
         if cursor.fetchone():
-            conn.close()
             return jsonify({'error': 'User with this email already exists'}), 409
         
         # Create new user
@@ -162,7 +284,6 @@ def register():
         
         user_id = cursor.lastrowid
         conn.commit()
-        conn.close()
         
         # Generate simple token (in production, use JWT)
         token = str(uuid.uuid4())
@@ -209,7 +330,7 @@ def login():
             return jsonify({'error': 'Email and password are required'}), 400
         
         # Find user
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -220,18 +341,15 @@ def login():
         user = cursor.fetchone()
         
         if not user:
-            conn.close()
             return jsonify({'error': 'Invalid email or password'}), 401
         
         user_id, user_email, password_hash, first_name, last_name, is_active = user
         
         if not is_active:
-            conn.close()
             return jsonify({'error': 'Account is deactivated'}), 401
         
         # Check password
         if not check_password_hash(password_hash, password):
-            conn.close()
             return jsonify({'error': 'Invalid email or password'}), 401
         
         # Update last login
@@ -240,7 +358,6 @@ def login():
         ''', (user_id,))
         
         conn.commit()
-        conn.close()
         
         # Generate simple token (in production, use JWT)
         token = str(uuid.uuid4())
@@ -313,14 +430,13 @@ def forgot_password():
             return jsonify({'error': 'Invalid email format'}), 400
         
         # Check if user exists
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('SELECT id, first_name FROM users WHERE email = ?', (email,))
         user = cursor.fetchone()
         
         if not user:
-            conn.close()
             # Por seguridad, siempre devolvemos éxito aunque el email no exista
             return jsonify({'message': 'If the email exists, a reset link has been sent'}), 200
         
@@ -330,6 +446,9 @@ def forgot_password():
         reset_token = str(uuid.uuid4())
         expires_at = datetime.utcnow() + timedelta(hours=1)
         
+        # Un token nuevo invalida los anteriores del mismo usuario
+        cursor.execute('DELETE FROM password_reset_tokens WHERE user_id = ?', (user_id,))
+        
         # Save reset token to database
         cursor.execute('''
             INSERT INTO password_reset_tokens (user_id, token, expires_at)
@@ -337,7 +456,6 @@ def forgot_password():
         ''', (user_id, reset_token, expires_at))
         
         conn.commit()
-        conn.close()
         
         # Send reset email
         print(f"About to send email to {email}")
@@ -380,7 +498,7 @@ def reset_password():
             return jsonify({'error': message}), 400
         
         # Check if token exists and is valid
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -393,19 +511,16 @@ def reset_password():
         token_data = cursor.fetchone()
         
         if not token_data:
-            conn.close()
             return jsonify({'error': 'Invalid or expired token'}), 400
         
         user_id, expires_at, used, email = token_data
         
         # Check if token is expired
         if datetime.utcnow() > datetime.fromisoformat(expires_at):
-            conn.close()
             return jsonify({'error': 'Token has expired'}), 400
         
         # Check if token has been used
         if used:
-            conn.close()
             return jsonify({'error': 'Token has already been used'}), 400
         
         # Update password
@@ -416,7 +531,6 @@ def reset_password():
         cursor.execute('UPDATE password_reset_tokens SET used = 1 WHERE token = ?', (token,))
         
         conn.commit()
-        conn.close()
         
         return jsonify({'message': 'Password has been reset successfully'}), 200
         
@@ -442,7 +556,7 @@ def verify_reset_token():
         token = data['token'].strip()
         
         # Check if token exists and is valid
-        conn = sqlite3.connect(DATABASE)
+        conn = get_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -452,7 +566,6 @@ def verify_reset_token():
         ''', (token,))
         
         token_data = cursor.fetchone()
-        conn.close()
         
         if not token_data:
             return jsonify({'valid': False, 'message': 'Invalid token'}), 400
@@ -483,12 +596,14 @@ if __name__ == '__main__':
     print("Initializing database...")
     init_db()
     print("Database initialized!")
+    start_reset_token_purger()
     
     print("Starting Neexa Simple Backend Server...")
     print("Server will run on http://localhost:5000")
     
+    # Solo para desarrollo; en producción: python serve.py simple_server:app
     app.run(
         host='0.0.0.0',
         port=5000,
-        debug=True
+        debug=os.environ.get('FLASK_ENV', 'development') == 'development'
     )
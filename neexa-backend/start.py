@@ -100,9 +100,17 @@ def start_server():
     print("\n" + "="*50)
     
     try:
+        # En producción se usa el servidor pre-fork (serve.py); el servidor
+        # de desarrollo de Werkzeug atiende de a una petición por hilo y
+        # con debug expone el depurador interactivo
+        if os.environ.get('FLASK_ENV') == 'production':
+            from serve import PreforkServer
+            PreforkServer('app:create_app()', port=5000).run()
+            return
+        
         from app import create_app
         app = create_app()
-        app.run(host='0.0.0.0', port=5000, debug=True)
+        app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_ENV', 'development') == 'development')
     except KeyboardInterrupt:
         print("\n\nServidor detenido")
     except Exception as e:
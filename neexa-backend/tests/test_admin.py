@@ -0,0 +1,158 @@
+import unittest
+import json
+from app import create_app, db
+from app.models.user import User
+
+class AdminTestCase(unittest.TestCase):
+    """Test cases for admin endpoints"""
+    
+    def setUp(self):
+        """Set up test client and database"""
+        self.app = create_app('testing')
+        self.app.config['ADMIN_EXPORT_BATCH_SIZE'] = 2
+        self.app.config['ADMIN_EMAILS'] = ['admin@neexa.com']
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        
+        db.create_all()
+        
+        for i in range(4):
+            db.session.add(User(
+                email=f'user{i}@example.com',
+                password='TestPass123!',
+                first_name='Test',
+                last_name='User'
+            ))
+        
+        # Admins are seeded like `flask create_admin` does, never registered
+        admin = User(email='admin@neexa.com', password='TestPass123!', first_name='Admin', last_name='Neexa')
+        admin.is_verified = True
+        db.session.add(admin)
+        db.session.commit()
+    
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+    
+    def register(self, email):
+        """Sign up ``email`` through the public registration endpoint"""
+        return self.client.post('/api/auth/register',
+                               data=json.dumps({
+                                   'email': email,
+                                   'password': 'TestPass123!',
+                                   'confirm_password': 'TestPass123!',
+                                   'first_name': 'Admin',
+                                   'last_name': 'Neexa'
+                               }),
+                               content_type='application/json')
+    
+    def login(self, email):
+        """Log ``email`` in and return an authorization header"""
+        response = self.client.post('/api/auth/login',
+                                  data=json.dumps({'email': email, 'password': 'TestPass123!'}),
+                                  content_type='application/json')
+        token = json.loads(response.data)['access_token']
+        return {'Authorization': f'Bearer {token}'}
+    
+    def test_export_requires_admin(self):
+        """Test that regular users cannot export users"""
+        self.register('someone@example.com')
+        headers = self.login('someone@example.com')
+        
+        response = self.client.get('/api/admin/users/export', headers=headers)
+        
+        self.assertEqual(response.status_code, 403)
+    
+    def test_admin_requires_verified_listed_account(self):
+        """Test that a listed email that is not verified, or an unlisted admin, gets no access"""
+        self.app.config['ADMIN_EMAILS'] = ['admin@neexa.com', 'claimed@neexa.com']
+        self.assertEqual(self.register('claimed@neexa.com').status_code, 201)
+        
+        response = self.client.get('/api/admin/users', headers=self.login('claimed@neexa.com'))
+        self.assertEqual(response.status_code, 403)
+        
+        self.app.config['ADMIN_EMAILS'] = []
+        response = self.client.get('/api/admin/users', headers=self.login('admin@neexa.com'))
+        self.assertEqual(response.status_code, 403)
+    
+    def test_no_admins_by_default(self):
+        """Test that ADMIN_EMAILS is empty unless configured"""
+        self.assertEqual(create_app('testing').config['ADMIN_EMAILS'], [])
+    
+    def test_export_streams_ndjson_in_id_order(self):
+        """Test that the export streams every user across keyset pages"""
+        headers = self.login('admin@neexa.com')
+        
+        response = self.client.get('/api/admin/users/export', headers=headers)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        users = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(len(users), 5)
+        self.assertEqual([user['id'] for user in users], sorted(user['id'] for user in users))
+        self.assertNotIn('password_hash', users[0])
+    
+    def fetch_all(self, headers, **params):
+        """Follow next_cursor through every page of the admin listing"""
+        emails = []
+        cursor = None
+        while True:
+            query = dict(params, limit=2)
+            if cursor:
+                query['cursor'] = cursor
+            response = self.client.get('/api/admin/users', query_string=query, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            self.assertLessEqual(len(data['users']), 2)
+            emails.extend(user['email'] for user in data['users'])
+            cursor = data['next_cursor']
+            if not cursor:
+                return emails
+    
+    def test_list_users_with_keyset_pagination(self):
+        """Test the admin listing across pages for each sort order"""
+        headers = self.login('admin@neexa.com')
+        User.query.filter_by(email='user1@example.com').update({'is_active': False})
+        db.session.commit()
+        
+        self.assertEqual(len(self.fetch_all(headers)), 5)
+        self.assertEqual(self.fetch_all(headers, is_active='false'), ['user1@example.com'])
+        self.assertEqual(self.fetch_all(headers, email_prefix='user'),
+                         ['user0@example.com', 'user1@example.com', 'user2@example.com', 'user3@example.com'])
+        self.assertEqual(len(self.fetch_all(headers, is_active='true', created_after='2000-01-01T00:00:00')), 4)
+    
+    def test_email_prefix_matches_literally(self):
+        """Test prefixes ending in z or 9 and containing LIKE wildcards"""
+        headers = self.login('admin@neexa.com')
+        for email in ('zed@example.com', 'zz@example.com', 'user9@example.com', 'a_b@example.com',
+                      'axb@example.com', 'a%c@example.com'):
+            db.session.add(User(email=email, password='TestPass123!', first_name='Test', last_name='User'))
+        db.session.commit()
+        
+        self.assertEqual(self.fetch_all(headers, email_prefix='z'), ['zed@example.com', 'zz@example.com'])
+        self.assertEqual(self.fetch_all(headers, email_prefix='zz'), ['zz@example.com'])
+        self.assertEqual(self.fetch_all(headers, email_prefix='user9'), ['user9@example.com'])
+        self.assertEqual(self.fetch_all(headers, email_prefix='a_'), ['a_b@example.com'])
+        self.assertEqual(self.fetch_all(headers, email_prefix='a%'), ['a%c@example.com'])
+    
+    def test_list_users_rejects_bad_input(self):
+        """Test invalid filters and cursors"""
+        headers = self.login('admin@neexa.com')
+        
+        response = self.client.get('/api/admin/users?limit=1000', headers=headers)
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.get('/api/admin/users?cursor=garbage', headers=headers)
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.get('/api/admin/users?limit=1', headers=headers)
+        cursor = json.loads(response.data)['next_cursor']
+        response = self.client.get('/api/admin/users', query_string={'cursor': cursor, 'email_prefix': 'user'},
+                                   headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
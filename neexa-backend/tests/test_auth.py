@@ -1,7 +1,15 @@
 import unittest
 import json
+import bcrypt
+from unittest import mock
 from app import create_app, db
 from app.models.user import User
+from app.services.auth_cache import user_auth_cache
+from app.models.token_blocklist import TokenBlocklist
+from app.services.login_tracker import login_tracker
+from app.middleware.compression import compression
+from config.config import TestingConfig
+import app.middleware.auth as auth_middleware
 
 class AuthTestCase(unittest.TestCase):
     """Test cases for authentication endpoints"""
@@ -141,6 +149,314 @@ class AuthTestCase(unittest.TestCase):
         data = json.loads(response.data)
         self.assertEqual(data['user']['email'], self.test_user['email'])
 
+    def test_login_upgrades_outdated_password_hash(self):
+        """Test that a hash below the configured policy is upgraded on login"""
+        self.client.post('/api/auth/register',
+                        data=json.dumps(self.test_user),
+                        content_type='application/json')
+        
+        # Simulate a legacy bcrypt hash, like the one seeded by init.sql
+        user = User.query.filter_by(email=self.test_user['email']).first()
+        user.password_hash = bcrypt.hashpw(self.test_user['password'].encode(),
+                                           bcrypt.gensalt(4)).decode()
+        db.session.commit()
+        
+        login_data = {
+            'email': self.test_user['email'],
+            'password': self.test_user['password']
+        }
+        
+        response = self.client.post('/api/auth/login',
+                                  data=json.dumps(login_data),
+                                  content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        user = User.query.filter_by(email=self.test_user['email']).first()
+        self.assertTrue(user.password_hash.startswith(self.app.config['PASSWORD_HASH_METHOD']))
+
+    def register_and_login(self):
+        """Register the test user and return an authorization header"""
+        self.client.post('/api/auth/register',
+                        data=json.dumps(self.test_user),
+                        content_type='application/json')
+        
+        login_data = {
+            'email': self.test_user['email'],
+            'password': self.test_user['password']
+        }
+        response = self.client.post('/api/auth/login',
+                                  data=json.dumps(login_data),
+                                  content_type='application/json')
+        token = json.loads(response.data)['access_token']
+        return {'Authorization': f'Bearer {token}'}
+    
+    def test_auth_cache_serves_repeat_requests_and_invalidates(self):
+        """Test that repeat requests hit the auth cache and updates invalidate it"""
+        headers = self.register_and_login()
+        
+        self.client.get('/api/auth/me', headers=headers)
+        self.client.get('/api/auth/me', headers=headers)
+        self.assertGreaterEqual(user_auth_cache.stats()['hits'], 1)
+        
+        self.client.put('/api/user/profile',
+                        data=json.dumps({'first_name': 'Updated'}),
+                        content_type='application/json',
+                        headers=headers)
+        
+        response = self.client.get('/api/auth/me', headers=headers)
+        data = json.loads(response.data)
+        self.assertEqual(data['user']['first_name'], 'Updated')
+        
+        self.client.post('/api/user/deactivate', headers=headers)
+        response = self.client.get('/api/auth/me', headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_stateless_mode_honours_revocations(self):
+        """Test claims-based authorization with password change and deactivation"""
+        self.app.config['AUTH_STATELESS'] = True
+        headers = self.register_and_login()
+        
+        response = self.client.get('/api/auth/me', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['user']['email'], self.test_user['email'])
+        
+        response = self.client.post('/api/user/change-password',
+                                  data=json.dumps({
+                                      'current_password': self.test_user['password'],
+                                      'new_password': 'NewPass456!',
+                                      'confirm_new_password': 'NewPass456!'
+                                  }),
+                                  content_type='application/json',
+                                  headers=headers)
+        self.assertEqual(response.status_code, 200)
+        new_headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        
+        # Tokens issued before the password change are rejected
+        self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 401)
+        self.assertEqual(self.client.get('/api/auth/me', headers=new_headers).status_code, 200)
+        
+        self.client.post('/api/user/deactivate', headers=new_headers)
+        self.assertEqual(self.client.get('/api/auth/me', headers=new_headers).status_code, 401)
+
+    def test_logout_revokes_tokens(self):
+        """Test that logged-out access and refresh tokens are rejected"""
+        self.client.post('/api/auth/register',
+                        data=json.dumps(self.test_user),
+                        content_type='application/json')
+        response = self.client.post('/api/auth/login',
+                                  data=json.dumps({
+                                      'email': self.test_user['email'],
+                                      'password': self.test_user['password']
+                                  }),
+                                  content_type='application/json')
+        tokens = json.loads(response.data)
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        
+        response = self.client.post('/api/auth/logout',
+                                  data=json.dumps({'refresh_token': tokens['refresh_token']}),
+                                  content_type='application/json',
+                                  headers=headers)
+        self.assertEqual(response.status_code, 200)
+        
+        self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 401)
+        response = self.client.post('/api/auth/refresh',
+                                  headers={'Authorization': f"Bearer {tokens['refresh_token']}"})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(TokenBlocklist.query.count(), 2)
+
+    def test_logout_rejects_another_users_refresh_token(self):
+        """Test that logout does not revoke a refresh token issued to someone else"""
+        headers = self.register_and_login()
+        other = dict(self.test_user, email='other@example.com')
+        response = self.client.post('/api/auth/register',
+                                  data=json.dumps(other),
+                                  content_type='application/json')
+        other_refresh = json.loads(response.data)['refresh_token']
+        
+        response = self.client.post('/api/auth/logout',
+                                  data=json.dumps({'refresh_token': other_refresh}),
+                                  content_type='application/json',
+                                  headers=headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(TokenBlocklist.query.count(), 0)
+        
+        # The other user's session is untouched, and so is the caller's
+        response = self.client.post('/api/auth/refresh',
+                                  headers={'Authorization': f'Bearer {other_refresh}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/me', headers=headers).status_code, 200)
+
+    def test_lockout_is_counted_in_the_database(self):
+        """Test the 5-attempt lockout against the shared users row"""
+        self.client.post('/api/auth/register',
+                        data=json.dumps(self.test_user),
+                        content_type='application/json')
+        bad_login = json.dumps({'email': self.test_user['email'], 'password': 'WrongPass123!'})
+        
+        # Another worker process has already counted three failures
+        user = User.query.filter_by(email=self.test_user['email']).first()
+        user.login_attempts = 3
+        db.session.commit()
+        
+        for _ in range(2):
+            response = self.client.post('/api/auth/login', data=bad_login,
+                                      content_type='application/json')
+            self.assertEqual(response.status_code, 401)
+        
+        response = self.client.post('/api/auth/login', data=bad_login,
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 423)
+        
+        db.session.expire_all()
+        user = User.query.filter_by(email=self.test_user['email']).first()
+        self.assertEqual(user.login_attempts, 5)
+        self.assertTrue(user.is_locked())
+    
+    def test_last_login_is_flushed_in_batches(self):
+        """Test that only last_login waits for the batched flush"""
+        login_tracker.flush_interval = 3600
+        self.addCleanup(login_tracker.shutdown)
+        self.client.post('/api/auth/register',
+                        data=json.dumps(self.test_user),
+                        content_type='application/json')
+        user = User.query.filter_by(email=self.test_user['email']).first()
+        user.login_attempts = 2
+        db.session.commit()
+        
+        response = self.client.post('/api/auth/login',
+                                  data=json.dumps({
+                                      'email': self.test_user['email'],
+                                      'password': self.test_user['password']
+                                  }),
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(json.loads(response.data)['user']['last_login'])
+        
+        # The failure counter is reset right away, last_login is still pending
+        db.session.expire_all()
+        user = User.query.filter_by(email=self.test_user['email']).first()
+        self.assertEqual(user.login_attempts, 0)
+        self.assertIsNone(user.last_login)
+        
+        self.assertEqual(login_tracker.flush(), 1)
+        db.session.expire_all()
+        user = User.query.filter_by(email=self.test_user['email']).first()
+        self.assertIsNotNone(user.last_login)
+    
+    def test_login_rate_limit_returns_429(self):
+        """Test that the per-IP login limit answers 429 with Retry-After"""
+        self.app.config['RATELIMIT_AUTH'] = '2 per minute'
+        login_data = json.dumps({'email': 'nonexistent@example.com', 'password': 'wrongpassword'})
+        
+        for _ in range(2):
+            response = self.client.post('/api/auth/login', data=login_data,
+                                      content_type='application/json')
+            self.assertEqual(response.status_code, 401)
+        
+        response = self.client.post('/api/auth/login', data=login_data,
+                                  content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+
+    def test_per_user_rate_limit_verifies_token_once(self):
+        """Test that per-user limits reuse the user resolved by token_required"""
+        self.app.config['RATELIMIT_DEFAULT'] = '2 per minute'
+        headers = self.register_and_login()
+        
+        with mock.patch.object(auth_middleware, 'verify_jwt_in_request',
+                               wraps=auth_middleware.verify_jwt_in_request) as verify:
+            response = self.client.get('/api/user/profile', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(response.headers['X-RateLimit-Remaining'], '1')
+        
+        self.client.get('/api/user/profile', headers=headers)
+        response = self.client.get('/api/user/profile', headers=headers)
+        self.assertEqual(response.status_code, 429)
+        
+        # Another user has a bucket of their own
+        other = dict(self.test_user, email='other@example.com')
+        response = self.client.post('/api/auth/register',
+                                  data=json.dumps(other),
+                                  content_type='application/json')
+        other_headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.assertEqual(self.client.get('/api/user/profile', headers=other_headers).status_code, 200)
+    
+    def test_ip_rate_limit_honours_forwarded_for_behind_proxy(self):
+        """Test that clients behind a trusted proxy get separate IP buckets"""
+        with mock.patch.object(TestingConfig, 'PROXY_FIX_X_FOR', 1):
+            app = create_app('testing')
+        app.config['RATELIMIT_AUTH'] = '2 per minute'
+        client = app.test_client()
+        login_data = json.dumps({'email': 'nonexistent@example.com', 'password': 'wrongpassword'})
+        
+        def login(forwarded_for):
+            return client.post('/api/auth/login', data=login_data, content_type='application/json',
+                               headers={'X-Forwarded-For': forwarded_for})
+        
+        with app.app_context():
+            db.create_all()
+            self.assertEqual([login('203.0.113.1').status_code for _ in range(3)], [401, 401, 429])
+            self.assertEqual(login('203.0.113.2').status_code, 401)
+            db.session.remove()
+            db.drop_all()
+    
+    def test_conditional_get_on_me_and_profile(self):
+        """Test ETag / If-None-Match handling on /me and the profile"""
+        headers = self.register_and_login()
+
+        for url in ('/api/auth/me', '/api/user/profile'):
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('private', response.headers['Cache-Control'])
+            etag = response.headers['ETag']
+
+            response = self.client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.data, b'')
+            self.assertEqual(response.headers['ETag'], etag)
+
+        # A profile change yields a new ETag
+        self.client.put('/api/user/profile',
+                        data=json.dumps({'first_name': 'Updated'}),
+                        content_type='application/json',
+                        headers=headers)
+        response = self.client.get('/api/auth/me', headers=dict(headers, **{'If-None-Match': etag}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['user']['first_name'], 'Updated')
+
+    def test_conditional_get_keeps_the_weak_etag_of_compressed_responses(self):
+        """Test that a 304 repeats the weak ETag a compressed 200 was sent with"""
+        headers = dict(self.register_and_login(), **{'Accept-Encoding': 'gzip'})
+
+        with mock.patch.object(compression, 'min_size', 0):
+            for url in ('/api/auth/me', '/api/user/profile'):
+                response = self.client.get(url, headers=headers)
+                self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+                etag = response.headers['ETag']
+                self.assertTrue(etag.startswith('W/"'))
+
+                response = self.client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers['ETag'], etag)
+
+    def test_query_count_headers_and_budget(self):
+        """Test per-request query counts and the query budget warning"""
+        headers = self.register_and_login()
+        query_stats = self.app.extensions['query_stats']
+
+        self.client.get('/api/auth/me', headers=headers)
+        response = self.client.get('/api/auth/me', headers=headers)
+        self.assertEqual(response.headers['X-Query-Count'], '0')
+        self.assertIn('X-Query-Time-Ms', response.headers)
+
+        query_stats.budgets['user.get_profile'] = 0
+        with self.assertLogs('app.middleware.query_stats', level='WARNING') as logs:
+            response = self.client.get('/api/user/profile', headers=headers)
+        self.assertEqual(response.headers['X-Query-Count'], '1')
+        self.assertIn('Query budget exceeded', logs.output[0])
+        self.assertEqual(query_stats.stats()['requests_over_budget'], 1)
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,70 @@
+import unittest
+import gzip
+import json
+import zlib
+from flask import Flask, Response, jsonify
+from app.middleware.compression import Compression
+
+class CompressionTestCase(unittest.TestCase):
+    """Test cases for response compression"""
+    
+    def setUp(self):
+        """Set up a throwaway app with large, small and streamed responses"""
+        self.app = Flask(__name__)
+        self.app.config.update(COMPRESS_MIN_SIZE=200,
+                               COMPRESS_MIMETYPES=['application/json', 'application/x-ndjson'])
+        self.compression = Compression()
+        self.compression.init_app(self.app)
+        self.client = self.app.test_client()
+        
+        @self.app.route('/large')
+        def large():
+            response = jsonify({'users': [{'id': i, 'email': f'user{i}@example.com'} for i in range(50)]})
+            response.set_etag('abc')
+            return response
+        
+        @self.app.route('/small')
+        def small():
+            return jsonify({'ok': True})
+        
+        @self.app.route('/stream')
+        def stream():
+            return Response((json.dumps({'id': i}) + '\n' for i in range(100)),
+                            mimetype='application/x-ndjson')
+    
+    def test_gzip_and_deflate_negotiation(self):
+        """Test that the accepted coding is used and ETags are weakened"""
+        response = self.client.get('/large', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(response.headers['ETag'], 'W/"abc"')
+        self.assertEqual(len(json.loads(gzip.decompress(response.data))['users']), 50)
+        
+        response = self.client.get('/large', headers={'Accept-Encoding': 'gzip;q=0, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'deflate')
+        self.assertEqual(len(json.loads(zlib.decompress(response.data))['users']), 50)
+        
+        stats = self.compression.stats()
+        self.assertEqual(stats['responses'], 2)
+        self.assertGreater(stats['bytes_saved'], 0)
+    
+    def test_small_and_unaccepted_responses_are_untouched(self):
+        """Test the size threshold and clients without Accept-Encoding"""
+        response = self.client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        
+        response = self.client.get('/large')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(len(response.get_json()['users']), 50)
+    
+    def test_streamed_response_is_chunk_compressed(self):
+        """Test that streamed responses are compressed chunk by chunk"""
+        response = self.client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+        
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(response.data).decode().splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(self.compression.stats()['streams'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
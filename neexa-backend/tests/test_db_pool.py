@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.middleware.pool_stats import InstrumentedQueuePool, pool_stats
+from app.models.user import User
+from app.services.auth_cache import user_auth_cache
+from config.config import TestingConfig
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    """Stress tests for the instrumented connection pool at exhaustion on the API routes"""
+
+    def setUp(self):
+        """Set up the app on a file database with a two connection pool"""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def make_app(self, pool_timeout):
+        url = f"sqlite:///{os.path.join(self.directory, 'pool.db')}"
+        options = {'pool_size': 2, 'max_overflow': 0, 'pool_timeout': pool_timeout}
+        with mock.patch.object(TestingConfig, 'SQLALCHEMY_DATABASE_URI', url), \
+                mock.patch.object(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS', options), \
+                mock.patch.object(TestingConfig, 'RATELIMIT_ENABLED', False):
+            self.app = create_app('testing')
+        app_context = self.app.app_context()
+        app_context.push()
+        self.addCleanup(app_context.pop)
+        self.addCleanup(db.engine.dispose)
+        self.assertIsInstance(db.engine.pool, InstrumentedQueuePool)
+
+        db.create_all()
+        self.addCleanup(db.drop_all)
+        db.session.add(User(email='test@example.com', password='TestPass123!', first_name='Test', last_name='User'))
+        db.session.commit()
+        db.session.remove()
+        self.client = self.app.test_client()
+
+        token = json.loads(self.login().data)['access_token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+        # Requests reuse the pushed app context, so hand its connection back;
+        # and make the protected routes load the user from the database
+        db.session.remove()
+        user_auth_cache.clear()
+
+    def login(self):
+        return self.client.post('/api/auth/login',
+                               data=json.dumps({'email': 'test@example.com', 'password': 'TestPass123!'}),
+                               content_type='application/json')
+
+    def hold_pool(self):
+        """Check out every pooled connection from the test; returns them for release"""
+        held = [db.engine.connect() for _ in range(2)]
+        for connection in held:
+            self.addCleanup(connection.close)
+        return held
+
+    def test_exhausted_pool_answers_503_on_api_routes(self):
+        """Test that protected routes and login answer 503, not 401 or 500, when the pool times out"""
+        # Whole seconds: engine_from_config coerces pool_timeout to int
+        self.make_app(pool_timeout=1)
+        self.hold_pool()
+        checkouts = pool_stats.stats()['checkouts']
+
+        responses = [
+            self.client.get('/api/auth/me', headers=self.headers),
+            self.client.get('/api/user/profile', headers=self.headers),
+            self.login(),
+        ]
+
+        for response in responses:
+            self.assertEqual(response.status_code, 503, response.request.path)
+            self.assertEqual(response.headers['Retry-After'], '1')
+        # Best-effort background reads (the revocation sync) may time out too
+        stats = pool_stats.stats()
+        self.assertGreaterEqual(stats['timeouts'], 3)
+        self.assertEqual(stats['checkouts'] - checkouts, stats['timeouts'])
+
+        body = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn(f"neexa_db_pool_timeouts_total {stats['timeouts']}", body)
+        self.assertIn('neexa_db_pool_size 2', body)
+        self.assertIn('neexa_db_pool_in_use 2', body)
+        self.assertIn('neexa_db_pool_waiting 0', body)
+
+    def test_saturated_pool_queues_checkouts(self):
+        """Test that with a long enough timeout requests wait for a connection instead"""
+        self.make_app(pool_timeout=5)
+        held = self.hold_pool()
+        responses = [None] * 4
+
+        def client(index):
+            responses[index] = self.app.test_client().get('/api/user/profile', headers=self.headers)
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        release = threading.Timer(0.3, lambda: [connection.close() for connection in held])
+        release.start()
+        for thread in threads:
+            thread.join()
+        release.join()
+
+        self.assertEqual([response.status_code for response in responses], [200] * 4)
+        stats = pool_stats.stats()
+        self.assertEqual(stats['timeouts'], 0)
+        self.assertEqual(stats['waiting'], 0)
+        # At least two requests waited for the held connections to be released
+        self.assertGreater(stats['wait_seconds_total'], 2 * 0.25)
+
+        body = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn(f"neexa_db_pool_checkout_wait_seconds_count {stats['checkouts']}", body)
+
+if __name__ == '__main__':
+    unittest.main()
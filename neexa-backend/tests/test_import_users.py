@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from werkzeug.security import generate_password_hash, check_password_hash
+from app import create_app, db
+from app.models.user import User
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import import_users
+from import_users import Importer, read_rows, validate_row
+
+METHOD = 'pbkdf2:sha256:1000'
+
+class ImportUsersTestCase(unittest.TestCase):
+    """Test cases for the bulk user import script"""
+
+    def setUp(self):
+        """Set up an app context with an empty database"""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.errors = io.StringIO()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def row(self, email, **values):
+        row = {'email': email, 'first_name': 'Test', 'last_name': 'User'}
+        row.update(values)
+        return row
+
+    def run_import(self, rows, pre_hashed=False, batch_size=10):
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        importer = Importer(batch_size, pre_hashed, executor, METHOD, errors=self.errors)
+        importer.run(iter(list(enumerate(rows, 2))))
+        return importer
+
+    def rejected(self):
+        return [json.loads(line) for line in self.errors.getvalue().splitlines()]
+
+    def test_pre_hashed_rows_need_a_complete_supported_hash(self):
+        """Test that blank, truncated and unknown hashes are rejected before inserting"""
+        good = generate_password_hash('TestPass123!', method=METHOD)
+        for password_hash in ('', None, 'scrypt', 'scrypt:32768:8:1', good.rsplit('$', 1)[0],
+                              'md5$salt$0123abcd', '$2b$12$short'):
+            values, errors = validate_row(self.row('a@example.com', password_hash=password_hash), True)
+            self.assertIsNone(values, password_hash)
+            self.assertIn('password_hash', errors)
+
+        values, errors = validate_row(self.row('a@example.com', password_hash=good), True)
+        self.assertIsNone(errors)
+        self.assertEqual(values['password_hash'], good)
+
+    def test_blank_pre_hashed_password_is_reported_not_inserted(self):
+        """Test that a CSV row with an empty password_hash cell does not abort the import"""
+        good = generate_password_hash('TestPass123!', method=METHOD)
+        stream = io.StringIO(
+            'email,first_name,last_name,password_hash\n'
+            f'one@example.com,One,User,{good}\n'
+            'two@example.com,Two,User,\n'
+        )
+        importer = Importer(1, True, None, METHOD, errors=self.errors)
+        importer.run(read_rows(stream, 'csv'))
+
+        self.assertEqual((importer.imported, importer.invalid), (1, 1))
+        self.assertEqual([error['line'] for error in self.rejected()], [3])
+        self.assertEqual(db.session.execute(db.select(User.email)).scalars().all(), ['one@example.com'])
+
+    def test_import_hashes_passwords_and_skips_duplicates(self):
+        """Test that passwords are hashed and repeated or existing emails are skipped"""
+        db.session.add(User('taken@example.com', 'TestPass123!', 'Taken', 'User'))
+        db.session.commit()
+
+        importer = self.run_import([
+            self.row('new@example.com', password='TestPass123!'),
+            self.row('NEW@example.com', password='TestPass123!'),
+            self.row('taken@example.com', password='TestPass123!'),
+            self.row('bad-email', password='TestPass123!'),
+        ])
+
+        self.assertEqual((importer.imported, importer.skipped, importer.invalid), (1, 2, 1))
+        user = User.query.filter_by(email='new@example.com').one()
+        self.assertTrue(user.password_hash.startswith(METHOD + '$'))
+        self.assertTrue(check_password_hash(user.password_hash, 'TestPass123!'))
+        self.assertFalse(user.is_verified)
+
+    def test_batch_rejected_by_database_is_inserted_row_by_row(self):
+        """Test that an IntegrityError rolls back the batch and reports only the failing rows"""
+        db.session.add(User('race@example.com', 'TestPass123!', 'Race', 'User'))
+        db.session.commit()
+
+        # Simulate the email being registered between the lookup and the INSERT
+        with mock.patch.object(import_users, 'existing_emails', return_value=set()):
+            importer = self.run_import([
+                self.row('first@example.com', password='TestPass123!'),
+                self.row('race@example.com', password='TestPass123!'),
+                self.row('last@example.com', password='TestPass123!'),
+            ])
+
+        self.assertEqual((importer.imported, importer.invalid), (2, 1))
+        self.assertEqual([error['line'] for error in self.rejected()], [3])
+        emails = db.session.execute(db.select(User.email).order_by(User.id)).scalars().all()
+        self.assertEqual(emails, ['race@example.com', 'first@example.com', 'last@example.com'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from flask import Flask
+from app.utils import json_provider
+from app.utils.json_provider import FastJSONProvider
+
+class FastJSONProviderTestCase(unittest.TestCase):
+    """Test cases for the orjson-backed JSON provider"""
+    
+    payload = {
+        'z': 1,
+        'a': {'when': datetime(2024, 5, 1, 12, 30, 15, 250), 'day': date(2024, 5, 1)},
+        'amount': Decimal('1234.10'),
+        'name': 'Pérez'
+    }
+    
+    def make_provider(self):
+        """Build a provider bound to a throwaway Flask app"""
+        self.app = Flask(__name__)
+        return FastJSONProvider(self.app)
+    
+    def test_orjson_and_stdlib_paths_match(self):
+        """Test that output does not depend on which encoder ran"""
+        provider = self.make_provider()
+        fast = provider.dumps(self.payload)
+        
+        original, json_provider.orjson = json_provider.orjson, None
+        try:
+            fallback = provider.dumps(self.payload, separators=(',', ':'))
+        finally:
+            json_provider.orjson = original
+        
+        self.assertEqual(fast, fallback)
+        decoded = json.loads(fast)
+        self.assertEqual(list(decoded), sorted(decoded))
+        self.assertEqual(decoded['a']['when'], '2024-05-01T12:30:15.000250')
+        self.assertEqual(decoded['amount'], '1234.10')
+        
+        # Integers over 64 bits are handed to the stdlib encoder
+        self.assertEqual(json.loads(provider.dumps({'big': 2 ** 70}))['big'], 2 ** 70)
+    
+    def test_response_and_loads(self):
+        """Test JSON responses and request parsing"""
+        provider = self.make_provider()
+        
+        response = provider.response({'b': 2, 'a': 1})
+        
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_data(), b'{"a":1,"b":2}\n')
+        self.assertEqual(provider.loads(b'{"a": [1, 2]}'), {'a': [1, 2]})
+
+if __name__ == '__main__':
+    unittest.main()
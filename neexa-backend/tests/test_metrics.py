@@ -0,0 +1,90 @@
+import unittest
+import threading
+from flask import Flask, jsonify
+from app.middleware.metrics import RequestMetrics
+from config.config import ProductionConfig
+
+class RequestMetricsTestCase(unittest.TestCase):
+    """Test cases for per-route request metrics"""
+    
+    def setUp(self):
+        """Set up a throwaway app with instrumented routes"""
+        self.app = Flask(__name__)
+        self.metrics = RequestMetrics()
+        self.metrics.init_app(self.app)
+        self.client = self.app.test_client()
+        
+        @self.app.route('/items/<int:item_id>')
+        def item(item_id):
+            if item_id == 0:
+                return jsonify({'error': 'Not found'}), 404
+            return jsonify({'id': item_id})
+    
+    def test_counts_histograms_and_exposition(self):
+        """Test that routes are labelled by rule and exported in Prometheus format"""
+        self.client.get('/items/1')
+        self.client.get('/items/2')
+        self.client.get('/items/0')
+        
+        body = self.client.get('/metrics').get_data(as_text=True)
+        
+        self.assertIn('neexa_http_requests_total{method="GET",route="/items/<int:item_id>",status="200"} 2', body)
+        self.assertIn('neexa_http_requests_total{method="GET",route="/items/<int:item_id>",status="404"} 1', body)
+        self.assertIn('neexa_http_request_duration_seconds_bucket{method="GET",route="/items/<int:item_id>",le="+Inf"} 3', body)
+        self.assertIn('neexa_http_request_duration_seconds_count{method="GET",route="/items/<int:item_id>"} 3', body)
+        self.assertIn('neexa_http_requests_in_flight{method="GET",route="/items/<int:item_id>"} 0', body)
+    
+    def test_buffers_of_exited_threads_are_kept(self):
+        """Test that requests served by short-lived threads are not lost"""
+        def worker():
+            self.app.test_client().get('/items/5')
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        totals = self.metrics.snapshot()
+        
+        self.assertEqual(totals[('GET', '/items/<int:item_id>')].count, 4)
+        self.assertEqual(len(self.metrics._buffers), 0)
+
+class MetricsAccessTestCase(unittest.TestCase):
+    """Test cases for restricting who can scrape /metrics"""
+    
+    def make_client(self, **config):
+        app = Flask(__name__)
+        app.config.update(config)
+        RequestMetrics().init_app(app)
+        return app.test_client()
+    
+    def test_token_is_required_when_configured(self):
+        """Test that METRICS_TOKEN scrapes need the bearer token"""
+        client = self.make_client(METRICS_TOKEN='s3cret')
+        
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response.headers['WWW-Authenticate'])
+        self.assertEqual(client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+        
+        response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('neexa_http_requests_total', response.get_data(as_text=True))
+    
+    def test_allowed_ips(self):
+        """Test that METRICS_ALLOWED_IPS admits listed addresses and networks only"""
+        client = self.make_client(METRICS_ALLOWED_IPS=['127.0.0.1', '10.0.0.0/8'])
+        
+        self.assertEqual(client.get('/metrics').status_code, 200)
+        self.assertEqual(client.get('/metrics', environ_base={'REMOTE_ADDR': '10.1.2.3'}).status_code, 200)
+        self.assertEqual(client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'}).status_code, 403)
+    
+    def test_disabled_by_default_in_production(self):
+        """Test that the production config does not expose /metrics unless enabled"""
+        self.assertFalse(ProductionConfig.METRICS_ENABLED)
+        client = self.make_client(METRICS_ENABLED=ProductionConfig.METRICS_ENABLED)
+        self.assertEqual(client.get('/metrics').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
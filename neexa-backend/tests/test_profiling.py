@@ -0,0 +1,108 @@
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+from flask import Flask, jsonify
+from app.middleware.profiling import RequestProfiler, sign_profile_request
+
+class RequestProfilerTestCase(unittest.TestCase):
+    """Test cases for on-demand request profiling"""
+    
+    def setUp(self):
+        """Set up a throwaway app writing profiles to a temporary directory"""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+    
+    def make_app(self, **config):
+        app = Flask(__name__)
+        app.config.update(PROFILING_ENABLED=True, PROFILING_SECRET='profile-secret',
+                          PROFILING_DIR=self.directory)
+        app.config.update(config)
+        RequestProfiler().init_app(app)
+        
+        @app.route('/work')
+        def work():
+            time.sleep(0.03)
+            return jsonify({'total': sum(range(1000))})
+        
+        return app.test_client()
+    
+    def profiles(self):
+        return sorted(os.listdir(self.directory))
+    
+    def test_signed_header_triggers_cprofile(self):
+        """Test that only a validly signed request is profiled"""
+        client = self.make_app()
+        
+        response = client.get('/work')
+        self.assertNotIn('X-Profile-Id', response.headers)
+        response = client.get('/work', headers={'X-Profile-Request': sign_profile_request('wrong', 'GET', '/work')})
+        self.assertNotIn('X-Profile-Id', response.headers)
+        stale = sign_profile_request('profile-secret', 'GET', '/work', time.time() - 3600)
+        response = client.get('/work', headers={'X-Profile-Request': stale})
+        self.assertNotIn('X-Profile-Id', response.headers)
+        self.assertEqual(self.profiles(), [])
+        
+        signature = sign_profile_request('profile-secret', 'GET', '/work')
+        response = client.get('/work', headers={'X-Profile-Request': signature})
+        self.assertEqual(response.status_code, 200)
+        name = response.headers['X-Profile-Id']
+        self.assertEqual(self.profiles(), [name + '.prof'])
+        
+        stats = pstats.Stats(os.path.join(self.directory, name + '.prof'))
+        self.assertTrue(any(func[2] == 'work' for func in stats.stats))
+    
+    def test_sampling_mode_writes_collapsed_stacks(self):
+        """Test that sampled requests produce flame graph input"""
+        client = self.make_app(PROFILING_MODE='sampling', PROFILING_SAMPLE_RATE=1.0,
+                               PROFILING_SAMPLE_INTERVAL_MS=1)
+        
+        name = client.get('/work').headers['X-Profile-Id']
+        
+        with open(os.path.join(self.directory, name + '.folded')) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertGreater(int(count), 0)
+        self.assertTrue(any('work (test_profiling.py' in line for line in lines))
+    
+    def test_retention_cap(self):
+        """Test that only the newest PROFILING_MAX_FILES profiles are kept"""
+        client = self.make_app(PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_FILES=2)
+        
+        names = [client.get('/work').headers['X-Profile-Id'] for _ in range(4)]
+        
+        self.assertEqual(len(self.profiles()), 2)
+        self.assertIn(names[-1] + '.prof', self.profiles())
+    
+    def test_enabled_without_real_secret_is_refused(self):
+        """Test that signed triggers need a secret other than the env.example placeholder"""
+        for secret in (None, '', 'change-this-profiling-secret'):
+            app = Flask(__name__)
+            app.config.update(PROFILING_ENABLED=True, PROFILING_SECRET=secret, PROFILING_DIR=self.directory)
+            with self.assertRaises(ValueError):
+                RequestProfiler().init_app(app)
+    
+    def test_sampling_only_without_secret(self):
+        """Test that without a secret sampling still works but the header is ignored"""
+        client = self.make_app(PROFILING_SECRET='change-this-profiling-secret', PROFILING_SAMPLE_RATE=1.0)
+        self.assertIn('X-Profile-Id', client.get('/work').headers)
+        
+        client = self.make_app(PROFILING_SECRET='change-this-profiling-secret', PROFILING_SAMPLE_RATE=1e-9)
+        signature = sign_profile_request('change-this-profiling-secret', 'GET', '/work')
+        response = client.get('/work', headers={'X-Profile-Request': signature})
+        self.assertNotIn('X-Profile-Id', response.headers)
+    
+    def test_disabled_registers_nothing(self):
+        """Test that a disabled profiler adds no request hooks"""
+        app = Flask(__name__)
+        app.config.update(PROFILING_SAMPLE_RATE=1.0, PROFILING_DIR=self.directory)
+        RequestProfiler().init_app(app)
+        
+        self.assertEqual(dict(app.before_request_funcs), {})
+        self.assertEqual(self.profiles(), [])
+
+if __name__ == '__main__':
+    unittest.main()
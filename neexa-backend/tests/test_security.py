@@ -0,0 +1,182 @@
+import time
+import unittest
+from datetime import datetime, timedelta
+from flask import Flask
+from app.utils.hashing import PasswordHasher, HashingQueueFull, _generate, hash_parameters, normalize_method
+from app.utils.revocation import RevocationList, REVOKED, LOCKED
+from app.utils.rate_limit import RateLimiter, parse_limit
+from app.utils.validation import validate_password, validate_email
+
+
+class PasswordHasherTestCase(unittest.TestCase):
+    """Test cases for the password hashing executor"""
+
+    def make_hasher(self, **config):
+        """Build a hasher configured from a throwaway Flask app"""
+        app = Flask(__name__)
+        app.config.update(config)
+        hasher = PasswordHasher(app)
+        self.addCleanup(hasher.shutdown)
+        return hasher
+
+    def test_process_pool_round_trip(self):
+        """Test hashing and verifying through the process pool"""
+        hasher = self.make_hasher(PASSWORD_HASH_EXECUTOR='process', PASSWORD_HASH_WORKERS=1)
+
+        password_hash = hasher.generate('TestPass123!')
+
+        self.assertTrue(hasher.verify(password_hash, 'TestPass123!'))
+        self.assertFalse(hasher.verify(password_hash, 'WrongPass123!'))
+        # The slot is released by the future's done-callback, which can run
+        # just after result() has returned
+        deadline = time.monotonic() + 5
+        while hasher.stats()['in_flight'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = hasher.stats()
+        self.assertEqual(stats['completed'], 3)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertIsNotNone(stats['latency_ms']['p99'])
+
+    def test_full_queue_rejects_jobs(self):
+        """Test that jobs beyond the queue bound are rejected"""
+        hasher = self.make_hasher(PASSWORD_HASH_EXECUTOR='process',
+                                  PASSWORD_HASH_WORKERS=1,
+                                  PASSWORD_HASH_MAX_QUEUE=0)
+
+        # Occupy the only slot
+        hasher._slots.acquire()
+        try:
+            with self.assertRaises(HashingQueueFull):
+                hasher.generate('TestPass123!')
+        finally:
+            hasher._slots.release()
+
+        self.assertEqual(hasher.stats()['rejected'], 1)
+
+    def test_needs_rehash_follows_policy(self):
+        """Test that hashes below the configured policy are flagged"""
+        hasher = self.make_hasher(PASSWORD_HASH_EXECUTOR='inline',
+                                  PASSWORD_HASH_METHOD='pbkdf2:sha256:2000')
+
+        current = hasher.generate('TestPass123!')
+        weaker = _generate('TestPass123!', 'pbkdf2:sha256:1000')
+        other_algorithm = _generate('TestPass123!', 'bcrypt:4')
+
+        self.assertFalse(hasher.needs_rehash(current))
+        self.assertTrue(hasher.needs_rehash(weaker))
+        self.assertTrue(hasher.needs_rehash(other_algorithm))
+        self.assertTrue(hasher.verify(other_algorithm, 'TestPass123!'))
+        self.assertTrue(hasher.needs_rehash(''))
+
+    def test_empty_method_is_rejected(self):
+        """Test that an empty method or stored hash does not fall back to the default"""
+        for method in ('', None):
+            with self.assertRaises(ValueError):
+                normalize_method(method)
+        with self.assertRaises(ValueError):
+            hash_parameters('')
+        with self.assertRaises(ValueError):
+            self.make_hasher(PASSWORD_HASH_METHOD='')
+
+class RevocationListTestCase(unittest.TestCase):
+    """Test cases for the stateless authorization revocation list"""
+
+    def test_revocations_and_locks(self):
+        """Test revoked users, bumped token versions and locks"""
+        revocations = RevocationList(capacity=2)
+
+        revocations.revoke_user(1)
+        revocations.revoke_versions_below(2, 3)
+        revocations.lock(3, datetime.utcnow() + timedelta(minutes=30))
+
+        self.assertEqual(revocations.check(1, 99), REVOKED)
+        self.assertEqual(revocations.check(2, 2), REVOKED)
+        self.assertIsNone(revocations.check(2, 3))
+        self.assertEqual(revocations.check(3, 0), LOCKED)
+        self.assertIsNone(revocations.check(4, 0))
+        # Growing past the filter capacity rebuilds it without losing entries
+        self.assertEqual(len(revocations), 3)
+        self.assertEqual(revocations.check(1, 0), REVOKED)
+
+class RateLimiterTestCase(unittest.TestCase):
+    """Test cases for the sharded rate limiter"""
+
+    def setUp(self):
+        self.now = 1000.0
+
+    def timer(self):
+        return self.now
+
+    def test_parse_limit(self):
+        """Test rate limit string parsing"""
+        self.assertEqual(parse_limit('100 per hour'), (100, 3600))
+        self.assertEqual(parse_limit('5/minute'), (5, 60))
+        self.assertEqual(parse_limit('10 per 30 seconds'), (10, 30))
+        with self.assertRaises(ValueError):
+            parse_limit('lots')
+
+    def test_token_bucket_refills_over_time(self):
+        """Test that the token bucket rejects bursts and refills"""
+        limiter = RateLimiter('token_bucket', timer=self.timer)
+
+        results = [limiter.hit('user:1', 2, 60).allowed for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertAlmostEqual(limiter.hit('user:1', 2, 60).retry_after, 30.0)
+
+        self.now += 30
+        self.assertTrue(limiter.hit('user:1', 2, 60).allowed)
+
+    def test_sliding_window_log(self):
+        """Test that the sliding window counts hits in the trailing period"""
+        limiter = RateLimiter('sliding_window', timer=self.timer)
+
+        self.assertTrue(limiter.hit('ip:a', 2, 60).allowed)
+        self.now += 10
+        self.assertTrue(limiter.hit('ip:a', 2, 60).allowed)
+        result = limiter.hit('ip:a', 2, 60)
+        self.assertFalse(result.allowed)
+        self.assertAlmostEqual(result.retry_after, 50.0)
+
+        self.now += 50
+        self.assertTrue(limiter.hit('ip:a', 2, 60).allowed)
+
+    def test_idle_and_overflow_eviction(self):
+        """Test that idle keys are evicted and shards stay bounded"""
+        limiter = RateLimiter('token_bucket', shards=1, max_keys=2, timer=self.timer)
+
+        limiter.hit('a', 5, 60)
+        limiter.hit('b', 5, 60)
+        limiter.hit('c', 5, 60)
+        self.assertEqual(len(limiter), 2)
+
+        self.now += 61
+        limiter.hit('d', 5, 60)
+        self.assertEqual(len(limiter), 1)
+
+
+class ValidationTestCase(unittest.TestCase):
+    """Test cases for the shared validation rules"""
+
+    def test_password_rules_report_first_failure(self):
+        """Test password messages follow the original rule order"""
+        cases = {
+            'Ab1!': 'Password must be at least 8 characters long',
+            'abcdefg1!': 'Password must contain at least one uppercase letter',
+            'ABCDEFG1!': 'Password must contain at least one lowercase letter',
+            'Abcdefgh!': 'Password must contain at least one digit',
+            'Abcdefg12': 'Password must contain at least one special character',
+            'Abcdefg\u0661!': 'Password is valid',
+            'TestPass123!': 'Password is valid',
+        }
+        for password, message in cases.items():
+            self.assertEqual(validate_password(password)[1], message, password)
+        self.assertTrue(validate_password('TestPass123!')[0])
+
+    def test_email_format(self):
+        """Test the compiled email pattern"""
+        self.assertTrue(validate_email('user@example.com'))
+        self.assertFalse(validate_email('user@example'))
+        self.assertFalse(validate_email('not an email'))
+
+if __name__ == '__main__':
+    unittest.main()
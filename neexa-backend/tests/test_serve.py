@@ -0,0 +1,219 @@
+import http.client
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from sqlalchemy import create_engine, insert
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models.user import User
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def process_alive(pid):
+    """Whether ``pid`` is running (zombies waiting to be reaped count as exited)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+class PreforkServerTestCase(unittest.TestCase):
+    """Test cases for the pre-forking production runner"""
+    
+    worker_class = 'sync'
+    extra_args = ()
+    
+    def setUp(self):
+        """Start serve.py with two workers recycled every three requests"""
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        env = dict(os.environ, FLASK_ENV='testing')
+        env.update(self.server_environ())
+        self.server = subprocess.Popen(
+            [sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(self.port),
+             '--workers', '2', '--max-requests', '3', '--max-requests-jitter', '0',
+             '--worker-class', self.worker_class, *self.extra_args],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        self.addCleanup(self.stop_server)
+    
+    def server_environ(self):
+        """Extra environment for the server process"""
+        return {}
+    
+    def stop_server(self):
+        # TERM so the master stops its workers; kill() would orphan them
+        if self.server.poll() is None:
+            self.server.terminate()
+            try:
+                self.server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.server.kill()
+                self.server.wait()
+        self.server.stderr.close()
+    
+    def worker_pids(self):
+        with open(f'/proc/{self.server.pid}/task/{self.server.pid}/children') as f:
+            return [int(pid) for pid in f.read().split()]
+    
+    def cpu_seconds(self, pid):
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    
+    def get(self, path):
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+                connection.request('GET', path)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+    
+    def test_serves_recycles_and_stops_gracefully(self):
+        """Test that workers are replaced after max requests and TERM stops cleanly"""
+        statuses = [self.get('/api')[0] for _ in range(10)]
+        self.assertEqual(statuses, [200] * 10)
+        
+        self.server.send_signal(signal.SIGTERM)
+        self.assertEqual(self.server.wait(timeout=30), 0)
+        log = self.server.stderr.read()
+        self.assertIn('recycled after 3 requests', log)
+        self.assertIn('Server stopped', log)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/task'), 'needs /proc')
+    def test_idle_workers_sleep_and_exit_with_master(self):
+        """Test that idle workers do not spin and exit when the master is killed"""
+        self.get('/api')
+        time.sleep(1)
+        workers = self.worker_pids()
+        self.assertEqual(len(workers), 2)
+        before = [self.cpu_seconds(pid) for pid in workers]
+        time.sleep(2)
+        for pid, started in zip(workers, before):
+            self.assertLess(self.cpu_seconds(pid) - started, 0.5)
+        
+        self.server.kill()
+        self.server.wait()
+        deadline = time.monotonic() + 10
+        while any(map(process_alive, workers)) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertEqual([pid for pid in workers if process_alive(pid)], [])
+
+class AsgiWorkerTestCase(PreforkServerTestCase):
+    """Test cases for the runner with the asgi worker class"""
+    
+    worker_class = 'asgi'
+    extra_args = ('--header-timeout', '1', '--max-body-size', '1024')
+    
+    def server_environ(self):
+        """Serve from a file database holding a verified admin and a few users"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        url = f"sqlite:///{os.path.join(directory, 'serve.db')}"
+        engine = create_engine(url)
+        db.metadata.create_all(engine)
+        password_hash = generate_password_hash('TestPass123!', method='pbkdf2:sha256:1000')
+        with engine.begin() as connection:
+            connection.execute(insert(User), [
+                {'email': email, 'password_hash': password_hash, 'first_name': 'Test', 'last_name': 'User',
+                 'is_verified': email == 'admin@neexa.com'}
+                for email in ['admin@neexa.com'] + [f'user{i}@example.com' for i in range(9)]
+            ])
+        engine.dispose()
+        return {'FLASK_ENV': 'loadtest', 'LOADTEST_DATABASE_URL': url,
+                'ADMIN_EMAILS': 'admin@neexa.com', 'ADMIN_EXPORT_BATCH_SIZE': '2'}
+    
+    def test_streamed_response_keeps_request_context(self):
+        """Test that a stream_with_context body pulled chunk by chunk from the pool still works"""
+        self.get('/api')
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+        connection.request('POST', '/api/auth/login',
+                           body=json.dumps({'email': 'admin@neexa.com', 'password': 'TestPass123!'}),
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        token = json.loads(response.read())['access_token']
+        
+        connection.request('GET', '/api/admin/users/export', headers={'Authorization': f'Bearer {token}'})
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Transfer-Encoding'), 'chunked')
+        users = [json.loads(line) for line in response.read().decode().splitlines()]
+        connection.close()
+        
+        self.assertEqual(len(users), 10)
+        self.assertEqual([user['id'] for user in users], list(range(1, 11)))
+    
+    def raw_request(self, data, close=False):
+        """Send raw bytes and return the status line of the reply (b'' if closed without one)"""
+        self.get('/api')
+        with socket.create_connection(('127.0.0.1', self.port), timeout=5) as sock:
+            sock.sendall(data)
+            if close:
+                sock.shutdown(socket.SHUT_WR)
+            reply = b''
+            while b'\r\n' not in reply:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                reply += chunk
+        return reply.split(b'\r\n', 1)[0]
+    
+    def test_rejects_oversized_and_ambiguous_bodies(self):
+        """Test 413 above the body cap and 400 for duplicate or negative Content-Length"""
+        head = b'POST /api/auth/login HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+        
+        self.assertEqual(self.raw_request(head + b'Content-Length: 1000000000\r\n\r\n'),
+                         b'HTTP/1.1 413 Request Entity Too Large')
+        self.assertEqual(self.raw_request(head + b'Content-Length: 2\r\nContent-Length: 30\r\n\r\n{}'),
+                         b'HTTP/1.1 400 Bad Request')
+        self.assertEqual(self.raw_request(head + b'Content-Length: -1\r\n\r\n'),
+                         b'HTTP/1.1 400 Bad Request')
+        self.assertEqual(self.raw_request(head + b'Content-Length: 1024\r\n\r\n' + b' ' * 1022 + b'{}'),
+                         b'HTTP/1.1 400 Bad Request')
+    
+    def test_incomplete_and_stalled_bodies(self):
+        """Test that a body cut short or never finished does not hold or break the worker"""
+        head = b'POST /api/auth/login HTTP/1.1\r\nHost: localhost\r\nContent-Length: 100\r\n\r\n{"email"'
+        
+        self.assertEqual(self.raw_request(head, close=True), b'')
+        started = time.monotonic()
+        self.assertEqual(self.raw_request(head), b'HTTP/1.1 408 Request Timeout')
+        self.assertLess(time.monotonic() - started, 4)
+        
+        self.assertEqual(self.get('/api')[0], 200)
+        self.server.terminate()
+        self.server.wait(timeout=30)
+        self.assertNotIn('Traceback', self.server.stderr.read())
+    
+    def test_keep_alive_and_request_body(self):
+        """Test that one connection carries several requests, including a JSON body"""
+        self.get('/api')
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+        connection.request('GET', '/health')
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 200)
+        
+        connection.request('POST', '/api/auth/login', body='{"email": "not-an-email"}',
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        self.assertEqual(response.status, 400)
+        self.assertIn(b'error', response.read())
+        connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
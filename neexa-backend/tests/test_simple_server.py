@@ -0,0 +1,167 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from werkzeug.security import generate_password_hash
+import simple_server
+
+class SimpleServerTestCase(unittest.TestCase):
+    """Base for simple_server tests on a throwaway sqlite file"""
+
+    pool_size = 2
+
+    def setUp(self):
+        """Point simple_server at a fresh database and pool"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.database = os.path.join(directory, 'simple.db')
+        for name, value in (('DATABASE', self.database), ('DB_POOL_SIZE', self.pool_size),
+                            ('_pool', None)):
+            patcher = mock.patch.object(simple_server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.close_pool)
+
+        simple_server.init_db()
+        conn = sqlite3.connect(self.database)
+        conn.execute('''
+            INSERT INTO users (email, password_hash, first_name, last_name)
+            VALUES (?, ?, ?, ?)
+        ''', ('test@example.com', generate_password_hash('TestPass123!', method='pbkdf2:sha256:1000'),
+              'Test', 'User'))
+        conn.commit()
+        conn.close()
+        self.client = simple_server.app.test_client()
+
+    def close_pool(self):
+        if simple_server._pool is not None:
+            simple_server._pool.close()
+
+    def login(self):
+        return self.client.post('/api/auth/login', json={
+            'email': 'test@example.com',
+            'password': 'TestPass123!'
+        })
+
+class ConnectionPoolTestCase(SimpleServerTestCase):
+    """Test cases for the pooled sqlite connections"""
+
+    def test_requests_reuse_pooled_connection(self):
+        """Test that consecutive requests borrow the same tuned connection"""
+        with mock.patch.object(simple_server.ConnectionPool, '_connect',
+                               autospec=True, side_effect=simple_server.ConnectionPool._connect) as connect:
+            for _ in range(3):
+                self.assertEqual(self.login().status_code, 200)
+
+        self.assertEqual(connect.call_count, 1)
+        pool = simple_server.get_pool()
+        conn = pool.acquire()
+        self.addCleanup(pool.release, conn)
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 1)
+        self.assertEqual(conn.execute('PRAGMA busy_timeout').fetchone()[0],
+                         simple_server.DB_BUSY_TIMEOUT_MS)
+
+    def test_release_rolls_back_and_bounds_idle_connections(self):
+        """Test that released connections are clean and extras beyond the size are closed"""
+        pool = simple_server.get_pool()
+        connections = [pool.acquire() for _ in range(3)]
+        connections[0].execute("UPDATE users SET first_name = 'Changed'")
+        self.assertTrue(connections[0].in_transaction)
+
+        for conn in connections:
+            pool.release(conn)
+
+        self.assertFalse(connections[0].in_transaction)
+        self.assertEqual(pool._idle.qsize(), 2)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connections[2].execute('SELECT 1')
+        check = sqlite3.connect(self.database)
+        self.addCleanup(check.close)
+        self.assertEqual(check.execute('SELECT first_name FROM users').fetchone()[0], 'Test')
+
+    def test_pool_is_replaced_when_database_changes(self):
+        """Test that pointing DATABASE elsewhere gets a pool for the new file"""
+        pool = simple_server.get_pool()
+        self.assertIs(simple_server.get_pool(), pool)
+
+        with mock.patch.object(simple_server, 'DATABASE', self.database + '.other'):
+            self.assertEqual(simple_server.get_pool().database, self.database + '.other')
+        self.assertIsNot(simple_server.get_pool(), pool)
+
+class UnpooledConnectionTestCase(SimpleServerTestCase):
+    """Test cases for NEEXA_DB_POOL_SIZE=0 (one connection per request)"""
+
+    pool_size = 0
+
+    def test_connection_per_request(self):
+        """Test that without a pool every request opens and closes its own connection"""
+        with mock.patch.object(simple_server.sqlite3, 'connect', wraps=sqlite3.connect) as connect:
+            for _ in range(2):
+                self.assertEqual(self.login().status_code, 200)
+
+        self.assertEqual(connect.call_count, 2)
+        self.assertIsNone(simple_server._pool)
+
+class ResetTokenTestCase(SimpleServerTestCase):
+    """Test cases for password reset token indexing and purging"""
+
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(self.database)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def insert_tokens(self, count, expires_at):
+        conn = sqlite3.connect(self.database)
+        conn.executemany('''
+            INSERT INTO password_reset_tokens (user_id, token, expires_at) VALUES (1, ?, ?)
+        ''', [(f'token-{expires_at.timestamp()}-{n}', expires_at) for n in range(count)])
+        conn.commit()
+        conn.close()
+
+    def test_token_lookups_use_indexes(self):
+        """Test that per-user and expiry lookups are served by the new indexes"""
+        indexes = {row[1] for row in self.query('PRAGMA index_list(password_reset_tokens)')}
+        self.assertIn('idx_reset_tokens_user_expires', indexes)
+        self.assertIn('idx_reset_tokens_expires', indexes)
+
+        plan = ' '.join(row[3] for row in self.query(
+            'EXPLAIN QUERY PLAN DELETE FROM password_reset_tokens WHERE user_id = ?', (1,)))
+        self.assertIn('idx_reset_tokens_user_expires', plan)
+        plan = ' '.join(row[3] for row in self.query(
+            'EXPLAIN QUERY PLAN SELECT id FROM password_reset_tokens WHERE expires_at < ? LIMIT 10',
+            (datetime.utcnow(),)))
+        self.assertIn('idx_reset_tokens_expires', plan)
+
+    def test_new_reset_token_replaces_older_ones(self):
+        """Test that requesting a reset leaves only the latest token for the user"""
+        for _ in range(3):
+            response = self.client.post('/api/auth/forgot-password', json={'email': 'test@example.com'})
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.query('SELECT COUNT(*) FROM password_reset_tokens WHERE user_id = 1'), [(1,)])
+
+    def test_purge_deletes_only_old_expired_tokens_in_batches(self):
+        """Test that the purge removes tokens past the retention window, batch by batch"""
+        now = datetime.utcnow()
+        retention = timedelta(hours=simple_server.RESET_TOKEN_RETENTION_HOURS)
+        self.insert_tokens(7, now - retention - timedelta(hours=1))
+        self.insert_tokens(2, now - retention + timedelta(hours=1))
+        self.insert_tokens(2, now + timedelta(hours=1))
+
+        with mock.patch.object(simple_server, 'RESET_TOKEN_PURGE_BATCH_SIZE', 3):
+            with mock.patch.object(simple_server.ConnectionPool, 'release', autospec=True,
+                                   side_effect=simple_server.ConnectionPool.release) as release:
+                self.assertEqual(simple_server.purge_reset_tokens(), 7)
+
+        self.assertEqual(release.call_count, 1)
+        self.assertEqual(self.query('SELECT COUNT(*) FROM password_reset_tokens'), [(4,)])
+        self.assertEqual(simple_server.purge_reset_tokens(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import unittest
+from app import create_app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class StartupTestCase(unittest.TestCase):
+    """Test cases for application startup cost"""
+    
+    def test_serving_does_not_import_migration_tooling(self):
+        """Test that create_app leaves alembic and Flask-Migrate unimported"""
+        code = (
+            "import sys\n"
+            "from app import create_app\n"
+            "create_app('testing')\n"
+            "print(sorted(m for m in ('alembic', 'flask_migrate') if m in sys.modules))\n"
+        )
+        output = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, check=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+        self.assertEqual(output.strip().splitlines()[-1], '[]')
+    
+    def test_migration_commands_load_on_demand(self):
+        """Test that `flask db` still exposes the Flask-Migrate commands"""
+        app = create_app('testing')
+        self.assertNotIn('migrate', app.extensions)
+        
+        result = app.test_cli_runner().invoke(args=['db', '--help'])
+        
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('upgrade', result.output)
+        self.assertIn('migrate', app.extensions)
+
+if __name__ == '__main__':
+    unittest.main()